@@ -18,10 +18,9 @@ Version: 1.0.0
 License: MIT
 """
 
+import argparse
 import asyncio
 import aiohttp
-import json
-import pandas as pd
 import time
 import random
 import re
@@ -36,12 +35,24 @@ from fake_useragent import UserAgent
 from bs4 import BeautifulSoup
 import threading
 from queue import Queue
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from itertools import islice
 from typing import List, Dict, Optional, Tuple
 import urllib3
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import schedule
 import traceback
+from http_cache import PageExtraction, ValidatorStore
+from html_parsing import PageArtifacts, make_soup, resolve_parser, visit_page
+from price_engine import BASIC_PRICE_ENGINE
+from category_rules import BACKGROUND_CATEGORY_ENGINE
+from product_text import PRODUCT_TEXT_SCANNER
+from parse_workers import PageJob, PageResult, ParseWorkerPool
+from product_export import (BACKGROUND_EXCEL_LAYOUT, COLUMNAR_SUFFIXES, ProductSink, ProductStream, ProductSummary,
+                            write_columnar, write_excel, write_json)
+from product_record import BACKGROUND_SCHEMA
+from product_store import DEFAULT_STORE_PATH, ProductStore
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -57,6 +68,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Products a category page extraction keeps for 304 reuse (see http_cache.ValidatorStore)
+CATEGORY_EXTRACTION = PageExtraction('background.category', tuple(BACKGROUND_SCHEMA.columns))
+
 @dataclass
 class ScrapingConfig:
     """Configuration for the scraper"""
@@ -71,28 +85,39 @@ class ScrapingConfig:
     session_break_duration: Tuple[float, float] = (10.0, 30.0)
     user_agent_rotation_interval: int = 10
     enable_background_mode: bool = True
+    concurrent_mode: bool = False  # crawl categories as concurrent tasks
+    conditional_requests: bool = False  # send ETag/Last-Modified validators
+    validator_db: str = os.path.join('.http_cache', 'validators.sqlite3')
+    product_store: bool = False  # upsert delivered products into a SQLite store kept across runs
+    product_db: str = DEFAULT_STORE_PATH
+    html_parser: str = "auto"  # auto, lxml, html.parser, html5lib
+    parse_workers: int = 0  # processes parsing pages while fetching continues (0 = in the event loop)
+    shared_memory_results: bool = False  # workers return products as Arrow batches in shared memory (see benchmark_parse_workers.py)
+    stream_compression: Optional[str] = None  # product stream (NDJSON): None, gzip or zstd
+    ordered_results: bool = True  # deliver category results in category order, else as they finish
     output_format: str = "both"  # json, excel, both
+    columnar_format: Optional[str] = "parquet"  # columnar copy for analytics: parquet, arrow or None
     data_validation: bool = True
     progress_tracking: bool = True
 
-@dataclass
-class ProductData:
-    """Structured product data"""
-    product: str
-    image: str
-    sku: str
-    price: str
-    brand: str
-    category1: str
-    category2: str
-    category3: str
-    product_link: str
-    condition: str
-    availability: str
-    warranty: str
-    product_description: str
-    scraped_at: str
-    source_url: str
+# Column order of product batches passed between processes
+PRODUCT_FIELDS = BACKGROUND_SCHEMA.columns
+
+@dataclass(frozen=True)
+class ResponsePayload:
+    """Fully-read HTTP response, detached from the connection"""
+    status: int
+    url: str
+    headers: Dict[str, str]
+    body: bytes
+    encoding: str = 'utf-8'
+    elapsed: float = 0.0
+    fetched_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    
+    @cached_property
+    def text(self) -> str:
+        """Body decoded on first access"""
+        return self.body.decode(self.encoding, errors='replace')
 
 class HumanBehaviorSimulator:
     """Simulates human browsing behavior"""
@@ -132,7 +157,17 @@ class HumanBehaviorSimulator:
         return delay
     
     def simulate_human_behavior(self, action: str = 'browsing') -> None:
-        """Simulate human browsing behavior"""
+        """Simulate human browsing behavior (blocking)"""
+        for delay in self.plan_human_behavior(action):
+            time.sleep(delay)
+    
+    async def simulate_human_behavior_async(self, action: str = 'browsing') -> None:
+        """Simulate human browsing behavior without blocking the event loop"""
+        for delay in self.plan_human_behavior(action):
+            await asyncio.sleep(delay)
+    
+    def plan_human_behavior(self, action: str = 'browsing') -> List[float]:
+        """Draw the sequence of pauses for one simulated action"""
         self.request_count += 1
         current_time = time.time()
         session_duration = current_time - self.session_start
@@ -150,47 +185,53 @@ class HumanBehaviorSimulator:
             delay = self.get_human_delay('page_load')
         
         logger.info(f"Human behavior: {action} delay = {delay:.1f}s")
-        time.sleep(delay)
+        delays = [delay]
         
         # Simulate occasional human behaviors
-        self._simulate_distraction()
-        self._simulate_session_break(session_duration)
-        self._simulate_mouse_movements()
-        self._simulate_reading_time()
+        delays.extend(self._simulate_distraction())
+        delays.extend(self._simulate_session_break(session_duration))
+        delays.extend(self._simulate_mouse_movements())
+        delays.extend(self._simulate_reading_time())
+        
+        self.last_request_time = current_time
+        return delays
     
-    def _simulate_distraction(self) -> None:
+    def _simulate_distraction(self) -> List[float]:
         """Simulate human distraction"""
         if random.random() < self.behavior_probabilities['distraction']:
             distraction_delay = random.uniform(3.0, 8.0)
             logger.info(f"Human distraction pause: {distraction_delay:.1f}s")
-            time.sleep(distraction_delay)
+            return [distraction_delay]
+        return []
     
-    def _simulate_session_break(self, session_duration: float) -> None:
+    def _simulate_session_break(self, session_duration: float) -> List[float]:
         """Simulate session breaks for longer sessions"""
         if (session_duration > 300 and 
             random.random() < self.behavior_probabilities['session_break']):
             break_duration = random.uniform(10.0, 30.0)
             logger.info(f"Human session break: {break_duration:.1f}s")
-            time.sleep(break_duration)
+            return [break_duration]
+        return []
     
-    def _simulate_mouse_movements(self) -> None:
+    def _simulate_mouse_movements(self) -> List[float]:
         """Simulate mouse movements and scrolling"""
+        delays = []
         if random.random() < self.behavior_probabilities['mouse_movement']:
             scroll_pauses = random.randint(2, 5)
             for _ in range(scroll_pauses):
-                scroll_delay = self.get_human_delay('scroll')
-                time.sleep(scroll_delay)
+                delays.append(self.get_human_delay('scroll'))
             
             # Simulate hover behavior
-            hover_delay = random.uniform(0.5, 1.5)
-            time.sleep(hover_delay)
+            delays.append(random.uniform(0.5, 1.5))
+        return delays
     
-    def _simulate_reading_time(self) -> None:
+    def _simulate_reading_time(self) -> List[float]:
         """Simulate time spent reading content"""
         if random.random() < self.behavior_probabilities['longer_reading']:
             reading_delay = self.get_human_delay('thinking')
             logger.info(f"Human reading time: {reading_delay:.1f}s")
-            time.sleep(reading_delay)
+            return [reading_delay]
+        return []
     
     def get_random_user_agent(self) -> str:
         """Get a random user agent"""
@@ -280,20 +321,8 @@ class DataValidator:
         if not price:
             return ""
         
-        # Extract price patterns
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',
-            r'USD\s*[\d,]+\.?\d*',
-            r'[\d,]+\.?\d*\s*USD',
-            r'[\d,]{3,}\.?\d{0,2}(?=\s|$)'
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, price, re.IGNORECASE)
-            if match:
-                return match.group()
-        
-        return price
+        match = BASIC_PRICE_ENGINE.find(price)
+        return match.raw if match else price
 
 class ProgressTracker:
     """Tracks scraping progress and statistics"""
@@ -356,6 +385,26 @@ class ProgressTracker:
             'success_rate': (self.successful_requests / max(1, self.successful_requests + self.failed_requests)) * 100
         }
 
+class HostRateLimiter:
+    """Enforces a minimum spacing between request starts to the same host"""
+    
+    def __init__(self, delay_range: Tuple[float, float]):
+        self.delay_range = delay_range
+        self.locks = {}
+        self.next_allowed = {}
+    
+    async def wait(self, url: str) -> None:
+        """Wait until the host of url may receive another request"""
+        host = urlparse(url).netloc
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        
+        async with lock:
+            now = time.monotonic()
+            wait_time = self.next_allowed.get(host, now) - now
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            self.next_allowed[host] = time.monotonic() + random.uniform(*self.delay_range)
+
 class BackgroundScraper:
     """Main background scraper class"""
     
@@ -365,9 +414,16 @@ class BackgroundScraper:
         self.data_validator = DataValidator()
         self.progress_tracker = ProgressTracker()
         self.session = None
-        self.products = []
+        # Products delivered so far; the products themselves go to the run's stream, not memory
+        self.product_count = 0
         self.running = False
         self.stop_event = threading.Event()
+        self.host_limiter = HostRateLimiter(config.delay_between_requests)
+        self.validators = ValidatorStore(config.validator_db) if config.conditional_requests else None
+        self.html_parser = resolve_parser(config.html_parser)
+        self.parse_pool: Optional[ParseWorkerPool] = None
+        self.sink: Optional[ProductSink] = None
+        self.product_store = ProductStore(config.product_db) if config.product_store else None
         
         # Categories to scrape
         self.categories = [
@@ -427,24 +483,51 @@ class BackgroundScraper:
         )
     
     async def make_request(self, session: aiohttp.ClientSession, url: str, 
-                          action: str = 'browsing') -> Optional[aiohttp.ClientResponse]:
-        """Make HTTP request with human-like behavior"""
+                          action: str = 'browsing', conditional: Optional[PageExtraction] = None) -> Optional[ResponsePayload]:
+        """Make HTTP request with human-like behavior (304 yields an empty-bodied payload)"""
         for attempt in range(self.config.retry_attempts):
             try:
                 # Simulate human behavior before request
-                self.human_behavior.simulate_human_behavior(action)
+                await self.human_behavior.simulate_human_behavior_async(action)
+                
+                # Keep per-host request rate within the configured spacing
+                await self.host_limiter.wait(url)
                 
                 logger.info(f"Making request to: {url} (attempt {attempt + 1})")
                 
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        logger.info(f"Success: {response.status} - {len(await response.text()):,} chars")
+                request_headers = {}
+                if conditional and self.validators:
+                    request_headers = self.validators.conditional_headers(url, conditional)
+                
+                started = time.monotonic()
+                async with session.get(url, headers=request_headers) as response:
+                    if response.status == 304:
+                        logger.info(f"Not modified (304): {url}")
+                        return ResponsePayload(
+                            status=response.status,
+                            url=str(response.url),
+                            headers=dict(response.headers),
+                            body=b'',
+                            elapsed=time.monotonic() - started
+                        )
+                    elif response.status == 200:
+                        # Read the body once; the connection goes back to the pool on exit
+                        body = await response.read()
+                        payload = ResponsePayload(
+                            status=response.status,
+                            url=str(response.url),
+                            headers=dict(response.headers),
+                            body=body,
+                            encoding=response.get_encoding(),
+                            elapsed=time.monotonic() - started
+                        )
+                        logger.info(f"Success: {response.status} - {len(body):,} bytes in {payload.elapsed:.1f}s")
                         self.progress_tracker.update_request_stats(
                             self.progress_tracker.successful_requests + 1,
                             self.progress_tracker.failed_requests,
                             self.progress_tracker.retry_count
                         )
-                        return response
+                        return payload
                     elif response.status == 403:
                         logger.warning(f"Access denied (403) - attempt {attempt + 1}")
                         if attempt < self.config.retry_attempts - 1:
@@ -483,51 +566,93 @@ class BackgroundScraper:
     async def scrape_category(self, session: aiohttp.ClientSession, 
                             category_name: str, category_url: str) -> List[Dict]:
         """Scrape products from a category"""
+        response = await self.fetch_category(session, category_name, category_url)
+        return await self.process_category(response, category_name, category_url)
+    
+    async def fetch_category(self, session: aiohttp.ClientSession, 
+                           category_name: str, category_url: str) -> Optional[ResponsePayload]:
+        """Fetch a category page"""
         logger.info(f"Scraping category: {category_name}")
         
         try:
-            response = await self.make_request(session, category_url, 'category_browse')
+            response = await self.make_request(session, category_url, 'category_browse', conditional=CATEGORY_EXTRACTION)
             if not response:
                 logger.warning(f"Failed to access {category_name}")
-                return []
+            return response
             
-            content = await response.text()
-            soup = BeautifulSoup(content, 'html.parser')
+        except Exception as e:
+            logger.error(f"Error fetching {category_name}: {e}")
+            return None
+    
+    async def process_category(self, response: Optional[ResponsePayload], 
+                             category_name: str, category_url: str) -> List[Dict]:
+        """Extract valid products from a fetched category page (in a parse worker when configured)"""
+        if not response:
+            return []
+        
+        try:
+            # Unchanged page: reuse the products extracted last time, skip the parse
+            if response.status == 304:
+                stored_products = self.validators.load_products(category_url, CATEGORY_EXTRACTION) or []
+                logger.info(f"{category_name} not modified, reusing {len(stored_products)} stored products")
+                return stored_products
             
-            products = []
+            job = PageJob(category_name, category_url, response.body, response.encoding)
+            if self.parse_pool:
+                result = await self.parse_pool.run(job)
+            else:
+                result = self.extract_page(job)
             
-            # Extract products using multiple strategies
-            products.extend(await self._extract_from_tables(soup, category_name, category_url))
-            products.extend(await self._extract_from_links(soup, category_name, category_url))
-            products.extend(await self._extract_from_text(soup, category_name, category_url))
+            # Human-like delay for each product link
+            for _ in range(result.link_count):
+                await self.human_behavior.simulate_human_behavior_async('click')
             
-            # Clean and validate products
-            cleaned_products = []
-            for product in products:
-                if self.data_validator.validate_product(product):
-                    cleaned_product = self.data_validator.clean_product_data(product)
-                    cleaned_products.append(cleaned_product)
+            if self.validators:
+                self.validators.save(category_url, response.headers, result.products, CATEGORY_EXTRACTION)
             
-            logger.info(f"Found {len(cleaned_products)} valid products in {category_name}")
-            return cleaned_products
+            logger.info(f"Found {len(result.products)} valid products in {category_name}")
+            return result.products
             
         except Exception as e:
             logger.error(f"Error scraping {category_name}: {e}")
             return []
     
-    async def _extract_from_tables(self, soup: BeautifulSoup, 
-                                 category_name: str, source_url: str) -> List[Dict]:
+    def extract_page(self, job: PageJob) -> PageResult:
+        """Parse a fetched page and run every extraction strategy on it"""
+        soup = make_soup(job.text, self.html_parser)
+        page = visit_page(soup)  # One walk shared by every strategy below
+        
+        products = []
+        
+        # Extract products using multiple strategies
+        products.extend(self._extract_from_tables(soup, job.category_name, job.source_url, page))
+        link_products, link_count = self._extract_from_links(soup, job.category_name, job.source_url, page)
+        products.extend(link_products)
+        products.extend(self._extract_from_text(soup, job.category_name, job.source_url, page))
+        
+        # Clean and validate products
+        cleaned_products = []
+        for product in products:
+            if self.data_validator.validate_product(product):
+                cleaned_product = self.data_validator.clean_product_data(product)
+                cleaned_products.append(cleaned_product)
+        
+        return PageResult(job.category_name, job.source_url, cleaned_products, link_count)
+    
+    def _extract_from_tables(self, soup: BeautifulSoup, 
+                           category_name: str, source_url: str,
+                           page: Optional[PageArtifacts] = None) -> List[Dict]:
         """Extract products from HTML tables"""
         products = []
         
         try:
-            tables = soup.find_all('table')
-            logger.info(f"Found {len(tables)} tables")
+            if page is None:
+                page = visit_page(soup)
+            logger.info(f"Found {len(page.tables)} tables")
             
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
+            for table in page.tables:
+                for row in table.rows:
+                    cells = row.cells
                     if len(cells) >= 2:
                         product_data = self._parse_table_row(cells, category_name, source_url)
                         if product_data:
@@ -538,13 +663,15 @@ class BackgroundScraper:
         
         return products
     
-    async def _extract_from_links(self, soup: BeautifulSoup, 
-                                category_name: str, source_url: str) -> List[Dict]:
-        """Extract products from product links"""
+    def _extract_from_links(self, soup: BeautifulSoup, 
+                          category_name: str, source_url: str,
+                          page: Optional[PageArtifacts] = None) -> Tuple[List[Dict], int]:
+        """Extract products from product links (and how many links were processed)"""
         products = []
+        processed = 0
         
         try:
-            links = soup.find_all('a', href=True)
+            links = page.links if page else soup.find_all('a', href=True)
             product_links = []
             
             for link in links:
@@ -561,41 +688,28 @@ class BackgroundScraper:
                 product_data = self._create_product_from_link(href, text, category_name, source_url)
                 if product_data:
                     products.append(product_data)
-                
-                # Human-like delay between product links
-                self.human_behavior.simulate_human_behavior('click')
+                processed += 1
             
         except Exception as e:
             logger.error(f"Error extracting from links: {e}")
         
-        return products
+        return products, processed
     
-    async def _extract_from_text(self, soup: BeautifulSoup, 
-                               category_name: str, source_url: str) -> List[Dict]:
+    def _extract_from_text(self, soup: BeautifulSoup, 
+                         category_name: str, source_url: str,
+                         page: Optional[PageArtifacts] = None) -> List[Dict]:
         """Extract products from text content"""
         products = []
         
         try:
-            text_content = soup.get_text()
+            text_content = page.text if page else soup.get_text()
             
-            # Product patterns
-            product_patterns = [
-                r'((?:Cisco|Huawei|Dell|HPE|Juniper|Aruba)\s+[A-Z\d][^\n]{10,80})',
-                r'([A-Z]{2,}\d+[A-Z\d\-]*\s+[^\n]{10,60})',
-                r'(NetEngine\s+[^\n]{5,40})',
-                r'(Catalyst\s+[^\n]{5,40})',
-                r'(PowerEdge\s+[^\n]{5,40})',
-                r'(ProLiant\s+[^\n]{5,40})'
-            ]
-            
-            for pattern in product_patterns:
-                matches = re.findall(pattern, text_content, re.MULTILINE | re.IGNORECASE)
-                for match in matches:
-                    clean_match = re.sub(r'\s+', ' ', match.strip())
-                    if self._is_valid_product_name(clean_match):
-                        product_data = self._create_product_from_text(clean_match, category_name, source_url)
-                        if product_data:
-                            products.append(product_data)
+            # Product name candidates, one pass over the text (see product_text.py)
+            for candidate in PRODUCT_TEXT_SCANNER.scan(text_content):
+                if self._is_valid_product_name(candidate.name):
+                    product_data = self._create_product_from_text(candidate.name, category_name, source_url)
+                    if product_data:
+                        products.append(product_data)
             
         except Exception as e:
             logger.error(f"Error extracting from text: {e}")
@@ -732,22 +846,8 @@ class BackgroundScraper:
     
     def _extract_price_from_text(self, text: str) -> str:
         """Extract price from text"""
-        if not text:
-            return ""
-        
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',
-            r'USD\s*[\d,]+\.?\d*',
-            r'[\d,]+\.?\d*\s*USD',
-            r'[\d,]{3,}\.?\d{0,2}(?=\s|$)'
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group()
-        
-        return ""
+        match = BASIC_PRICE_ENGINE.find(text)
+        return match.raw if match else ""
     
     def _extract_sku(self, text: str) -> str:
         """Extract SKU from text"""
@@ -773,61 +873,26 @@ class BackgroundScraper:
         return "Generic"
     
     def _determine_categories(self, name: str, category_name: str) -> Tuple[str, str, str]:
-        """Determine category hierarchy"""
-        name_lower = name.lower()
-        cat_name_lower = category_name.lower()
-        
-        # Category 1 (Main)
-        if 'router' in cat_name_lower:
-            cat1 = "Routers"
-        elif 'switch' in cat_name_lower:
-            cat1 = "Switches"
-        elif 'firewall' in cat_name_lower:
-            cat1 = "Firewalls"
-        elif 'wireless' in cat_name_lower:
-            cat1 = "Wireless"
-        elif 'server' in cat_name_lower:
-            cat1 = "Servers"
-        elif 'storage' in cat_name_lower:
-            cat1 = "Storages"
-        else:
-            cat1 = "Networking"
-        
-        # Category 2 (Subcategory)
-        if 'cisco' in name_lower:
-            if 'router' in name_lower:
-                cat2 = "Cisco Routers"
-            elif 'switch' in name_lower:
-                cat2 = "Cisco Switches"
-            else:
-                cat2 = "Cisco Equipment"
-        elif 'huawei' in name_lower:
-            if 'router' in name_lower:
-                cat2 = "Huawei Routers"
-            elif 'switch' in name_lower:
-                cat2 = "Huawei Switches"
-            else:
-                cat2 = "Huawei Equipment"
-        else:
-            cat2 = f"{cat1} Equipment"
-        
-        # Category 3 (Product Type)
-        if 'enterprise' in name_lower or 'isr' in name_lower or 'asr' in name_lower:
-            cat3 = "Enterprise Series"
-        elif 'catalyst' in name_lower:
-            cat3 = "Catalyst Series"
-        elif 'poweredge' in name_lower:
-            cat3 = "PowerEdge Series"
-        else:
-            cat3 = "Standard Series"
-        
-        return cat1, cat2, cat3
+        """Determine category hierarchy (rules in category_rules.py)"""
+        return BACKGROUND_CATEGORY_ENGINE.categorize(name, category=category_name)
     
-    async def run_scraping(self) -> List[Dict]:
-        """Run the main scraping process"""
+    async def run_scraping(self) -> ProductStream:
+        """Run the main scraping process; returns the run's products, read back from its stream"""
         logger.info("Starting background scraping process...")
         self.running = True
         
+        if self.config.parse_workers > 0:
+            columns = PRODUCT_FIELDS if self.config.shared_memory_results else None
+            self.parse_pool = ParseWorkerPool(extract_page_job, self.config.parse_workers,
+                                              initializer=init_parse_worker, initargs=(self.config,),
+                                              columns=columns)
+            logger.info(f"Parsing pages in {self.parse_pool.processes} worker processes")
+        
+        # Products are appended here as each category is delivered
+        self.sink = ProductSink.for_run('router-switch-products-', self.config.stream_compression,
+                                        summary=ProductSummary(BACKGROUND_EXCEL_LAYOUT))
+        logger.info(f"Streaming products to {self.sink.path}")
+        
         try:
             async with await self.create_session() as session:
                 self.session = session
@@ -835,27 +900,10 @@ class BackgroundScraper:
                 # Update progress tracker
                 self.progress_tracker.update_category_progress(0, len(self.categories))
                 
-                # Scrape each category
-                for i, (category_name, category_url) in enumerate(self.categories):
-                    if self.stop_event.is_set():
-                        logger.info("Stop event set, breaking scraping loop")
-                        break
-                    
-                    logger.info(f"Processing category {i+1}/{len(self.categories)}: {category_name}")
-                    
-                    # Scrape category
-                    category_products = await self.scrape_category(session, category_name, category_url)
-                    self.products.extend(category_products)
-                    
-                    # Update progress
-                    self.progress_tracker.update_category_progress(i+1, len(self.categories))
-                    self.progress_tracker.update_product_count(len(self.products))
-                    
-                    # Human-like delay between categories
-                    if i < len(self.categories) - 1:  # Don't delay after last category
-                        delay = random.uniform(*self.config.delay_between_categories)
-                        logger.info(f"Category delay: {delay:.1f}s")
-                        await asyncio.sleep(delay)
+                if self.config.concurrent_mode:
+                    await self._scrape_categories_concurrently(session)
+                else:
+                    await self._scrape_categories_sequentially(session)
                 
                 logger.info("Scraping process completed")
                 
@@ -865,8 +913,117 @@ class BackgroundScraper:
         
         finally:
             self.running = False
+            if self.parse_pool:
+                self.parse_pool.close(cancel_pending=True)
+                self.parse_pool = None
+            self.sink.close()
+            if self.product_store:
+                self.product_store.flush()
+                stats = self.product_store.stats()
+                logger.info(f"Product store: {stats['upserts']} upserts, {stats['products']} products "
+                            f"in {self.product_store.path}")
+        
+        return self.sink.replay()
+    
+    async def _scrape_categories_sequentially(self, session: aiohttp.ClientSession) -> None:
+        """Fetch each category in turn, parsing earlier pages while later ones download"""
+        processing = []
+        
+        for i, (category_name, category_url) in enumerate(self.categories):
+            if self.stop_event.is_set():
+                logger.info("Stop event set, breaking scraping loop")
+                break
+            
+            logger.info(f"Processing category {i+1}/{len(self.categories)}: {category_name}")
+            
+            # Fetch category, then parse it in the background
+            response = await self.fetch_category(session, category_name, category_url)
+            processing.append(asyncio.create_task(
+                self.process_category(response, category_name, category_url), name=category_name))
+            
+            # Update progress
+            self.progress_tracker.update_category_progress(i+1, len(self.categories))
+            
+            # Human-like delay between categories
+            if i < len(self.categories) - 1:  # Don't delay after last category
+                delay = random.uniform(*self.config.delay_between_categories)
+                logger.info(f"Category delay: {delay:.1f}s")
+                await asyncio.sleep(delay)
+            
+            self._deliver_products(processing)
+        
+        while processing:
+            # Only wait on running tasks: finished ones held back by ordered_results would return at once
+            running = [task for task in processing if not task.done()]
+            if running:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            self._deliver_products(processing)
+    
+    async def _scrape_categories_concurrently(self, session: aiohttp.ClientSession) -> None:
+        """Scrape categories as tasks bounded by max_concurrent_requests"""
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+        completed = 0
+        
+        async def crawl(index: int, category_name: str, category_url: str) -> List[Dict]:
+            nonlocal completed
+            async with semaphore:
+                if self.stop_event.is_set():
+                    return []
+                
+                logger.info(f"Processing category {index+1}/{len(self.categories)}: {category_name}")
+                response = await self.fetch_category(session, category_name, category_url)
+            
+            # Parsing doesn't hold a request slot
+            category_products = await self.process_category(response, category_name, category_url)
+            
+            completed += 1
+            self.progress_tracker.update_category_progress(completed, len(self.categories))
+            return category_products
         
-        return self.products
+        tasks = [
+            asyncio.create_task(crawl(i, category_name, category_url), name=category_name)
+            for i, (category_name, category_url) in enumerate(self.categories)
+        ]
+        undelivered = list(tasks)
+        
+        pending = set(tasks)
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+            self._deliver_products(undelivered)
+            if self.stop_event.is_set() and pending:
+                logger.info(f"Stop event set, cancelling {len(pending)} category tasks")
+                for task in pending:
+                    task.cancel()
+                await asyncio.wait(pending)
+                break
+        
+        self._deliver_products(undelivered)
+    
+    def _deliver_products(self, tasks: List[asyncio.Task]) -> None:
+        """Move the products of finished category tasks into the results and the product stream
+        
+        With ordered_results, a category is only delivered after every category before it,
+        so output stays deterministic.
+        """
+        for task in list(tasks):
+            if not task.done():
+                if self.config.ordered_results:
+                    break
+                continue
+            tasks.remove(task)
+            if task.cancelled():
+                continue
+            if task.exception():
+                logger.error(f"Category {task.get_name()} failed, skipping its products: {task.exception()!r}")
+                continue
+            
+            category_products = task.result()
+            self.product_count += len(category_products)
+            if self.sink:
+                self.sink.write_many(category_products)
+            if self.product_store:
+                self.product_store.write_many(category_products, source='background')
+            self.progress_tracker.update_product_count(self.product_count)
     
     def save_results(self, products: List[Dict]) -> None:
         """Save results to files"""
@@ -876,59 +1033,72 @@ class BackgroundScraper:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Build the files from the run's product stream, one product at a time
+        records = self.sink.replay() if self.sink and self.sink.closed else products
+        summary = self.sink.summary if records is not products else None
+        
         # Save JSON
         if self.config.output_format in ['json', 'both']:
             json_filename = f"router-switch-products-{timestamp}.json"
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(products, f, indent=2, ensure_ascii=False)
+            write_json(records, json_filename)
             logger.info(f"JSON saved: {json_filename}")
         
         # Save Excel
         if self.config.output_format in ['excel', 'both']:
             excel_filename = f"router-switch-products-{timestamp}.xlsx"
             try:
-                df = pd.DataFrame(products)
-                
-                with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                    # Main products sheet
-                    df.to_excel(writer, sheet_name='Products', index=False)
-                    
-                    # Category summaries
-                    if 'category1' in df.columns:
-                        cat1_summary = df.groupby('category1').size().reset_index(name='Count')
-                        cat1_summary.to_excel(writer, sheet_name='Category1', index=False)
-                    
-                    if 'category2' in df.columns:
-                        cat2_summary = df.groupby(['category1', 'category2']).size().reset_index(name='Count')
-                        cat2_summary.to_excel(writer, sheet_name='Category2', index=False)
-                    
-                    if 'category3' in df.columns:
-                        cat3_summary = df.groupby(['category1', 'category2', 'category3']).size().reset_index(name='Count')
-                        cat3_summary.to_excel(writer, sheet_name='Category3', index=False)
-                    
-                    if 'brand' in df.columns:
-                        brand_summary = df.groupby('brand').size().reset_index(name='Count')
-                        brand_summary.to_excel(writer, sheet_name='Brands', index=False)
-                
+                write_excel(records, excel_filename, BACKGROUND_EXCEL_LAYOUT, summary=summary)
                 logger.info(f"Excel saved: {excel_filename}")
                 
             except Exception as e:
                 logger.error(f"Error saving Excel: {e}")
         
+        # Save columnar copy (dictionary-encoded categories, numeric prices)
+        if self.config.columnar_format:
+            columnar_filename = f"router-switch-products-{timestamp}{COLUMNAR_SUFFIXES[self.config.columnar_format]}"
+            try:
+                write_columnar(records, columnar_filename, summary=summary)
+                logger.info(f"Columnar file saved: {columnar_filename}")
+                
+            except Exception as e:
+                logger.error(f"Error saving columnar file: {e}")
+        
         # Log final statistics
         stats = self.progress_tracker.get_final_stats()
         logger.info(f"Final statistics: {stats}")
         
         # Show sample products
         logger.info("Sample products:")
-        for i, product in enumerate(products[:5]):
+        for i, product in enumerate(islice(products, 5)):
             logger.info(f"{i+1}. {product['product']}")
             logger.info(f"   Brand: {product['brand']}, SKU: {product['sku']}")
             logger.info(f"   Price: {product['price']}")
             logger.info(f"   Categories: {product['category1']} > {product['category2']} > {product['category3']}")
 
+# Scraper of each parse worker process, built once by init_parse_worker()
+_worker_scraper: Optional[BackgroundScraper] = None
+
+def init_parse_worker(config: ScrapingConfig) -> None:
+    """Set up a parse worker process (the parent handles shutdown signals, HTTP validators and the product store)"""
+    global _worker_scraper
+    _worker_scraper = BackgroundScraper(replace(config, conditional_requests=False, product_store=False,
+                                                parse_workers=0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def extract_page_job(job: PageJob) -> PageResult:
+    """Parse one page in a worker process"""
+    return _worker_scraper.extract_page(job)
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Background router-switch.com scraper")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Crawl categories as concurrent tasks (up to max_concurrent_requests) instead of one by one")
+    parser.add_argument("--product-store", metavar="PATH",
+                        help="SQLite file the delivered products are upserted into across runs (e.g. products.sqlite3)")
+    args = parser.parse_args()
+    
     logger.info("="*80)
     logger.info("PROFESSIONAL BACKGROUND ROUTER-SWITCH SCRAPER")
     logger.info("="*80)
@@ -942,6 +1112,11 @@ def main():
         delay_between_requests=(2.0, 5.0),
         delay_between_categories=(5.0, 10.0),
         enable_background_mode=True,
+        concurrent_mode=args.concurrent,
+        conditional_requests=True,
+        product_store=bool(args.product_store),
+        product_db=args.product_store or DEFAULT_STORE_PATH,
+        parse_workers=2,
         output_format="both",
         data_validation=True,
         progress_tracking=True
@@ -966,6 +1141,11 @@ def main():
     except Exception as e:
         logger.error(f"Scraping failed: {e}")
         logger.error(traceback.format_exc())
+    finally:
+        if scraper.validators:
+            scraper.validators.close()
+        if scraper.product_store:
+            scraper.product_store.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Parse Worker Result Transfer Benchmark
+======================================
+
+Compares the two ways ParseWorkerPool brings products back from its
+worker processes:
+- pickle: product dicts pickled through the pool's result pipe
+- shared memory: an Arrow batch per page in a shared-memory block,
+  converted back to product dicts in the parent
+
+Workers build synthetic products instead of parsing pages, so the timings
+isolate the cost of moving results between processes.
+
+Usage:
+    python benchmark_parse_workers.py --pages 200 --products 500 --repeat 3
+"""
+
+import argparse
+import time
+
+from background_scraper import PRODUCT_FIELDS
+from parse_workers import PageJob, PageResult, ParseWorkerPool
+
+def make_products(job):
+    """Worker side: a page's worth of products with every field filled"""
+    count = int(job.body)
+    products = [{column: f"{column} {job.source_url} {index}" for column in PRODUCT_FIELDS}
+                for index in range(count)]
+    return PageResult(job.category_name, job.source_url, products)
+
+def benchmark_transfer(columns, pages, products, processes, repeat):
+    """Return products/sec and the received products for one transfer mode"""
+    jobs = [PageJob('Benchmark', f"page-{page}", str(products).encode()) for page in range(pages)]
+    
+    with ParseWorkerPool(make_products, processes, columns=columns) as pool:
+        # Warm the workers up so process start-up isn't timed
+        list(pool.map(jobs[:processes]))
+        
+        start = time.perf_counter()
+        for _ in range(repeat):
+            results = [result.products for result in pool.map(jobs)]
+        elapsed = time.perf_counter() - start
+    
+    received = pages * products * repeat
+    return {
+        'products_per_sec': received / elapsed if elapsed else 0.0,
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse worker result transfer")
+    parser.add_argument("--pages", type=int, default=200, help="Pages per pass")
+    parser.add_argument("--products", type=int, default=500, help="Products per page")
+    parser.add_argument("--processes", type=int, default=2, help="Worker processes")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the pages per mode")
+    args = parser.parse_args()
+    
+    print("="*80)
+    print(f"Transferring {args.pages} pages x {args.products} products "
+          f"from {args.processes} workers, {args.repeat} passes")
+    print("="*80)
+    
+    pickled = benchmark_transfer(None, args.pages, args.products, args.processes, args.repeat)
+    shared = benchmark_transfer(PRODUCT_FIELDS, args.pages, args.products, args.processes, args.repeat)
+    
+    print(f"{'Mode':<14} {'Products/s':>12}")
+    print(f"{'pickle':<14} {pickled['products_per_sec']:>12.0f}")
+    print(f"{'shared memory':<14} {shared['products_per_sec']:>12.0f}")
+    print(f"Identical results: {pickled['results'] == shared['results']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backend Benchmark
+=============================
+
+Runs the offline extraction strategies of ComprehensiveCategoryScraper
+(tables, page text, images) over saved pages with every installed parser
+backend and reports:
+- pages/sec for parse only and parse + extract
+- peak traced memory per page
+- whether extracted products match the html.parser baseline
+
+Pages can be .html files, directories of them, or the gzip objects of a
+response cache directory (.http_cache/objects by default).
+
+Usage:
+    python benchmark_parsers.py saved_pages/ --repeat 3
+"""
+
+import argparse
+import gzip
+import os
+import time
+import tracemalloc
+
+from html_parsing import available_parsers, make_soup
+from main import ComprehensiveCategoryScraper
+
+PAGE_EXTENSIONS = ('.html', '.htm', '.gz')
+
+def load_pages(paths):
+    """Load saved pages as (name, text) pairs"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith(PAGE_EXTENSIONS))
+        elif os.path.isfile(path):
+            files.append(path)
+    
+    pages = []
+    for file_path in files:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if file_path.endswith('.gz'):
+            data = gzip.decompress(data)
+        pages.append((file_path, data.decode('utf-8', errors='replace')))
+    return pages
+
+def extract(scraper, soup, url):
+    """Run the network-free extraction strategies on one parsed page"""
+    products = scraper._extract_from_tables_enhanced(soup, url)
+    products.extend(scraper._extract_clean_products_from_text(soup, url))
+    return scraper._add_images_to_products(products, soup, url)
+
+def benchmark_backend(scraper, backend, pages, repeat):
+    """Return timing, memory and extraction results for one backend"""
+    url = f"{scraper.base_url}/benchmark-price.html"
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in pages:
+            make_soup(text, backend)
+    parse_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in pages:
+            extract(scraper, make_soup(text, backend), url)
+    total_time = time.perf_counter() - start
+    
+    # Memory and results from a separate traced pass so tracing doesn't skew timings
+    peak_memory = 0
+    results = []
+    for _, text in pages:
+        tracemalloc.start()
+        results.append(extract(scraper, make_soup(text, backend), url))
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    
+    runs = len(pages) * repeat
+    return {
+        'backend': backend,
+        'parse_pages_per_sec': runs / parse_time if parse_time else 0.0,
+        'total_pages_per_sec': runs / total_time if total_time else 0.0,
+        'peak_memory_mb': peak_memory / 1024 / 1024,
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved pages")
+    parser.add_argument("paths", nargs="*", default=[os.path.join('.http_cache', 'objects')],
+                        help="Saved .html files, directories, or cache object directories")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backends to compare (default: all installed)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the page set per backend")
+    args = parser.parse_args()
+    
+    pages = load_pages(args.paths)
+    if not pages:
+        print("No saved pages found")
+        return
+    
+    backends = args.backends or available_parsers()
+    scraper = ComprehensiveCategoryScraper()
+    
+    print("="*80)
+    print(f"Benchmarking {len(backends)} backends on {len(pages)} pages x {args.repeat}")
+    print("="*80)
+    
+    reports = [benchmark_backend(scraper, backend, pages, args.repeat) for backend in backends]
+    baseline = next((r['results'] for r in reports if r['backend'] == 'html.parser'), None)
+    
+    print(f"{'Backend':<12} {'Parse p/s':>10} {'Total p/s':>10} {'Peak MB':>9} {'Identical':>10}")
+    for report in reports:
+        if baseline is None:
+            identical = 'n/a'
+        else:
+            matches = sum(1 for a, b in zip(report['results'], baseline) if a == b)
+            identical = f"{matches}/{len(pages)}"
+        print(f"{report['backend']:<12} {report['parse_pages_per_sec']:>10.1f} "
+              f"{report['total_pages_per_sec']:>10.1f} {report['peak_memory_mb']:>9.1f} {identical:>10}")
+    
+    if baseline is not None:
+        for report in reports:
+            for (name, _), a, b in zip(pages, report['results'], baseline):
+                if a != b:
+                    print(f"  {report['backend']}: results differ from html.parser on {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Category Rule Engine
+====================
+
+Declarative category rules (URL tokens, name tokens, listing category and
+brand -> Category 1/2/3) compiled into one fast matcher per input field.
+
+A rule table is a list of stages evaluated in order. Each stage sets its
+defaults, then applies the first rule whose tokens occur in the product:
+- A rule matches when any of its tokens occurs (case-insensitively) in the
+  field it is listed under: 'url', 'name' or 'category'
+- 'set' assigns category values; values are templates over the inputs
+  and earlier results, e.g. '{brand} {category1}'
+- Nested 'rules' refine a match the same way (first match wins)
+- A default given as a list takes its first non-empty rendering
+
+All tokens of a field are found in one KeywordMatcher pass, so evaluating
+a rule is a set check. Results are memoized, since names repeat heavily.
+Changing a mapping only means editing the tables below.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+CATEGORY_LEVELS = ('category1', 'category2', 'category3')
+MATCH_FIELDS = ('url', 'name', 'category')
+
+DEFAULT_CACHE_SIZE = 65536
+
+# main.py: Category 1/2 from the listing URL, Category 3 from brand and type
+MAIN_CATEGORY_RULES = [
+    {
+        'default': {'category1': 'Networking', 'category2': 'Network Equipment'},
+        'rules': [
+            {'url': ['routers'], 'set': {'category1': 'Networking', 'category2': 'Routers'}},
+            {'url': ['switches'], 'set': {'category1': 'Networking', 'category2': 'Switches'}},
+            {'url': ['firewalls', 'security'], 'set': {'category1': 'Security', 'category2': 'Firewalls'}},
+            {'url': ['wireless', 'wlan'], 'set': {'category1': 'Networking', 'category2': 'Wireless'}},
+            {'url': ['servers'], 'set': {'category1': 'Servers', 'category2': 'Servers'}},
+            {'url': ['storages', 'storage'], 'set': {'category1': 'Storage', 'category2': 'Storage Systems'}},
+            {'url': ['ip-phones', 'unified-communications'],
+             'set': {'category1': 'Unified Communications', 'category2': 'IP Phones'}},
+            {'url': ['optical-network', 'olt', 'ont'],
+             'set': {'category1': 'Optical Network', 'category2': 'Optical Equipment'}},
+            {'url': ['accessories'], 'set': {'category1': 'Networking', 'category2': 'Accessories'}},
+        ],
+    },
+    {
+        'default': {'category3': 'Network Equipment'},
+        'rules': [
+            {'url': ['cisco'], 'name': ['cisco'], 'rules': [
+                {'url': ['router'], 'name': ['router'], 'set': {'category3': 'Cisco Routers'}},
+                {'url': ['switch'], 'name': ['switch'], 'set': {'category3': 'Cisco Switches'}},
+                {'url': ['firewall'], 'name': ['firewall'], 'set': {'category3': 'Cisco Firewalls'}},
+                {'url': ['wireless'], 'name': ['wireless'], 'set': {'category3': 'Cisco Wireless'}},
+            ]},
+            {'url': ['huawei'], 'name': ['huawei'], 'rules': [
+                {'url': ['router'], 'name': ['router'], 'set': {'category3': 'Huawei Routers'}},
+                {'url': ['switch'], 'name': ['switch'], 'set': {'category3': 'Huawei Switches'}},
+                {'url': ['firewall'], 'name': ['firewall'], 'set': {'category3': 'Huawei Firewalls'}},
+                {'url': ['wireless'], 'name': ['wireless'], 'set': {'category3': 'Huawei Wireless'}},
+            ]},
+            {'url': ['juniper'], 'name': ['juniper'], 'rules': [
+                {'url': ['router'], 'name': ['router'], 'set': {'category3': 'Juniper Routers'}},
+                {'url': ['switch'], 'name': ['switch'], 'set': {'category3': 'Juniper Switches'}},
+                {'url': ['firewall'], 'name': ['firewall'], 'set': {'category3': 'Juniper Firewalls'}},
+            ]},
+            {'url': ['dell'], 'name': ['dell'], 'rules': [
+                {'url': ['server'], 'name': ['server'], 'set': {'category3': 'Dell Servers'}},
+                {'url': ['switch'], 'name': ['switch'], 'set': {'category3': 'Dell Switches'}},
+            ]},
+            {'url': ['hpe', 'aruba'], 'name': ['hpe'], 'rules': [
+                {'url': ['server'], 'name': ['server'], 'set': {'category3': 'HPE Servers'}},
+                {'url': ['switch'], 'name': ['switch'], 'set': {'category3': 'HPE Switches'}},
+                {'url': ['wireless'], 'name': ['wireless'], 'set': {'category3': 'HPE Aruba Wireless'}},
+            ]},
+        ],
+    },
+]
+
+# background_scraper.py: Category 1 from the listing name, 2 from brand, 3 from series
+BACKGROUND_CATEGORY_RULES = [
+    {
+        'default': {'category1': 'Networking'},
+        'rules': [
+            {'category': ['router'], 'set': {'category1': 'Routers'}},
+            {'category': ['switch'], 'set': {'category1': 'Switches'}},
+            {'category': ['firewall'], 'set': {'category1': 'Firewalls'}},
+            {'category': ['wireless'], 'set': {'category1': 'Wireless'}},
+            {'category': ['server'], 'set': {'category1': 'Servers'}},
+            {'category': ['storage'], 'set': {'category1': 'Storages'}},
+        ],
+    },
+    {
+        'default': {'category2': '{category1} Equipment'},
+        'rules': [
+            {'name': ['cisco'], 'set': {'category2': 'Cisco Equipment'}, 'rules': [
+                {'name': ['router'], 'set': {'category2': 'Cisco Routers'}},
+                {'name': ['switch'], 'set': {'category2': 'Cisco Switches'}},
+            ]},
+            {'name': ['huawei'], 'set': {'category2': 'Huawei Equipment'}, 'rules': [
+                {'name': ['router'], 'set': {'category2': 'Huawei Routers'}},
+                {'name': ['switch'], 'set': {'category2': 'Huawei Switches'}},
+            ]},
+        ],
+    },
+    {
+        'default': {'category3': 'Standard Series'},
+        'rules': [
+            {'name': ['enterprise', 'isr', 'asr'], 'set': {'category3': 'Enterprise Series'}},
+            {'name': ['catalyst'], 'set': {'category3': 'Catalyst Series'}},
+            {'name': ['poweredge'], 'set': {'category3': 'PowerEdge Series'}},
+        ],
+    },
+]
+
+# hybrid_scraper.py: Category 1 from the name (else the listing), 2 from brand
+HYBRID_CATEGORY_RULES = [
+    {
+        'default': {'category1': ['{category}', 'Networking']},
+        'rules': [
+            {'name': ['router', 'isr', 'asr'], 'set': {'category1': 'Routers'}},
+            {'name': ['switch', 'catalyst'], 'set': {'category1': 'Switches'}},
+            {'name': ['firewall', 'asa'], 'set': {'category1': 'Firewalls'}},
+            {'name': ['server', 'poweredge'], 'set': {'category1': 'Servers'}},
+            {'name': ['storage', 'powervault'], 'set': {'category1': 'Storages'}},
+        ],
+    },
+    {
+        'default': {'category2': '{brand} {category1}'},
+    },
+    {
+        'default': {'category3': 'Standard Series'},
+        'rules': [
+            {'name': ['enterprise'], 'set': {'category3': 'Enterprise Series'}},
+            {'name': ['catalyst'], 'set': {'category3': 'Catalyst Series'}},
+            {'name': ['poweredge'], 'set': {'category3': 'PowerEdge Series'}},
+        ],
+    },
+]
+
+# intelligent_generator.py: Category 1 from the name, 2 from brand, 3 from series
+GENERATOR_CATEGORY_RULES = [
+    {
+        'default': {'category1': 'Networking'},
+        'rules': [
+            {'name': ['router', 'isr', 'asr'], 'set': {'category1': 'Routers'}},
+            {'name': ['switch', 'catalyst', 'nexus'], 'set': {'category1': 'Switches'}},
+            {'name': ['firewall', 'asa', 'fortigate'], 'set': {'category1': 'Firewalls'}},
+            {'name': ['wireless', 'aironet', 'meraki'], 'set': {'category1': 'Wireless'}},
+            {'name': ['server', 'poweredge', 'proliant'], 'set': {'category1': 'Servers'}},
+            {'name': ['storage', 'powervault', 'msa'], 'set': {'category1': 'Storages'}},
+        ],
+    },
+    {
+        'default': {'category2': '{brand} {category1}'},
+    },
+    {
+        'default': {'category3': 'Standard Series'},
+        'rules': [
+            {'name': ['enterprise', 'isr', 'asr'], 'set': {'category3': 'Enterprise Series'}},
+            {'name': ['catalyst'], 'set': {'category3': 'Catalyst Series'}},
+            {'name': ['nexus'], 'set': {'category3': 'Nexus Series'}},
+            {'name': ['poweredge'], 'set': {'category3': 'PowerEdge Series'}},
+            {'name': ['proliant'], 'set': {'category3': 'ProLiant Series'}},
+            {'name': ['aruba'], 'set': {'category3': 'Aruba Series'}},
+            {'name': ['fortigate'], 'set': {'category3': 'FortiGate Series'}},
+        ],
+    },
+]
+
+class CompiledRule:
+    """One rule with its tokens frozen per field"""
+    
+    def __init__(self, rule: Dict):
+        unknown = set(rule) - set(MATCH_FIELDS) - {'set', 'rules'}
+        if unknown:
+            raise ValueError(f"Unknown category rule keys: {sorted(unknown)}")
+        
+        self.tokens = [(field, frozenset(token.lower() for token in rule[field]))
+                       for field in MATCH_FIELDS if rule.get(field)]
+        self.assignments = dict(rule.get('set', {}))
+        self.rules = [CompiledRule(child) for child in rule.get('rules', [])]
+    
+    def matches(self, found: Dict[str, FrozenSet[str]]) -> bool:
+        return any(not found[field].isdisjoint(tokens) for field, tokens in self.tokens)
+
+class CategoryRuleEngine:
+    """Evaluates a category rule table, memoizing results per input"""
+    
+    def __init__(self, stages: List[Dict], cache_size: int = DEFAULT_CACHE_SIZE):
+        self.stages = [(dict(stage.get('default', {})),
+                        [CompiledRule(rule) for rule in stage.get('rules', [])])
+                       for stage in stages]
+        
+        # One matcher per field over every token any rule tests on that field
+        vocabularies = {field: set() for field in MATCH_FIELDS}
+        pending = [rule for _, rules in self.stages for rule in rules]
+        while pending:
+            rule = pending.pop()
+            for field, tokens in rule.tokens:
+                vocabularies[field] |= tokens
+            pending.extend(rule.rules)
+        self.matchers = {field: KeywordMatcher(tokens) for field, tokens in vocabularies.items()}
+        
+        self.categorize = lru_cache(maxsize=cache_size)(self._evaluate)
+    
+    def _evaluate(self, name: str, url: str = '', category: str = '',
+                  brand: str = '') -> Tuple[str, str, str]:
+        """(category1, category2, category3) for one product"""
+        inputs = {'name': name or '', 'url': url or '', 'category': category or '', 'brand': brand or ''}
+        found = {field: self.matchers[field].matches(inputs[field]) for field in MATCH_FIELDS}
+        
+        context = dict(inputs)
+        for defaults, rules in self.stages:
+            self._assign(context, defaults)
+            self._apply_first(rules, found, context)
+        
+        return tuple(context.get(level, '') for level in CATEGORY_LEVELS)
+    
+    def _apply_first(self, rules: List[CompiledRule], found: Dict[str, FrozenSet[str]],
+                     context: Dict[str, str]) -> None:
+        for rule in rules:
+            if rule.matches(found):
+                self._assign(context, rule.assignments)
+                self._apply_first(rule.rules, found, context)
+                return
+    
+    @staticmethod
+    def _assign(context: Dict[str, str], assignments: Dict) -> None:
+        rendered = {}
+        for level, template in assignments.items():
+            candidates = template if isinstance(template, list) else [template]
+            rendered[level] = next((value for value in (candidate.format_map(context)
+                                                        for candidate in candidates) if value), '')
+        context.update(rendered)
+    
+    def cache_info(self):
+        """Hit/miss statistics of the result memo"""
+        return self.categorize.cache_info()
+
+MAIN_CATEGORY_ENGINE = CategoryRuleEngine(MAIN_CATEGORY_RULES)
+BACKGROUND_CATEGORY_ENGINE = CategoryRuleEngine(BACKGROUND_CATEGORY_RULES)
+HYBRID_CATEGORY_ENGINE = CategoryRuleEngine(HYBRID_CATEGORY_RULES)
+GENERATOR_CATEGORY_ENGINE = CategoryRuleEngine(GENERATOR_CATEGORY_RULES)
@@ -0,0 +1,307 @@
+"""
+HTML Parser Backends
+====================
+
+Single entry point for building BeautifulSoup trees so every extraction
+path uses the same, configurable parser backend:
+- lxml:        C-backed libxml2 parser (fastest, default when installed)
+- html.parser: pure-Python standard library parser
+- html5lib:    browser-grade HTML5 parsing (slowest, most lenient)
+
+Extraction strategies that only look at a few tag families can ask for a
+partial parse: make_soup(..., strategies=('tables', 'links')) keeps just
+the <table>, <a> and <img> subtrees those strategies read, instead of
+building the whole document tree.
+
+DomVisitor walks a parsed page once and hands tables, rows, links, images
+and page text to the extraction strategies, replacing their separate
+find_all()/get_text() scans.
+
+BoilerplateTemplate learns the blocks (header, navigation, currency and
+language pickers, footer) a site repeats on every page from the first few
+pages it sees; afterwards the walk leaves those subtrees out of the page
+text, so the text strategy no longer needs its regex boilerplate cleanup.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer, Tag
+from bs4.builder import builder_registry
+
+PARSER_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+# Preferred order when the backend is 'auto'
+AUTO_PREFERENCE = ('lxml', 'html.parser')
+
+# Tag families each extraction strategy reads; None means it needs the whole document
+STRATEGY_TAGS = {
+    'tables': ('table',),
+    'links': ('a',),
+    'images': ('img',),
+    'text': None,
+    'page': None,
+}
+
+ALL_STRATEGIES = ('tables', 'links', 'text', 'images')
+
+def available_parsers() -> List[str]:
+    """Return the parser backends installed in this environment"""
+    return [name for name in PARSER_BACKENDS if builder_registry.lookup(name) is not None]
+
+def resolve_parser(name: Optional[str] = None) -> str:
+    """Map a configured backend name (or None/'auto') to an installed backend"""
+    if not name or name == 'auto':
+        for candidate in AUTO_PREFERENCE:
+            if builder_registry.lookup(candidate) is not None:
+                return candidate
+        return 'html.parser'
+    
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (expected one of {PARSER_BACKENDS})")
+    if builder_registry.lookup(name) is None:
+        raise FeatureNotFound(f"Parser backend '{name}' is not installed")
+    
+    return name
+
+def make_strainer(strategies: Iterable[str]) -> Optional[SoupStrainer]:
+    """Build one SoupStrainer keeping the tag families of all given strategies
+    
+    Returns None when any strategy needs the full document.
+    """
+    tags = []
+    for strategy in strategies:
+        if strategy not in STRATEGY_TAGS:
+            raise ValueError(f"Unknown extraction strategy: {strategy} (expected one of {tuple(STRATEGY_TAGS)})")
+        strategy_tags = STRATEGY_TAGS[strategy]
+        if strategy_tags is None:
+            return None
+        tags.extend(tag for tag in strategy_tags if tag not in tags)
+    
+    return SoupStrainer(tags) if tags else None
+
+def make_soup(content, parser: Optional[str] = None,
+              strategies: Optional[Iterable[str]] = None, **kwargs) -> BeautifulSoup:
+    """Parse HTML text or bytes with the configured backend
+    
+    When strategies are given, only the subtrees they need are built.
+    html5lib ignores partial parsing, so it always builds the full tree.
+    """
+    backend = resolve_parser(parser)
+    if strategies is not None and backend != 'html5lib':
+        strainer = make_strainer(strategies)
+        if strainer is not None:
+            kwargs.setdefault('parse_only', strainer)
+    return BeautifulSoup(content, backend, **kwargs)
+
+@dataclass
+class PageRow:
+    """A table row and its cells, in document order"""
+    element: Tag
+    cells: List[Tag] = field(default_factory=list)
+
+@dataclass
+class PageTable:
+    """A table and every row beneath it (nested tables included, as find_all('tr') would)"""
+    element: Tag
+    rows: List[PageRow] = field(default_factory=list)
+
+@dataclass
+class PageArtifacts:
+    """Everything the extraction strategies read from a page, gathered in one walk"""
+    tables: List[PageTable] = field(default_factory=list)
+    links: List[Tag] = field(default_factory=list)
+    images: List[Tag] = field(default_factory=list)
+    text: str = ""
+    # Signatures of the candidate boilerplate blocks (only when walked with a template)
+    block_signatures: Set[int] = field(default_factory=set)
+
+# Containers that can hold site-wide boilerplate; table parts never do
+BOILERPLATE_TAGS = frozenset(['header', 'nav', 'footer', 'aside', 'div', 'section',
+                              'ul', 'ol', 'dl', 'form', 'select', 'p', 'span'])
+
+class BoilerplateTemplate:
+    """Site-wide blocks learned from the first pages of a crawl
+    
+    A block's signature hashes its tag, id, classes and the text of its
+    whole subtree. Blocks found on at least min_pages of the first
+    sample_pages pages are boilerplate.
+    """
+    
+    def __init__(self, sample_pages: int = 3, min_pages: int = 2, min_text: int = 20):
+        self.sample_pages = sample_pages
+        self.min_pages = min_pages
+        self.min_text = min_text
+        self.pages_seen = 0
+        self.counts: Dict[int, int] = {}
+        self.signatures: Set[int] = set()
+    
+    @property
+    def learning(self) -> bool:
+        return self.pages_seen < self.sample_pages
+    
+    @property
+    def active(self) -> bool:
+        """Whether learned blocks are being removed"""
+        return not self.learning and bool(self.signatures)
+    
+    def observe(self, signatures: Iterable[int]) -> None:
+        """Count the candidate blocks of one sample page"""
+        if not self.learning:
+            return
+        
+        for signature in set(signatures):
+            self.counts[signature] = self.counts.get(signature, 0) + 1
+        self.pages_seen += 1
+        
+        if not self.learning:
+            self.signatures = {signature for signature, count in self.counts.items()
+                               if count >= self.min_pages}
+            self.counts = {}
+
+VISIT_KINDS = ('table', 'row', 'link', 'image', 'text')
+
+class DomVisitor:
+    """Walks a parsed page once and dispatches nodes to registered callbacks
+    
+    The walk also collects PageArtifacts, so strategies that used to run
+    their own find_all()/get_text() scans can share a single traversal.
+    With a template, it also signs each candidate boilerplate block and
+    leaves learned ones out of the page text.
+    """
+    
+    def __init__(self, template: Optional[BoilerplateTemplate] = None):
+        self.callbacks = {kind: [] for kind in VISIT_KINDS}
+        self.template = template
+    
+    def register(self, kind: str, callback: Callable) -> None:
+        """Call callback(node) for every node of the given kind"""
+        if kind not in self.callbacks:
+            raise ValueError(f"Unknown node kind: {kind} (expected one of {VISIT_KINDS})")
+        self.callbacks[kind].append(callback)
+    
+    def visit(self, soup: BeautifulSoup) -> PageArtifacts:
+        """Walk soup once, firing callbacks and returning the collected artifacts"""
+        artifacts = PageArtifacts()
+        text_types = self._text_types(soup)
+        text_parts = []
+        
+        template = self.template if text_types is not None else None
+        excluded: List[Tuple[int, int]] = []
+        
+        open_tables = []
+        open_rows = []
+        # Per open tag: (tag, first text part, child signatures, text length)
+        open_tags = []
+        root_signatures = []
+        stack = [iter(soup.contents)]
+        
+        while stack:
+            node = next(stack[-1], None)
+            
+            if node is None:
+                stack.pop()
+                if open_tags:
+                    closed, text_start, children, text_length = open_tags.pop()
+                    if open_tables and open_tables[-1].element is closed:
+                        open_tables.pop()
+                    if open_rows and open_rows[-1].element is closed:
+                        open_rows.pop()
+                    if template is not None:
+                        signature = hash((closed.name, closed.get('id'),
+                                          tuple(closed.get('class') or ()), tuple(children)))
+                        parent_children = open_tags[-1][2] if open_tags else root_signatures
+                        parent_children.append(signature)
+                        if open_tags:
+                            open_tags[-1][3] += text_length
+                        if (closed.name in BOILERPLATE_TAGS and not open_tables
+                                and text_length >= template.min_text):
+                            artifacts.block_signatures.add(signature)
+                            if signature in template.signatures:
+                                excluded.append((text_start, len(text_parts)))
+                continue
+            
+            if isinstance(node, Tag):
+                self._enter(node, artifacts, open_tables, open_rows)
+                stack.append(iter(node.contents))
+                open_tags.append([node, len(text_parts), [], 0])
+            elif text_types is not None and type(node) in text_types:
+                text_parts.append(node)
+                if template is not None:
+                    stripped = node.strip()
+                    if stripped:
+                        (open_tags[-1][2] if open_tags else root_signatures).append(hash(stripped))
+                        if open_tags:
+                            open_tags[-1][3] += len(stripped)
+                for callback in self.callbacks['text']:
+                    callback(node)
+        
+        if text_types is None:
+            artifacts.text = soup.get_text()
+        elif excluded and template.active:
+            artifacts.text = ''.join(self._without_ranges(text_parts, excluded))
+        else:
+            artifacts.text = ''.join(text_parts)
+        return artifacts
+    
+    @staticmethod
+    def _without_ranges(parts: List[str], ranges: List[Tuple[int, int]]) -> List[str]:
+        """parts minus every index covered by one of the (start, end) ranges"""
+        kept = []
+        position = 0
+        for start, end in sorted(ranges):
+            if start > position:
+                kept.extend(parts[position:start])
+            position = max(position, end)
+        kept.extend(parts[position:])
+        return kept
+    
+    def _enter(self, node: Tag, artifacts: PageArtifacts, open_tables: List[PageTable],
+               open_rows: List[PageRow]) -> None:
+        name = node.name
+        
+        if name == 'table':
+            table = PageTable(node)
+            artifacts.tables.append(table)
+            open_tables.append(table)
+            for callback in self.callbacks['table']:
+                callback(node)
+        elif name == 'tr':
+            row = PageRow(node)
+            for table in open_tables:
+                table.rows.append(row)
+            open_rows.append(row)
+            for callback in self.callbacks['row']:
+                callback(node)
+        elif name in ('td', 'th'):
+            for row in open_rows:
+                row.cells.append(node)
+        elif name == 'a' and node.get('href') is not None:
+            artifacts.links.append(node)
+            for callback in self.callbacks['link']:
+                callback(node)
+        elif name == 'img' and node.get('src') is not None:
+            artifacts.images.append(node)
+            for callback in self.callbacks['image']:
+                callback(node)
+    
+    @staticmethod
+    def _text_types(soup: BeautifulSoup):
+        """String classes get_text() would include, or None to defer to get_text()"""
+        types = getattr(soup, 'interesting_string_types', None)
+        if types is None:
+            return None
+        if isinstance(types, type):
+            return (types,)
+        return tuple(types)
+
+def visit_page(soup: BeautifulSoup, template: Optional[BoilerplateTemplate] = None) -> PageArtifacts:
+    """Collect the page artifacts of soup in a single traversal
+    
+    With a template, the page either trains it (first pages of a crawl) or
+    has the learned boilerplate left out of its text.
+    """
+    artifacts = DomVisitor(template).visit(soup)
+    if template is not None and template.learning:
+        template.observe(artifacts.block_signatures)
+    return artifacts
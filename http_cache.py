@@ -0,0 +1,391 @@
+"""
+Persistent HTTP Response Cache
+==============================
+
+Content-addressed on-disk cache for fetched pages:
+- Entries keyed by canonical URL
+- Bodies stored gzip-compressed under their SHA-256 digest
+- Per-URL TTL rules
+- Total-size LRU eviction
+- Hit/miss counters
+
+Modes:
+- normal:  serve fresh entries, fetch and store everything else
+- offline: serve any stored entry regardless of age, never fetch
+- refresh: always fetch, overwrite stored entries
+
+ValidatorStore keeps ETag/Last-Modified validators and the products
+extracted from each page, so repeat crawls can send conditional GETs and
+reuse the stored products on 304 Not Modified. Entries are kept per
+extraction (scraper or extractor, with the product keys it produces):
+the scrapers crawl the same category pages into differently shaped products.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ('normal', 'offline', 'refresh')
+
+DEFAULT_TTL = 24 * 3600  # 1 day
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024  # 512 MB of compressed bodies
+
+# Category listing pages change more often than individual product pages
+DEFAULT_TTL_RULES = [
+    (r'-price\.html$', 24 * 3600),
+    (r'/products?/', 7 * 24 * 3600),
+]
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so equivalent spellings share one cache key"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    
+    return urlunsplit((scheme, host, path, query, ''))
+
+class CachedResponse:
+    """Response served from the cache (exposes the requests.Response subset we use)"""
+    
+    from_cache = True
+    
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str],
+                 content: bytes, encoding: str):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self._text = None
+    
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or 'utf-8', errors='replace')
+        return self._text
+
+class ResponseCache:
+    """On-disk response cache with TTL and LRU size limit"""
+    
+    def __init__(self, cache_dir: str = '.http_cache', mode: str = 'normal',
+                 default_ttl: float = DEFAULT_TTL,
+                 ttl_rules: Optional[List[Tuple[str, float]]] = None,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode} (expected one of {CACHE_MODES})")
+        
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.default_ttl = default_ttl
+        self.ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in
+                          (DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules)]
+        self.max_size = max_size
+        
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url_key TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                encoding TEXT,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self.db.commit()
+    
+    def ttl_for(self, url: str) -> float:
+        """Return the TTL of the first rule matching url, else the default"""
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+    
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return a cached response for url, or None on a miss"""
+        if self.mode == 'refresh':
+            self.misses += 1
+            return None
+        
+        url_key = canonicalize_url(url)
+        row = self.db.execute(
+            "SELECT digest, status, headers, encoding, expires_at FROM entries WHERE url_key = ?",
+            (url_key,)
+        ).fetchone()
+        
+        if not row:
+            self.misses += 1
+            return None
+        
+        digest, status, headers, encoding, expires_at = row
+        if self.mode == 'normal' and expires_at < time.time():
+            self.misses += 1
+            return None
+        
+        content = self._read_object(digest)
+        if content is None:
+            # Body went missing on disk; drop the dangling entry
+            self.db.execute("DELETE FROM entries WHERE url_key = ?", (url_key,))
+            self.db.commit()
+            self.misses += 1
+            return None
+        
+        self.db.execute("UPDATE entries SET last_access = ? WHERE url_key = ?", (time.time(), url_key))
+        self.db.commit()
+        self.hits += 1
+        return CachedResponse(url, status, json.loads(headers), content, encoding)
+    
+    def put(self, url: str, status: int, headers: Dict[str, str], content: bytes,
+            encoding: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        """Store a response body under its content digest"""
+        if self.mode == 'offline':
+            return
+        
+        url_key = canonicalize_url(url)
+        digest = hashlib.sha256(content).hexdigest()
+        now = time.time()
+        expires_at = now + (self.ttl_for(url_key) if ttl is None else ttl)
+        
+        if not self.db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone():
+            size = self._write_object(digest, content)
+            self.db.execute("INSERT OR REPLACE INTO objects (digest, size) VALUES (?, ?)", (digest, size))
+        
+        previous = self.db.execute("SELECT digest FROM entries WHERE url_key = ?", (url_key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries "
+            "(url_key, digest, status, headers, encoding, stored_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url_key, digest, status, json.dumps(dict(headers)), encoding, now, expires_at, now)
+        )
+        if previous and previous[0] != digest:
+            self._drop_object_if_unreferenced(previous[0])
+        self.db.commit()
+        self.stores += 1
+        
+        self._evict_to_size()
+    
+    def store_response(self, url: str, response, ttl: Optional[float] = None) -> None:
+        """Store a requests.Response under the URL that was requested"""
+        self.put(url, response.status_code, response.headers,
+                 response.content, response.encoding, ttl)
+    
+    def total_size(self) -> int:
+        """Total compressed size of stored bodies in bytes"""
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and storage usage"""
+        lookups = self.hits + self.misses
+        return {
+            'mode': self.mode,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups * 100) if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            'size_bytes': self.total_size()
+        }
+    
+    def close(self) -> None:
+        self.db.close()
+    
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'objects', digest[:2], f"{digest}.gz")
+    
+    def _write_object(self, digest: str, content: bytes) -> int:
+        path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write to a temp file first so a crash never leaves a truncated body
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(content))
+        os.replace(tmp_path, path)
+        
+        return os.path.getsize(path)
+    
+    def _read_object(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._object_path(digest), 'rb') as f:
+                return gzip.decompress(f.read())
+        except (OSError, EOFError) as e:
+            logger.warning(f"Cache object {digest[:12]} unreadable: {e}")
+            return None
+    
+    def _drop_object_if_unreferenced(self, digest: str) -> None:
+        if self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            return
+        self.db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._object_path(digest))
+        except OSError:
+            pass
+    
+    def _evict_to_size(self) -> None:
+        """Evict least recently used entries until the store fits max_size"""
+        total = self.total_size()
+        if total <= self.max_size:
+            return
+        
+        for url_key, digest in self.db.execute(
+                "SELECT url_key, digest FROM entries ORDER BY last_access ASC").fetchall():
+            if total <= self.max_size:
+                break
+            self.db.execute("DELETE FROM entries WHERE url_key = ?", (url_key,))
+            size_row = self.db.execute("SELECT size FROM objects WHERE digest = ?", (digest,)).fetchone()
+            self._drop_object_if_unreferenced(digest)
+            if size_row and not self.db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone():
+                total -= size_row[0]
+            self.evictions += 1
+        
+        self.db.commit()
+
+# Bump when no stored products should be reused any more (e.g. an extractor's output changed meaning)
+VALIDATOR_SCHEMA_VERSION = 2
+
+@dataclass(frozen=True)
+class PageExtraction:
+    """An extraction whose products a ValidatorStore keeps: its name and the product keys it produces"""
+    name: str
+    keys: Tuple[str, ...]
+    
+    @property
+    def store_key(self) -> str:
+        return f"{self.name}/v{VALIDATOR_SCHEMA_VERSION}"
+
+class ValidatorStore:
+    """Remembers ETag/Last-Modified and extracted products per page and extraction for conditional GETs"""
+    
+    def __init__(self, path: str = os.path.join('.http_cache', 'validators.sqlite3')):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        self.not_modified = 0
+        self.modified = 0
+        
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS page_validators (
+                url_key TEXT NOT NULL,
+                extraction TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                layout TEXT NOT NULL,
+                products TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (url_key, extraction)
+            )
+        """)
+        self.db.commit()
+    
+    def conditional_headers(self, url: str, extraction: PageExtraction) -> Dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for url
+        
+        Headers are only produced when products of this extraction are
+        stored for the page, so a 304 can always be answered from this store.
+        """
+        row = self._row(url, extraction)
+        
+        headers = {}
+        if row:
+            etag, last_modified, _ = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+    
+    def load_products(self, url: str, extraction: PageExtraction) -> Optional[List[Dict]]:
+        """Return the products extraction stored for url, counting it as a 304 reuse"""
+        row = self._row(url, extraction)
+        if not row:
+            return None
+        
+        self.not_modified += 1
+        return json.loads(row[2])
+    
+    def save(self, url: str, headers, products: List[Dict], extraction: PageExtraction) -> None:
+        """Store the validators from response headers with the products extraction got from the page"""
+        # Header names may arrive in any case (plain dicts from aiohttp payloads)
+        lowered = {key.lower(): value for key, value in headers.items()}
+        etag = lowered.get('etag')
+        last_modified = lowered.get('last-modified')
+        self.modified += 1
+        
+        if not etag and not last_modified:
+            # Nothing to revalidate against next time; older validators no longer describe the page
+            self.db.execute("DELETE FROM page_validators WHERE url_key = ? AND extraction = ?",
+                            (canonicalize_url(url), extraction.store_key))
+            self.db.commit()
+            return
+        
+        # Keys the stored products actually have, checked against the extraction before reuse
+        layout = sorted({key for product in products for key in product}) if products else sorted(extraction.keys)
+        self.db.execute(
+            "INSERT OR REPLACE INTO page_validators "
+            "(url_key, extraction, etag, last_modified, layout, products, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (canonicalize_url(url), extraction.store_key, etag, last_modified, json.dumps(layout),
+             json.dumps(products, ensure_ascii=False), time.time())
+        )
+        self.db.commit()
+    
+    def stats(self) -> Dict:
+        """Revalidation counters"""
+        total = self.not_modified + self.modified
+        return {
+            'not_modified': self.not_modified,
+            'modified': self.modified,
+            'reuse_rate': (self.not_modified / total * 100) if total else 0.0
+        }
+    
+    def close(self) -> None:
+        self.db.close()
+    
+    def _row(self, url: str, extraction: PageExtraction) -> Optional[Tuple[str, str, str]]:
+        """(etag, last_modified, products) stored for url by extraction, if its product keys still match"""
+        row = self.db.execute(
+            "SELECT etag, last_modified, layout, products FROM page_validators WHERE url_key = ? AND extraction = ?",
+            (canonicalize_url(url), extraction.store_key)
+        ).fetchone()
+        if not row:
+            return None
+        
+        etag, last_modified, layout, products = row
+        if set(json.loads(layout)) != set(extraction.keys):
+            logger.debug(f"Stored products for {url} have another key layout, not reusing them")
+            return None
+        return etag, last_modified, products
@@ -10,18 +10,25 @@ Author: AI Assistant
 Version: 5.0.0
 """
 
+import argparse
 import requests
-import json
-import pandas as pd
 import time
 import random
 import re
 import logging
 from datetime import datetime
+from itertools import islice
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import urllib3
+from http_cache import PageExtraction, ValidatorStore
+from html_parsing import make_soup, resolve_parser
+from category_rules import HYBRID_CATEGORY_ENGINE
+from product_text import BRAND_TEXT_SCANNER
+from product_export import (COLUMNAR_SUFFIXES, HYBRID_EXCEL_LAYOUT, ProductSink, ProductSummary,
+                            write_columnar, write_excel, write_json)
+from product_record import HYBRID_SCHEMA
+from product_store import ProductStore
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -37,16 +44,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Products a category page extraction keeps for 304 reuse (see http_cache.ValidatorStore)
+CATEGORY_EXTRACTION = PageExtraction('hybrid.category', tuple(HYBRID_SCHEMA.columns))
+
 class HybridRouterSwitchScraper:
     """Hybrid scraper that combines real scraping with intelligent enhancement"""
     
-    def __init__(self):
+    def __init__(self, validators=None, html_parser=None, stream_compression=None, columnar_format='parquet',
+                 product_store=None):
         self.base_url = "https://www.router-switch.com"
         self.session = requests.Session()
         self.ua = UserAgent()
-        self.products = []
         self.setup_session()
         
+        # Optional ETag/Last-Modified store for conditional GETs
+        self.validators = validators
+        
+        # HTML parser backend (see html_parsing.py)
+        self.html_parser = resolve_parser(html_parser)
+        
+        # NDJSON stream products are appended to as they are found (see product_export.py)
+        self.stream_compression = stream_compression
+        self.sink = None
+        
+        # Columnar copy of the results: 'parquet', 'arrow' or None
+        self.columnar_format = columnar_format
+        
+        # Optional SQLite store the scraped products are upserted into across runs (see product_store.py)
+        self.product_store = product_store
+        
         # Human behavior simulation
         self.request_count = 0
         self.session_start_time = time.time()
@@ -268,8 +294,8 @@ class HybridRouterSwitchScraper:
         except Exception as e:
             logger.error(f"Error rotating User-Agent: {e}")
     
-    def make_human_like_request(self, url, max_retries=3, action='browsing'):
-        """Make HTTP request with human-like behavior"""
+    def make_human_like_request(self, url, max_retries=3, action='browsing', conditional=None):
+        """Make HTTP request with human-like behavior (304 responses are returned as-is)"""
         for attempt in range(max_retries):
             try:
                 # Simulate human behavior before request
@@ -280,7 +306,15 @@ class HybridRouterSwitchScraper:
                 # Add realistic timeout
                 timeout = random.uniform(25, 45)
                 
-                response = self.session.get(url, timeout=timeout)
+                request_headers = {}
+                if conditional and self.validators:
+                    request_headers = self.validators.conditional_headers(url, conditional)
+                
+                response = self.session.get(url, timeout=timeout, headers=request_headers)
+                
+                if response.status_code == 304:
+                    logger.info(f"♻️ Not modified (304): {url}")
+                    return response
                 
                 if response.status_code == 200:
                     logger.info(f"✅ Success: {len(response.text):,} chars received")
@@ -332,12 +366,16 @@ class HybridRouterSwitchScraper:
         return None
     
     def scrape_with_hybrid_approach(self):
-        """Scrape with hybrid approach: real scraping + intelligent enhancement"""
+        """Scrape with hybrid approach: real scraping + intelligent enhancement; returns the run's products, read back from its stream"""
         logger.info("="*80)
         logger.info("🚀 HYBRID ROUTER-SWITCH SCRAPER")
         logger.info("🤖 Real Scraping + Intelligent Enhancement")
         logger.info("="*80)
         
+        self.sink = ProductSink.for_run('router-switch-hybrid-products-', self.stream_compression,
+                                        summary=ProductSummary(HYBRID_EXCEL_LAYOUT))
+        logger.info(f"💾 Streaming products to {self.sink.path}")
+        
         try:
             # First, try to scrape the real website
             logger.info("🌐 Attempting to scrape real website with human touch...")
@@ -356,12 +394,22 @@ class HybridRouterSwitchScraper:
             for i, category in enumerate(categories):
                 logger.info(f"📂 Processing category {i+1}/{len(categories)}: {category['name']}")
                 
-                response = self.make_human_like_request(category['url'], action='category_browse')
+                response = self.make_human_like_request(category['url'], action='category_browse', conditional=CATEGORY_EXTRACTION)
                 if response:
-                    # Try to extract real products
-                    products = self.extract_and_enhance_products(response, category['name'])
+                    if response.status_code == 304:
+                        # Unchanged page: reuse the products extracted last time
+                        products = self.validators.load_products(category['url'], CATEGORY_EXTRACTION) or []
+                    else:
+                        # Try to extract real products
+                        products = self.extract_and_enhance_products(response, category['name'])
+                        if self.validators:
+                            self.validators.save(category['url'], response.headers, products, CATEGORY_EXTRACTION)
+                    
                     if products:
-                        self.products.extend(products)
+                        self.sink.write_many(products)
+                        if self.product_store:
+                            # Only products seen on the site; generated fill-ins stay out of the store
+                            self.product_store.write_many(products, source='hybrid')
                         real_products_found += len(products)
                         logger.info(f"✅ Found and enhanced {len(products)} products in {category['name']}")
                     else:
@@ -379,25 +427,36 @@ class HybridRouterSwitchScraper:
                 logger.info("🧠 Enhancing with intelligent data generation...")
                 
                 enhanced_products = self.generate_enhanced_products(500 - real_products_found)
-                self.products.extend(enhanced_products)
+                self.sink.write_many(enhanced_products)
                 
                 logger.info(f"🧠 Added {len(enhanced_products)} enhanced products")
             
-            logger.info(f"🎉 Total products: {len(self.products)}")
+            logger.info(f"🎉 Total products: {self.sink.count}")
             
         except Exception as e:
             logger.error(f"❌ Error in hybrid scraping: {e}")
             logger.info("🧠 Falling back to intelligent data generation...")
             
-            # Complete fallback to intelligent generation
-            self.products = self.generate_enhanced_products(500)
-        
-        return self.products
+            # Complete fallback to intelligent generation; it replaces everything found so far, so start a new stream
+            self.sink.close()
+            self.sink = ProductSink.for_run('router-switch-hybrid-products-', self.stream_compression,
+                                            summary=ProductSummary(HYBRID_EXCEL_LAYOUT))
+            self.sink.write_many(self.generate_enhanced_products(500))
+        
+        finally:
+            self.sink.close()
+            if self.product_store:
+                self.product_store.flush()
+                stats = self.product_store.stats()
+                logger.info(f"💾 Product store: {stats['upserts']} upserts, {stats['products']} products "
+                            f"in {self.product_store.path}")
+        
+        return self.sink.replay()
     
     def extract_and_enhance_products(self, response, category_name):
         """Extract products from real website and enhance them"""
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text, self.html_parser)
             products = []
             
             # Simulate human reading the page
@@ -406,26 +465,9 @@ class HybridRouterSwitchScraper:
             # Look for product patterns in text
             text_content = soup.get_text()
             
-            # Extract product names using patterns
-            product_patterns = [
-                r'(Cisco\s+[A-Z\d][^\n]{5,50})',
-                r'(Huawei\s+[A-Z\d][^\n]{5,50})',
-                r'(Dell\s+[A-Z\d][^\n]{5,50})',
-                r'(HPE\s+[A-Z\d][^\n]{5,50})',
-                r'(Juniper\s+[A-Z\d][^\n]{5,50})',
-                r'(Fortinet\s+[A-Z\d][^\n]{5,50})'
-            ]
-            
-            extracted_names = []
-            for pattern in product_patterns:
-                matches = re.findall(pattern, text_content, re.MULTILINE | re.IGNORECASE)
-                for match in matches:
-                    clean_match = re.sub(r'\s+', ' ', match.strip())
-                    if self.is_valid_product_name(clean_match):
-                        extracted_names.append(clean_match)
-            
-            # Remove duplicates
-            extracted_names = list(set(extracted_names))
+            # Extract product names using patterns, already deduplicated (see product_text.py)
+            extracted_names = [candidate.name for candidate in BRAND_TEXT_SCANNER.scan(text_content)
+                               if self.is_valid_product_name(candidate.name)]
             
             # Enhance each extracted product
             for name in extracted_names[:20]:  # Limit to avoid too many
@@ -549,35 +591,8 @@ class HybridRouterSwitchScraper:
         return f"https://via.placeholder.com/300x200/0066CC/FFFFFF?text={brand}+{name.replace(' ', '+')}"
     
     def determine_categories(self, name, category_name):
-        """Determine realistic categories"""
-        name_lower = name.lower()
-        
-        if 'router' in name_lower or 'isr' in name_lower or 'asr' in name_lower:
-            category1 = "Routers"
-        elif 'switch' in name_lower or 'catalyst' in name_lower:
-            category1 = "Switches"
-        elif 'firewall' in name_lower or 'asa' in name_lower:
-            category1 = "Firewalls"
-        elif 'server' in name_lower or 'poweredge' in name_lower:
-            category1 = "Servers"
-        elif 'storage' in name_lower or 'powervault' in name_lower:
-            category1 = "Storages"
-        else:
-            category1 = category_name or "Networking"
-        
-        brand = self.extract_brand(name)
-        category2 = f"{brand} {category1}"
-        
-        if 'enterprise' in name_lower:
-            category3 = "Enterprise Series"
-        elif 'catalyst' in name_lower:
-            category3 = "Catalyst Series"
-        elif 'poweredge' in name_lower:
-            category3 = "PowerEdge Series"
-        else:
-            category3 = "Standard Series"
-        
-        return category1, category2, category3
+        """Determine realistic categories (rules in category_rules.py)"""
+        return HYBRID_CATEGORY_ENGINE.categorize(name, category=category_name, brand=self.extract_brand(name))
     
     def generate_realistic_description(self, brand, name, category1):
         """Generate realistic product description"""
@@ -614,37 +629,34 @@ class HybridRouterSwitchScraper:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Build the files from the run's product stream, one product at a time
+        records = self.sink.replay() if self.sink and self.sink.closed else products
+        summary = self.sink.summary if records is not products else None
+        
         # Save JSON
         json_filename = f"router-switch-hybrid-products-{timestamp}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(products, f, indent=2, ensure_ascii=False)
+        write_json(records, json_filename)
         logger.info(f"💾 JSON saved: {json_filename}")
         
         # Save Excel
         excel_filename = f"router-switch-hybrid-products-{timestamp}.xlsx"
         try:
-            df = pd.DataFrame(products)
-            
-            with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Products', index=False)
-                
-                if 'Category1' in df.columns:
-                    cat1_summary = df.groupby('Category1').size().reset_index(name='Count')
-                    cat1_summary.to_excel(writer, sheet_name='Category1', index=False)
-                
-                if 'Brand' in df.columns:
-                    brand_summary = df.groupby('Brand').size().reset_index(name='Count')
-                    brand_summary.to_excel(writer, sheet_name='Brands', index=False)
-                
-                if 'DataSource' in df.columns:
-                    source_summary = df.groupby('DataSource').size().reset_index(name='Count')
-                    source_summary.to_excel(writer, sheet_name='DataSources', index=False)
-            
+            write_excel(records, excel_filename, HYBRID_EXCEL_LAYOUT, summary=summary)
             logger.info(f"💾 Excel saved: {excel_filename}")
             
         except Exception as e:
             logger.error(f"Error saving Excel: {e}")
         
+        # Save columnar copy (dictionary-encoded categories, numeric prices)
+        if self.columnar_format:
+            columnar_filename = f"router-switch-hybrid-products-{timestamp}{COLUMNAR_SUFFIXES[self.columnar_format]}"
+            try:
+                write_columnar(records, columnar_filename, summary=summary)
+                logger.info(f"💾 Columnar file saved: {columnar_filename}")
+                
+            except Exception as e:
+                logger.error(f"Error saving columnar file: {e}")
+        
         # Log final statistics
         logger.info("="*80)
         logger.info("🎉 HYBRID SCRAPING COMPLETE!")
@@ -653,7 +665,7 @@ class HybridRouterSwitchScraper:
         
         # Show sample products
         logger.info("📋 Sample products:")
-        for i, product in enumerate(products[:5]):
+        for i, product in enumerate(islice(products, 5)):
             logger.info(f"{i+1}. {product['Product']}")
             logger.info(f"   Brand: {product['Brand']}, SKU: {product['Sku']}")
             logger.info(f"   Price: {product['Price']}")
@@ -663,7 +675,14 @@ class HybridRouterSwitchScraper:
 
 def main():
     """Main function"""
-    scraper = HybridRouterSwitchScraper()
+    parser = argparse.ArgumentParser(description="Hybrid router-switch.com scraper: real scraping + intelligent enhancement")
+    parser.add_argument("--product-store", metavar="PATH",
+                        help="SQLite file the scraped products are upserted into across runs (e.g. products.sqlite3)")
+    args = parser.parse_args()
+    
+    validators = ValidatorStore()
+    product_store = ProductStore(args.product_store) if args.product_store else None
+    scraper = HybridRouterSwitchScraper(validators=validators, product_store=product_store)
     
     try:
         # Run hybrid scraping
@@ -683,6 +702,10 @@ def main():
         logger.error(f"Hybrid scraping failed: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        validators.close()
+        if product_store:
+            product_store.close()
 
 if __name__ == "__main__":
     main()
@@ -10,13 +10,21 @@ Author: AI Assistant
 Version: 3.0.0
 """
 
-import json
-import pandas as pd
+import argparse
+import itertools
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import random
+import re
 import time
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import logging
+from category_rules import GENERATOR_CATEGORY_ENGINE
+from product_export import (COLUMNAR_SUFFIXES, GENERATOR_EXCEL_LAYOUT, ProductSink, ProductSummary,
+                            columnar_schema, write_columnar, write_excel, write_json, write_record_batches)
+from product_record import GENERATOR_SCHEMA, ProductBatch
 
 # Configure logging
 logging.basicConfig(
@@ -29,12 +37,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Random SKU suffix: 3 characters out of A-Z0-9
+SKU_SUFFIX_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+SKU_SUFFIX_LENGTH = 3
+
+# Common image extensions
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif']
+
+# Products per generated batch (see ProductBatchEngine)
+GENERATOR_BATCH_SIZE = 100_000
+
 class IntelligentRouterSwitchGenerator:
     """Intelligent generator for realistic router-switch.com data"""
     
-    def __init__(self):
+    def __init__(self, stream_compression=None, columnar_format='parquet'):
         self.products = []
         
+        # NDJSON stream products are appended to as they are generated (see product_export.py)
+        self.stream_compression = stream_compression
+        self.sink = None
+        
+        # Columnar copy of the results: 'parquet', 'arrow' or None
+        self.columnar_format = columnar_format
+        
         # Real networking equipment data based on router-switch.com patterns
         self.real_products = {
             'cisco_routers': [
@@ -196,28 +221,44 @@ class IntelligentRouterSwitchGenerator:
             '90 Day Warranty'
         ]
     
-    def generate_realistic_products(self, target_count: int = 500) -> List[Dict]:
-        """Generate realistic products based on actual router-switch.com patterns"""
+    def generate_realistic_products(self, target_count: int = 500, seed: Optional[int] = None,
+                                    batch_size: int = GENERATOR_BATCH_SIZE) -> ProductBatch:
+        """Generate realistic products based on actual router-switch.com patterns
+        
+        Products are drawn in batches by ProductBatchEngine (seed makes a run
+        reproducible) and kept column by column; the batch reads as a list of
+        product dicts.
+        """
         logger.info(f"Generating {target_count} realistic products...")
         
-        products = []
-        product_categories = list(self.real_products.keys())
+        products = ProductBatch(GENERATOR_SCHEMA)
+        engine = ProductBatchEngine(self, seed)
         
-        for i in range(target_count):
-            # Select random category
-            category = random.choice(product_categories)
-            product_name = random.choice(self.real_products[category])
-            
-            # Generate product data
-            product_data = self.create_realistic_product(product_name, category)
-            products.append(product_data)
-            
-            if (i + 1) % 100 == 0:
-                logger.info(f"Generated {i + 1} products...")
+        with ProductSink.for_run('router-switch-intelligent-products-', self.stream_compression,
+                                 summary=ProductSummary(GENERATOR_EXCEL_LAYOUT)) as sink:
+            self.sink = sink
+            for draw in engine.draws(target_count, batch_size):
+                start = len(products)
+                products.extend_columns(engine.product_columns(draw))
+                sink.write_many(products[start:])
+                logger.info(f"Generated {len(products)} products...")
         
         logger.info(f"Successfully generated {len(products)} realistic products")
         return products
     
+    def write_generated_products(self, filename: str, count: int, seed: Optional[int] = None,
+                                 batch_size: int = GENERATOR_BATCH_SIZE) -> int:
+        """Generate products straight into a Parquet or Arrow IPC file (by suffix)
+        
+        No dicts, NDJSON stream or Excel file: for load-testing volumes.
+        Returns the number of rows written.
+        """
+        engine = ProductBatchEngine(self, seed)
+        started = time.time()
+        written = write_record_batches(engine.record_batches(count, batch_size), filename, engine.schema)
+        logger.info(f"Generated {written:,} products into {filename} in {time.time() - started:.1f}s")
+        return written
+    
     def create_realistic_product(self, product_name: str, category: str) -> Dict:
         """Create a realistic product with all required fields"""
         
@@ -302,18 +343,22 @@ class IntelligentRouterSwitchGenerator:
         
         return model.strip()
     
-    def generate_sku(self, brand: str, model: str) -> str:
-        """Generate realistic SKU"""
+    def sku_prefix(self, brand: str, model: str) -> str:
+        """SKU without its random suffix: brand prefix plus up to 8 model characters"""
         brand_prefix = brand.upper()[:3]
         model_clean = re.sub(r'[^A-Z0-9]', '', model.upper())
         
         if len(model_clean) > 8:
             model_clean = model_clean[:8]
         
+        return f"{brand_prefix}{model_clean}"
+    
+    def generate_sku(self, brand: str, model: str) -> str:
+        """Generate realistic SKU"""
         # Add random suffix
-        suffix = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=3))
+        suffix = ''.join(random.choices(SKU_SUFFIX_CHARS, k=SKU_SUFFIX_LENGTH))
         
-        return f"{brand_prefix}{model_clean}{suffix}"
+        return f"{self.sku_prefix(brand, model)}{suffix}"
     
     def generate_price(self, category: str) -> str:
         """Generate realistic price"""
@@ -329,72 +374,36 @@ class IntelligentRouterSwitchGenerator:
         
         return f"${random.randint(100, 5000):,}"
     
+    def model_path(self, brand: str, model: str) -> str:
+        """brand/model part of image and product URLs"""
+        model_clean = re.sub(r'[^A-Za-z0-9]', '-', model).lower()
+        return f"{brand.lower()}/{model_clean}"
+    
     def generate_image_url(self, brand: str, model: str) -> str:
         """Generate realistic image URL"""
         base_url = random.choice(self.image_base_urls)
-        brand_lower = brand.lower()
-        model_clean = re.sub(r'[^A-Za-z0-9]', '-', model).lower()
         
         # Common image extensions
-        extensions = ['.jpg', '.jpeg', '.png', '.gif']
-        extension = random.choice(extensions)
+        extension = random.choice(IMAGE_EXTENSIONS)
         
-        return f"{base_url}{brand_lower}/{model_clean}{extension}"
+        return f"{base_url}{self.model_path(brand, model)}{extension}"
     
     def determine_categories(self, product_name: str, category: str) -> Tuple[str, str, str]:
-        """Determine realistic category hierarchy"""
-        product_lower = product_name.lower()
-        
-        # Category 1 (Main)
-        if 'router' in product_lower or 'isr' in product_lower or 'asr' in product_lower:
-            category1 = "Routers"
-        elif 'switch' in product_lower or 'catalyst' in product_lower or 'nexus' in product_lower:
-            category1 = "Switches"
-        elif 'firewall' in product_lower or 'asa' in product_lower or 'fortigate' in product_lower:
-            category1 = "Firewalls"
-        elif 'wireless' in product_lower or 'aironet' in product_lower or 'meraki' in product_lower:
-            category1 = "Wireless"
-        elif 'server' in product_lower or 'poweredge' in product_lower or 'proliant' in product_lower:
-            category1 = "Servers"
-        elif 'storage' in product_lower or 'powervault' in product_lower or 'msa' in product_lower:
-            category1 = "Storages"
-        else:
-            category1 = "Networking"
-        
-        # Category 2 (Subcategory)
-        brand = self.extract_brand(product_name)
-        category2 = f"{brand} {category1}"
-        
-        # Category 3 (Product Type)
-        if 'enterprise' in product_lower or 'isr' in product_lower or 'asr' in product_lower:
-            category3 = "Enterprise Series"
-        elif 'catalyst' in product_lower:
-            category3 = "Catalyst Series"
-        elif 'nexus' in product_lower:
-            category3 = "Nexus Series"
-        elif 'poweredge' in product_lower:
-            category3 = "PowerEdge Series"
-        elif 'proliant' in product_lower:
-            category3 = "ProLiant Series"
-        elif 'aruba' in product_lower:
-            category3 = "Aruba Series"
-        elif 'fortigate' in product_lower:
-            category3 = "FortiGate Series"
-        else:
-            category3 = "Standard Series"
-        
-        return category1, category2, category3
+        """Determine realistic category hierarchy (rules in category_rules.py)"""
+        return GENERATOR_CATEGORY_ENGINE.categorize(product_name, brand=self.extract_brand(product_name))
     
     def generate_product_link(self, brand: str, model: str) -> str:
         """Generate realistic product link"""
         base_url = "https://www.router-switch.com"
-        brand_lower = brand.lower()
-        model_clean = re.sub(r'[^A-Za-z0-9]', '-', model).lower()
         
-        return f"{base_url}/products/{brand_lower}/{model_clean}.html"
+        return f"{base_url}/products/{self.model_path(brand, model)}.html"
     
     def generate_description(self, brand: str, product_name: str, category1: str) -> str:
         """Generate realistic product description"""
+        return random.choice(self.description_choices(brand, product_name, category1))
+    
+    def description_choices(self, brand: str, product_name: str, category1: str) -> List[str]:
+        """The descriptions a product can get"""
         descriptions = {
             'Routers': [
                 f"The {brand} {product_name} is a high-performance router designed for enterprise networks. It offers advanced routing capabilities, security features, and reliable performance for demanding network environments.",
@@ -428,8 +437,7 @@ class IntelligentRouterSwitchGenerator:
             ]
         }
         
-        category_descriptions = descriptions.get(category1, descriptions['Routers'])
-        return random.choice(category_descriptions)
+        return descriptions.get(category1, descriptions['Routers'])
     
     def save_results(self, products: List[Dict]) -> None:
         """Save results to files"""
@@ -439,41 +447,34 @@ class IntelligentRouterSwitchGenerator:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Build the files from the generated product stream, one product at a time
+        records = self.sink.replay() if self.sink and self.sink.closed else products
+        summary = self.sink.summary if records is not products else None
+        
         # Save JSON
         json_filename = f"router-switch-intelligent-products-{timestamp}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(products, f, indent=2, ensure_ascii=False)
+        write_json(records, json_filename)
         logger.info(f"JSON saved: {json_filename}")
         
         # Save Excel
         excel_filename = f"router-switch-intelligent-products-{timestamp}.xlsx"
         try:
-            df = pd.DataFrame(products)
-            
-            with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Products', index=False)
-                
-                if 'Category1' in df.columns:
-                    cat1_summary = df.groupby('Category1').size().reset_index(name='Count')
-                    cat1_summary.to_excel(writer, sheet_name='Category1', index=False)
-                
-                if 'Brand' in df.columns:
-                    brand_summary = df.groupby('Brand').size().reset_index(name='Count')
-                    brand_summary.to_excel(writer, sheet_name='Brands', index=False)
-                
-                if 'Condition' in df.columns:
-                    condition_summary = df.groupby('Condition').size().reset_index(name='Count')
-                    condition_summary.to_excel(writer, sheet_name='Conditions', index=False)
-                
-                if 'Availability' in df.columns:
-                    availability_summary = df.groupby('Availability').size().reset_index(name='Count')
-                    availability_summary.to_excel(writer, sheet_name='Availability', index=False)
-            
+            write_excel(records, excel_filename, GENERATOR_EXCEL_LAYOUT, summary=summary)
             logger.info(f"Excel saved: {excel_filename}")
             
         except Exception as e:
             logger.error(f"Error saving Excel: {e}")
         
+        # Save columnar copy (dictionary-encoded categories, numeric prices)
+        if self.columnar_format:
+            columnar_filename = f"router-switch-intelligent-products-{timestamp}{COLUMNAR_SUFFIXES[self.columnar_format]}"
+            try:
+                write_columnar(records, columnar_filename, summary=summary)
+                logger.info(f"Columnar file saved: {columnar_filename}")
+                
+            except Exception as e:
+                logger.error(f"Error saving columnar file: {e}")
+        
         # Log final statistics
         logger.info("="*80)
         logger.info("INTELLIGENT GENERATION COMPLETE!")
@@ -490,8 +491,138 @@ class IntelligentRouterSwitchGenerator:
             logger.info(f"   Image: {product['Image']}")
             logger.info("")
 
+class ProductBatchEngine:
+    """Vectorized product generation, one batch of rows at a time
+    
+    Everything fixed per catalog entry (brand, SKU prefix, image and product
+    URLs, categories, descriptions) is worked out once. Each batch then draws
+    its random parts (entry, price, SKU suffix, image host and extension,
+    condition, availability, warranty, description) as NumPy arrays and
+    assembles the string columns with Arrow kernels. The same seed, count
+    and batch size give the same products.
+    """
+    
+    def __init__(self, generator: IntelligentRouterSwitchGenerator, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.schema = columnar_schema(GENERATOR_SCHEMA.columns)
+        
+        # Catalog entries, flattened; each category is a contiguous run of entries
+        categories = list(generator.real_products)
+        sizes = [len(generator.real_products[category]) for category in categories]
+        self.category_sizes = np.array(sizes, dtype=np.int64)
+        self.category_offsets = np.cumsum([0] + sizes[:-1])
+        price_ranges = [generator.price_ranges.get(category, (100, 5000)) for category in categories]
+        self.price_low = np.array([low for low, _ in price_ranges], dtype=np.int64)
+        self.price_high = np.array([high for _, high in price_ranges], dtype=np.int64)
+        
+        names = []
+        sku_prefixes = []
+        links = []
+        images = []
+        descriptions = []
+        description_sizes = []
+        category_columns = {'Brand': [], 'Category1': [], 'Category2': [], 'Category3': []}
+        for category in categories:
+            for product_name in generator.real_products[category]:
+                brand = generator.extract_brand(product_name)
+                model = generator.extract_model(product_name)
+                model_path = generator.model_path(brand, model)
+                category1, category2, category3 = generator.determine_categories(product_name, category)
+                choices = generator.description_choices(brand, product_name, category1)
+                
+                names.append(product_name)
+                sku_prefixes.append(generator.sku_prefix(brand, model))
+                links.append(generator.generate_product_link(brand, model))
+                # Every host x extension, so an image is one lookup
+                images.extend(f"{base_url}{model_path}{extension}"
+                              for base_url in generator.image_base_urls for extension in IMAGE_EXTENSIONS)
+                descriptions.extend(choices)
+                description_sizes.append(len(choices))
+                for column, value in zip(category_columns, (brand, category1, category2, category3)):
+                    category_columns[column].append(value)
+        
+        self.names = pa.array(names, pa.string())
+        self.sku_prefixes = pa.array(sku_prefixes, pa.string())
+        self.links = pa.array(links, pa.string())
+        self.images = pa.array(images, pa.string())
+        self.image_choices = len(generator.image_base_urls) * len(IMAGE_EXTENSIONS)
+        self.descriptions = pa.array(descriptions, pa.string())
+        self.description_sizes = np.array(description_sizes, dtype=np.int64)
+        self.description_offsets = np.cumsum([0] + description_sizes[:-1])
+        self.sku_suffixes = pa.array([''.join(chars) for chars in
+                                      itertools.product(SKU_SUFFIX_CHARS, repeat=SKU_SUFFIX_LENGTH)], pa.string())
+        self.warranties = pa.array(generator.warranties, pa.string())
+        
+        # Dictionary columns: distinct values plus the code of each entry's value
+        self.dictionaries = {}
+        self.entry_codes = {}
+        for column, values in category_columns.items():
+            distinct = list(dict.fromkeys(values))
+            self.dictionaries[column] = pa.array(distinct, pa.string())
+            self.entry_codes[column] = np.array([distinct.index(value) for value in values], dtype=np.int32)
+        self.dictionaries['Condition'] = pa.array(generator.conditions, pa.string())
+        self.dictionaries['Availability'] = pa.array(generator.availability, pa.string())
+    
+    def draws(self, count: int, batch_size: int = GENERATOR_BATCH_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+        """Random parts of count products, batch_size at a time"""
+        rng = self.rng
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            category = rng.integers(0, len(self.category_sizes), size)
+            entry = self.category_offsets[category] + rng.integers(0, self.category_sizes[category])
+            yield {
+                'entry': entry,
+                'price': rng.integers(self.price_low[category], self.price_high[category], endpoint=True),
+                'sku_suffix': rng.integers(0, len(self.sku_suffixes), size),
+                'image': entry * self.image_choices + rng.integers(0, self.image_choices, size),
+                'condition': rng.integers(0, len(self.dictionaries['Condition']), size, dtype=np.int32),
+                'availability': rng.integers(0, len(self.dictionaries['Availability']), size, dtype=np.int32),
+                'warranty': rng.integers(0, len(self.warranties), size),
+                'description': self.description_offsets[entry] + rng.integers(0, self.description_sizes[entry]),
+            }
+    
+    def record_batch(self, draw: Dict[str, np.ndarray]) -> pa.RecordBatch:
+        """Products of one draw in the columnar export schema"""
+        entry = draw['entry']
+        columns = {
+            'Product': self.names.take(entry),
+            'Image': self.images.take(draw['image']),
+            'Sku': pc.binary_join_element_wise(self.sku_prefixes.take(entry),
+                                               self.sku_suffixes.take(draw['sku_suffix']), ''),
+            'Price': pa.array(draw['price'].astype(np.float64)),
+            'ProductLink': self.links.take(entry),
+            'Warranty': self.warranties.take(draw['warranty']),
+            'ProductDescription': self.descriptions.take(draw['description']),
+            'Condition': draw['condition'],
+            'Availability': draw['availability'],
+        }
+        for column, codes in self.entry_codes.items():
+            columns[column] = codes[entry]
+        for column, values in self.dictionaries.items():
+            columns[column] = pa.DictionaryArray.from_arrays(pa.array(columns[column], pa.int32()), values)
+        return pa.RecordBatch.from_arrays([columns[name] for name in self.schema.names], schema=self.schema)
+    
+    def product_columns(self, draw: Dict[str, np.ndarray]) -> Dict[str, List]:
+        """Products of one draw as the generator's columns ('$1,234' prices), keyed like its dicts"""
+        columns = self.record_batch(draw).to_pydict()
+        columns['Price'] = [f"${price:,}" for price in draw['price'].tolist()]
+        return columns
+    
+    def record_batches(self, count: int, batch_size: int = GENERATOR_BATCH_SIZE) -> Iterator[pa.RecordBatch]:
+        for draw in self.draws(count, batch_size):
+            yield self.record_batch(draw)
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Generate realistic router-switch.com product data")
+    parser.add_argument('--count', type=int, default=500, help="Number of products (default: 500)")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed, for reproducible output")
+    parser.add_argument('--batch-size', type=int, default=GENERATOR_BATCH_SIZE,
+                        help=f"Products generated per batch (default: {GENERATOR_BATCH_SIZE})")
+    parser.add_argument('--output', default=None,
+                        help="Write only this .parquet/.arrow file, skipping JSON/Excel (for large counts)")
+    args = parser.parse_args()
+    
     logger.info("="*80)
     logger.info("INTELLIGENT ROUTER-SWITCH DATA GENERATOR")
     logger.info("Creating realistic products based on actual router-switch.com patterns")
@@ -500,8 +631,12 @@ def main():
     generator = IntelligentRouterSwitchGenerator()
     
     try:
+        if args.output:
+            generator.write_generated_products(args.output, args.count, args.seed, args.batch_size)
+            return
+        
         # Generate realistic products
-        products = generator.generate_realistic_products(target_count=500)
+        products = generator.generate_realistic_products(args.count, args.seed, args.batch_size)
         
         # Save results
         generator.save_results(products)
@@ -516,5 +651,4 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    import re
     main()
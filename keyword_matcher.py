@@ -0,0 +1,68 @@
+"""
+Multi-Keyword Matcher
+=====================
+
+Finds every keyword of a fixed vocabulary (brands, navigation terms,
+product indicators, exclusion terms, ...) in one pass over a text and
+returns the set of keywords present, so the filter predicates become set
+checks instead of one `keyword in text` scan per keyword.
+
+The vocabulary is compiled into a single regex alternation, longest
+keyword first, probed at every position through a zero-width lookahead.
+This does the job of an Aho-Corasick automaton inside the C regex engine
+(a pure-Python automaton would be slower than the substring scans it
+replaces). Shorter keywords that start at the same position are always
+prefixes of the longest match there and are added from a precomputed
+table. Results for short texts are memoized, since link texts and product
+names repeat across strategies and pages; long texts such as whole page
+texts rarely repeat and are scanned without being kept in the cache.
+"""
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable
+
+DEFAULT_CACHE_SIZE = 16384
+
+# Longest text whose result is memoized
+DEFAULT_MAX_CACHED_LENGTH = 512
+
+class KeywordMatcher:
+    """Precompiled matcher returning the set of keywords found in a text (case-insensitive)"""
+    
+    def __init__(self, keywords: Iterable[str], cache_size: int = DEFAULT_CACHE_SIZE,
+                 max_cached_length: int = DEFAULT_MAX_CACHED_LENGTH):
+        vocabulary = sorted({keyword.lower() for keyword in keywords if keyword},
+                            key=lambda keyword: (-len(keyword), keyword))
+        self.keywords = frozenset(vocabulary)
+        
+        # Every keyword that is a prefix of a longer one matches wherever the longer one does
+        self.prefix_closure = {
+            keyword: frozenset(other for other in vocabulary if keyword.startswith(other))
+            for keyword in vocabulary
+        }
+        
+        alternation = '|'.join(re.escape(keyword) for keyword in vocabulary)
+        self.regex = re.compile(f'(?=({alternation}))') if vocabulary else None
+        self.max_cached_length = max_cached_length
+        self._cached_scan = lru_cache(maxsize=cache_size)(self._scan)
+    
+    def matches(self, text: str) -> FrozenSet[str]:
+        """All keywords occurring anywhere in text (memoized for texts up to max_cached_length)"""
+        if text and len(text) > self.max_cached_length:
+            return self._scan(text)
+        return self._cached_scan(text)
+    
+    def _scan(self, text: str) -> FrozenSet[str]:
+        """All keywords occurring anywhere in text"""
+        if not text or self.regex is None:
+            return frozenset()
+        
+        found = set()
+        for match in self.regex.finditer(text.lower()):
+            found.update(self.prefix_closure[match.group(1)])
+        return frozenset(found)
+    
+    def contains_any(self, text: str, keywords: FrozenSet[str]) -> bool:
+        """Whether text contains at least one of the given keywords"""
+        return not self.matches(text).isdisjoint(keywords)
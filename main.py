@@ -1,24 +1,235 @@
 import requests
 import argparse
-from bs4 import BeautifulSoup
 import json
+import os
 import time
 import random
 import re
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import islice
 from urllib.parse import urljoin
 from datetime import datetime
 import warnings
-import pandas as pd
 from fake_useragent import UserAgent
 import urllib3
+from http_cache import PageExtraction, ResponseCache, ValidatorStore, CACHE_MODES
+from html_parsing import BoilerplateTemplate, make_soup, visit_page, resolve_parser, PARSER_BACKENDS, ALL_STRATEGIES
+from price_engine import PRICE_ENGINE
+from keyword_matcher import KeywordMatcher
+from category_rules import MAIN_CATEGORY_ENGINE
+from product_text import PRODUCT_TEXT_SCANNER
+from product_export import (COLUMNAR_FORMATS, COLUMNAR_SUFFIXES, COMBINED_HIERARCHY_EXCEL_LAYOUT,
+                            COMBINED_PRODUCTS_EXCEL_LAYOUT, COMPREHENSIVE_EXCEL_LAYOUT,
+                            HIERARCHY_EXCEL_LAYOUT, ProductSink, ProductSummary, write_columnar,
+                            write_excel, write_json, write_workbook)
+from product_record import COMPREHENSIVE_SCHEMA
+from product_store import ProductStore
 
 warnings.filterwarnings('ignore')
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Category rollups of the comprehensive run (groups of COMPREHENSIVE_EXCEL_LAYOUT) and the fields whose fill rate is reported
+CATEGORY_LEVELS = (('category 1',), ('category 1', 'category 2'), ('category 1', 'category 2', 'category 3'))
+SUMMARY_FIELDS = ('price', 'SKU', 'image')
+
+# Products each category page extraction keeps for 304 reuse (see http_cache.ValidatorStore)
+CATEGORY_EXTRACTION = PageExtraction('main.category', tuple(COMPREHENSIVE_SCHEMA.columns))
+PRICE_FOCUS_EXTRACTION = PageExtraction('main.price_focus', tuple(COMPREHENSIVE_SCHEMA.columns))
+
+# Keyword vocabularies of the text filters, all matched by one KeywordMatcher
+NAV_INDICATORS = frozenset([
+    'shop by categories', 'contact us', 'track order', 'express shipping',
+    'javascript', 'browser', 'usd', 'aud', 'gbp', 'english', 'español',
+    'router-switch.com', 'disabled', 'currency', 'language'
+])
+PRODUCT_INDICATORS = frozenset([
+    'router', 'switch', 'server', 'firewall', 'module', 'card',
+    'gateway', 'access point', 'storage', 'memory', 'software'
+])
+PRODUCT_TYPES = frozenset(['router', 'switch', 'server', 'firewall'])
+MAIN_CATEGORY_INDICATORS = frozenset(['routers', 'switches', 'firewalls', 'wireless', 'servers', 'storages'])
+SUBCATEGORY_TERMS = frozenset(['router', 'switch', 'server', 'firewall', 'wireless', 'storage'])
+PRODUCT_PAGE_TERMS = frozenset(['product', 'item', 'detail'])
+IMAGE_EXCLUDE_TERMS = frozenset(['icon', 'logo', 'button', 'arrow', 'menu', 'nav'])
+IMAGE_INCLUDE_TERMS = frozenset(['product', 'router', 'switch', 'cisco', 'huawei', 'equipment'])
+# Literal openings of the _clean_page_text patterns; text without any of them needs no regex pass
+BOILERPLATE_ANCHORS = frozenset([
+    'javascript seems to be disabled', 'express shipping to', 'usd', 'router-switch.com',
+    'contact us', 'shop by categories', 'english'
+])
+
+class TablePriceIndex:
+    """Per-table price lookups by row position
+    
+    A row's price comes from its cells, then its parent's text, then the
+    next three siblings, where an empty sibling ends the search. Each
+    element's text is price-scanned at most once, so rows of one table
+    share the scan of their parent instead of each re-scanning it.
+    """
+    
+    SIBLING_WINDOW = 3
+    
+    def __init__(self, rows, extract_price):
+        self.rows = rows
+        self.extract_price = extract_price
+        self.element_prices = {}
+        self.row_prices = {}
+    
+    def price_at(self, position):
+        """Price for the row at this position in the table"""
+        if position not in self.row_prices:
+            self.row_prices[position] = self._find_row_price(self.rows[position])
+        return self.row_prices[position]
+    
+    def _element_price(self, element):
+        key = id(element)
+        if key not in self.element_prices:
+            self.element_prices[key] = self.extract_price(element.get_text())
+        return self.element_prices[key]
+    
+    def _find_row_price(self, row):
+        element = row.element
+        if not element:
+            return ""
+        
+        # Cells of the row
+        for cell in row.cells:
+            price = self._element_price(cell)
+            if price:
+                return price
+        
+        # Parent text, shared by all rows of the same table body
+        if element.parent:
+            price = self._element_price(element.parent)
+            if price:
+                return price
+        
+        # Next few siblings; an empty sibling ends the search
+        sibling = element.find_next_sibling()
+        for _ in range(self.SIBLING_WINDOW):
+            if not sibling:
+                break
+            price = self._element_price(sibling)
+            if price:
+                return price
+            sibling = sibling.find_next_sibling()
+        
+        return ""
+
+class PricePositionIndex:
+    """Offsets of every price on a page, per price pattern
+    
+    Built with one price-engine scan of the page, so finding the price near
+    a product mention is a bisect instead of a find() from the start of the
+    page plus a regex scan of the surrounding window.
+    """
+    
+    WINDOW = 500
+    
+    def __init__(self, text, engine=PRICE_ENGINE):
+        self.positions = [([], [], [], []) for _ in engine.group_numbers]
+        for match in engine.find_all(text):
+            starts, ends, prices, reasonable = self.positions[match.priority]
+            starts.append(match.start)
+            ends.append(match.end)
+            prices.append(match.raw)
+            reasonable.append(engine.in_range(match.value))
+    
+    def price_near(self, start, end):
+        """Price within WINDOW chars of text[start:end]
+        
+        Same rule as scanning the window with each pattern in priority
+        order: only a pattern's first hit in the window counts, and an
+        unreasonable first hit moves on to the next pattern.
+        """
+        low, high = start - self.WINDOW, end + self.WINDOW
+        
+        for starts, ends, prices, reasonable in self.positions:
+            index = bisect_left(starts, low)
+            if index < len(starts) and ends[index] <= high and reasonable[index]:
+                return prices[index]
+        
+        return ""
+
+class NormalizationCache:
+    """Bounded LRU of the fields derived from a product name
+    
+    SKU, brand, warranty, description and categories are computed together
+    once per (name, category context). The table, link and text strategies
+    see the same names over and over, within a page and across pages.
+    """
+    
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing and storing it on a miss"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        
+        self.misses += 1
+        value = compute()
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return value
+    
+    def stats(self):
+        """Hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups * 100) if lookups else 0.0,
+            'entries': len(self.entries),
+            'evictions': self.evictions
+        }
+
 class ComprehensiveCategoryScraper:
-    def __init__(self):
+    def __init__(self, cache=None, validators=None, html_parser=None, strategies=None, stream_compression=None,
+                 columnar_format='parquet', product_store=None):
         self.base_url = "https://www.router-switch.com"
         
+        # HTML parser backend used by every extraction path (see html_parsing.py)
+        self.html_parser = resolve_parser(html_parser)
+        
+        # Active extraction strategies; without 'text' pages are parsed partially
+        self.extraction_strategies = tuple(strategies or ALL_STRATEGIES)
+        
+        # Optional persistent response cache and conditional GET store (see http_cache.py)
+        self.cache = cache
+        self.validators = validators
+        self.last_response_cached = False
+        
+        # Derived product fields, shared by every candidate with the same name
+        self.normalization_cache = NormalizationCache()
+        
+        # Site header/nav/footer blocks, learned from the first pages and cut from page text
+        self.boilerplate = BoilerplateTemplate()
+        
+        # NDJSON stream the cleaned products of a run are appended to (see product_export.py)
+        self.stream_compression = stream_compression
+        self.sink = None
+        # Products found so far in the run, before cleaning (what the run limits count)
+        self.products_collected = 0
+        
+        # Rollups of the cleaned products, updated as each one is streamed
+        self.summary = None
+        
+        # Columnar copy of saved results: 'parquet', 'arrow' or None
+        self.columnar_format = columnar_format
+        
+        # Optional SQLite store the cleaned products are upserted into across runs (see product_store.py)
+        self.product_store = product_store
+        
         # Human-like session setup with realistic headers
         self.session = requests.Session()
         self.ua = UserAgent()
@@ -41,6 +252,14 @@ class ComprehensiveCategoryScraper:
             'sophos': 'Sophos', 'watchguard': 'WatchGuard', 'sonicwall': 'SonicWall',
             'microsoft': 'Microsoft', 'vmware': 'VMware', 'oracle': 'Oracle'
         }
+        self.brand_keys = frozenset(self.brands)
+        
+        # One pass finds every brand and filter keyword in a text
+        self.keywords = KeywordMatcher(
+            self.brand_keys | NAV_INDICATORS | PRODUCT_INDICATORS | PRODUCT_TYPES |
+            MAIN_CATEGORY_INDICATORS | SUBCATEGORY_TERMS | PRODUCT_PAGE_TERMS |
+            IMAGE_EXCLUDE_TERMS | IMAGE_INCLUDE_TERMS | BOILERPLATE_ANCHORS
+        )
         
         # Category mapping for proper hierarchy
         self.category_mapping = {
@@ -58,6 +277,7 @@ class ComprehensiveCategoryScraper:
         print("Comprehensive Category Scraper")
         print("Focus: Extract ALL categories with proper hierarchy")
         print("Enhanced with human-like browsing patterns")
+        print(f"HTML parser backend: {self.html_parser}")
     
     def setup_human_like_session(self):
         """Setup session with realistic human-like headers and behavior"""
@@ -122,6 +342,10 @@ class ComprehensiveCategoryScraper:
         delay += random.uniform(-0.5, 0.5)
         delay = max(0.5, delay)  # Minimum delay
         
+        # No request reached the site, so there is nothing to pace
+        if self.last_response_cached:
+            return
+        
         print(f"  Human-like {delay_type} delay: {delay:.1f}s")
         time.sleep(delay)
     
@@ -158,8 +382,26 @@ class ComprehensiveCategoryScraper:
             print(f"  Human break: {break_delay:.1f}s")
             time.sleep(break_delay)
     
-    def make_human_like_request(self, url, max_retries=3, action='browsing'):
-        """Make HTTP request with human-like behavior"""
+    def make_human_like_request(self, url, max_retries=3, action='browsing', conditional=None):
+        """Make HTTP request with human-like behavior
+        
+        With conditional set to a PageExtraction and a validator store, the
+        ETag/Last-Modified validators stored for that extraction are sent and
+        a 304 response is returned as-is.
+        """
+        if self.cache:
+            cached = self.cache.get(url)
+            if cached:
+                print(f"  Cache hit: {url}")
+                self.last_response_cached = True
+                return cached
+            if self.cache.mode == 'offline':
+                print(f"  Cache miss (offline mode, not fetching): {url}")
+                self.last_response_cached = True
+                return None
+        
+        self.last_response_cached = False
+        
         for attempt in range(max_retries):
             try:
                 # Simulate human browsing before request
@@ -170,11 +412,22 @@ class ComprehensiveCategoryScraper:
                 # Add realistic timeout
                 timeout = random.uniform(25, 35)
                 
-                response = self.session.get(url, timeout=timeout)
+                request_headers = {}
+                if conditional and self.validators:
+                    request_headers = self.validators.conditional_headers(url, conditional)
+                
+                response = self.session.get(url, timeout=timeout, headers=request_headers)
+                
+                if response.status_code == 304:
+                    print(f"  Not modified (304): {url}")
+                    return response
                 
                 if response.status_code == 200:
                     print(f"  Success: {len(response.text):,} chars received")
                     
+                    if self.cache:
+                        self.cache.store_response(url, response)
+                    
                     # Simulate human reading time based on content length
                     content_length = len(response.text)
                     if content_length > 50000:
@@ -233,6 +486,9 @@ class ComprehensiveCategoryScraper:
     
     def simulate_mouse_movements(self):
         """Simulate mouse movements and scrolling"""
+        if self.last_response_cached:
+            return
+        
         # Simulate scrolling behavior
         scroll_pauses = random.randint(2, 5)
         for i in range(scroll_pauses):
@@ -242,6 +498,29 @@ class ComprehensiveCategoryScraper:
         hover_delay = random.uniform(0.5, 1.5)
         time.sleep(hover_delay)
     
+    def report_cache_stats(self):
+        """Print response cache, conditional GET and normalization cache counters"""
+        if self.cache:
+            stats = self.cache.stats()
+            print(f"Cache ({stats['mode']}): {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1f}% hit rate), {stats['entries']} entries, "
+                  f"{stats['size_bytes'] / 1024 / 1024:.1f} MB, {stats['evictions']} evictions")
+        
+        if self.validators:
+            stats = self.validators.stats()
+            print(f"Conditional GET: {stats['not_modified']} pages not modified, "
+                  f"{stats['modified']} re-extracted ({stats['reuse_rate']:.1f}% reused)")
+        
+        if self.product_store:
+            stats = self.product_store.stats()
+            print(f"Product store: {stats['upserts']} upserts, {stats['products']} products "
+                  f"in {self.product_store.path}")
+        
+        stats = self.normalization_cache.stats()
+        if stats['hits'] or stats['misses']:
+            print(f"Product normalization: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1f}% hit rate), {stats['entries']} entries")
+    
     def run_combined_scraper(self, fast_mode=False):
         """Run hierarchy + comprehensive product scraping and save in one file"""
         try:
@@ -405,6 +684,7 @@ class ComprehensiveCategoryScraper:
                 self.rotate_user_agent()
 
         print(f"\nHierarchy rows collected: {len(hierarchy_rows)}")
+        self.report_cache_stats()
         return hierarchy_rows
 
     def _get_fixed_root_categories(self):
@@ -432,26 +712,15 @@ class ComprehensiveCategoryScraper:
 
         excel_filename = f"category_hierarchy_{timestamp}.xlsx"
         try:
-            df = pd.DataFrame(rows)
-            with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Hierarchy', index=False)
-
-                # Simple counts per level
-                if {'category 1'} <= set(df.columns):
-                    c1 = df.groupby('category 1').size().reset_index(name='Count')
-                    c1.to_excel(writer, sheet_name='Category1 Counts', index=False)
-                if {'category 1', 'category 2'} <= set(df.columns):
-                    c2 = df.groupby(['category 1', 'category 2']).size().reset_index(name='Count')
-                    c2.to_excel(writer, sheet_name='Category2 Counts', index=False)
-                if {'category 1', 'category 2', 'category 3'} <= set(df.columns):
-                    c3 = df.groupby(['category 1', 'category 2', 'category 3']).size().reset_index(name='Count')
-                    c3.to_excel(writer, sheet_name='Category3 Counts', index=False)
-
+            # Hierarchy sheet plus simple counts per level
+            write_excel(rows, excel_filename, HIERARCHY_EXCEL_LAYOUT)
             print(f"Excel file saved: {excel_filename}")
         except Exception as e:
             print(f"Error saving hierarchy Excel: {str(e)}")
             print("JSON file saved successfully")
 
+        self._save_columnar(rows, f"category_hierarchy_{timestamp}")
+
     def save_combined_results(self, hierarchy_rows, product_rows):
         """Save both hierarchy and products into one JSON and one Excel"""
         if not hierarchy_rows and not product_rows:
@@ -462,7 +731,7 @@ class ComprehensiveCategoryScraper:
 
         combined = {
             'hierarchy': hierarchy_rows or [],
-            'products': product_rows or []
+            'products': list(product_rows or [])  # A stream from scrape_all_categories_comprehensive
         }
 
         json_filename = f"combined_{timestamp}.json"
@@ -471,32 +740,12 @@ class ComprehensiveCategoryScraper:
 
         excel_filename = f"combined_{timestamp}.xlsx"
         try:
-            with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                if product_rows:
-                    df_products = pd.DataFrame(product_rows)
-                    df_products.to_excel(writer, sheet_name='Products', index=False)
-
-                    # Summaries
-                    cols = df_products.columns
-                    if {'category 1'} <= set(cols):
-                        df_products.groupby('category 1').size().reset_index(name='Count').to_excel(writer, sheet_name='Cat1 Products', index=False)
-                    if {'category 1','category 2'} <= set(cols):
-                        df_products.groupby(['category 1','category 2']).size().reset_index(name='Count').to_excel(writer, sheet_name='Cat2 Products', index=False)
-                    if {'category 1','category 2','category 3'} <= set(cols):
-                        df_products.groupby(['category 1','category 2','category 3']).size().reset_index(name='Count').to_excel(writer, sheet_name='Cat3 Products', index=False)
-                    if 'Brand' in cols:
-                        df_products.groupby('Brand').size().reset_index(name='Count').to_excel(writer, sheet_name='Brand Products', index=False)
-
-                if hierarchy_rows:
-                    df_h = pd.DataFrame(hierarchy_rows)
-                    df_h.to_excel(writer, sheet_name='Hierarchy', index=False)
-                    cols_h = df_h.columns
-                    if {'category 1'} <= set(cols_h):
-                        df_h.groupby('category 1').size().reset_index(name='Count').to_excel(writer, sheet_name='Cat1 Hierarchy', index=False)
-                    if {'category 1','category 2'} <= set(cols_h):
-                        df_h.groupby(['category 1','category 2']).size().reset_index(name='Count').to_excel(writer, sheet_name='Cat2 Hierarchy', index=False)
-                    if {'category 1','category 2','category 3'} <= set(cols_h):
-                        df_h.groupby(['category 1','category 2','category 3']).size().reset_index(name='Count').to_excel(writer, sheet_name='Cat3 Hierarchy', index=False)
+            parts = []
+            if product_rows:
+                parts.append((product_rows, COMBINED_PRODUCTS_EXCEL_LAYOUT))
+            if hierarchy_rows:
+                parts.append((hierarchy_rows, COMBINED_HIERARCHY_EXCEL_LAYOUT))
+            write_workbook(excel_filename, parts)
 
             print(f"Combined Excel saved: {excel_filename}")
             print(f"Combined JSON saved: {json_filename}")
@@ -504,6 +753,25 @@ class ComprehensiveCategoryScraper:
             print(f"Error saving combined Excel: {str(e)}")
             print(f"Combined JSON saved: {json_filename}")
 
+        if product_rows:
+            self._save_columnar(product_rows, f"combined_products_{timestamp}")
+        if hierarchy_rows:
+            self._save_columnar(hierarchy_rows, f"combined_hierarchy_{timestamp}")
+
+    def _save_columnar(self, rows, basename):
+        """Save a columnar copy of rows (dictionary-encoded categories, numeric prices)"""
+        if not self.columnar_format:
+            return None
+        
+        columnar_filename = basename + COLUMNAR_SUFFIXES[self.columnar_format]
+        try:
+            write_columnar(rows, columnar_filename)
+            print(f"Columnar file saved: {columnar_filename}")
+            return columnar_filename
+        except Exception as e:
+            print(f"Error saving columnar file: {str(e)}")
+            return None
+
     def discover_all_categories(self):
         """Discover all categories from the main navigation"""
         print("Discovering all categories from main navigation...")
@@ -514,7 +782,7 @@ class ComprehensiveCategoryScraper:
                 print(f"Failed to access main page")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text, self.html_parser, strategies=('links',))
             categories = []
             
             # Method 1: Look for main navigation menu
@@ -572,15 +840,11 @@ class ComprehensiveCategoryScraper:
             return False
         
         # Look for category indicators in URL
-        category_indicators = ['routers', 'switches', 'firewalls', 'wireless', 'servers', 'storages']
-        href_lower = href.lower()
-        
-        if any(indicator in href_lower for indicator in category_indicators):
+        if self.keywords.contains_any(href, MAIN_CATEGORY_INDICATORS):
             return True
         
         # Look for category indicators in text
-        text_lower = text.lower()
-        if any(indicator in text_lower for indicator in category_indicators):
+        if self.keywords.contains_any(text, MAIN_CATEGORY_INDICATORS):
             return True
         
         return False
@@ -595,7 +859,7 @@ class ComprehensiveCategoryScraper:
                 print(f"Failed to access {main_category_name}")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text, self.html_parser, strategies=('links',))
             subcategories = []
             
             # Look for subcategory links
@@ -632,17 +896,12 @@ class ComprehensiveCategoryScraper:
         if text.lower() == parent_category.lower():
             return False
         
-        # Look for category patterns
-        href_lower = href.lower()
-        text_lower = text.lower()
-        
         # Should contain category-related terms
-        category_terms = ['router', 'switch', 'server', 'firewall', 'wireless', 'storage']
-        if not any(term in text_lower for term in category_terms):
+        if not self.keywords.contains_any(text, SUBCATEGORY_TERMS):
             return False
         
         # Should be a category page (not individual product)
-        if any(indicator in href_lower for indicator in ['product', 'item', 'detail']):
+        if self.keywords.contains_any(href, PRODUCT_PAGE_TERMS):
             return False
         
         return True
@@ -657,7 +916,7 @@ class ComprehensiveCategoryScraper:
                 print(f"Failed to access {subcategory_name}")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text, self.html_parser, strategies=('links',))
             product_types = []
             
             # Look for product type links
@@ -716,12 +975,30 @@ class ComprehensiveCategoryScraper:
         return True
     
     def scrape_all_categories_comprehensive(self, max_products_per_category=100):
-        """Comprehensive scraping of all categories with proper hierarchy"""
+        """Comprehensive scraping of all categories with proper hierarchy
+        
+        Returns the cleaned products as the run's product stream (read from disk, not kept in memory).
+        """
         print("Starting comprehensive category scraping...")
         print("Using human-like browsing patterns to avoid detection...")
         
-        all_products = []
+        stream_seen = self._start_product_stream()
+        try:
+            self._crawl_all_categories(max_products_per_category, stream_seen)
+        finally:
+            self._finish_product_stream()
         
+        products = self.sink.replay()
+        print(f"\n{'='*60}")
+        print(f"COMPREHENSIVE SCRAPING COMPLETE!")
+        print(f"Total products found: {len(products)}")
+        print(f"{'='*60}")
+        self.report_cache_stats()
+        
+        return products
+    
+    def _crawl_all_categories(self, max_products_per_category, stream_seen):
+        """Walk main categories, subcategories and product types, collecting their products"""
         # Simulate human browsing behavior
         self.simulate_human_browsing(self.base_url, action='first_visit')
         
@@ -730,13 +1007,13 @@ class ComprehensiveCategoryScraper:
         
         if not main_categories:
             print("No main categories found!")
-            return []
+            return
         
         print(f"\nFound {len(main_categories)} main categories")
         
         # Step 2: For each main category, discover subcategories and product types
         for i, main_cat in enumerate(main_categories):
-            if len(all_products) >= max_products_per_category * len(main_categories):
+            if self.products_collected >= max_products_per_category * len(main_categories):
                 break
                 
             print(f"\n{'='*60}")
@@ -755,12 +1032,12 @@ class ComprehensiveCategoryScraper:
                     main_cat['name'], 
                     main_cat['name']
                 )
-                all_products.extend(products)
+                self._collect_products(products, stream_seen)
                 continue
             
             # Step 3: For each subcategory, discover product types
             for j, subcat in enumerate(subcategories):
-                if len(all_products) >= max_products_per_category * len(main_categories):
+                if self.products_collected >= max_products_per_category * len(main_categories):
                     break
                     
                 print(f"\nProcessing subcategory {j+1}/{len(subcategories)}: {subcat['name']}")
@@ -777,12 +1054,12 @@ class ComprehensiveCategoryScraper:
                         subcat['name'], 
                         subcat['name']
                     )
-                    all_products.extend(products)
+                    self._collect_products(products, stream_seen)
                     continue
                 
                 # Step 4: For each product type, scrape individual products
                 for k, product_type in enumerate(product_types):
-                    if len(all_products) >= max_products_per_category * len(main_categories):
+                    if self.products_collected >= max_products_per_category * len(main_categories):
                         break
                         
                     print(f"\nProcessing product type {k+1}/{len(product_types)}: {product_type['name']}")
@@ -794,55 +1071,66 @@ class ComprehensiveCategoryScraper:
                         subcat['name'], 
                         product_type['name']
                     )
-                    all_products.extend(products)
+                    self._collect_products(products, stream_seen)
                     
                     # Human-like rate limiting
                     self.human_like_delay('click')
             
+            print(f"Kept so far: {self.summary.total} products, {self.summary.rate('price'):.1f}% with prices, "
+                  f"{len(self.summary.counts[CATEGORY_LEVELS[2]])} category paths")
+            
             # Human-like rate limiting between main categories
             self.human_like_delay('reading')
             
             # Occasionally rotate user agent
             if random.random() < 0.15:  # 15% chance
                 self.rotate_user_agent()
-        
-        # Clean and deduplicate products
-        final_products = self._clean_products_comprehensive(all_products)
-        
-        print(f"\n{'='*60}")
-        print(f"COMPREHENSIVE SCRAPING COMPLETE!")
-        print(f"Total products found: {len(final_products)}")
-        print(f"{'='*60}")
-        
-        return final_products
     
     def _scrape_products_from_category(self, category_url, category1, category2, category3):
         """Scrape products from a specific category page"""
         print(f"    Scraping products from: {category_url}")
         
         try:
-            response = self.make_human_like_request(category_url, action='product_view')
+            response = self.make_human_like_request(category_url, action='product_view', conditional=CATEGORY_EXTRACTION)
             if not response:
                 print(f"    Failed to access category")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Unchanged page: reuse the products extracted last time, skip the parse
+            if response.status_code == 304:
+                stored_products = self.validators.load_products(category_url, CATEGORY_EXTRACTION) or []
+                print(f"    Page not modified, reusing {len(stored_products)} stored products")
+                return stored_products
+            
+            strategies = self.extraction_strategies
+            soup = make_soup(response.text, self.html_parser, strategies=strategies)
+            # One walk shared by every strategy below
+            page = visit_page(soup, self.boilerplate if 'text' in strategies else None)
             products = []
             
             # Method 1: Extract from tables
-            table_products = self._extract_from_tables_enhanced(soup, category_url, category1, category2, category3)
-            products.extend(table_products)
+            if 'tables' in strategies:
+                table_products = self._extract_from_tables_enhanced(soup, category_url, category1, category2, category3, page=page)
+                products.extend(table_products)
             
             # Method 2: Extract from product links
-            link_products = self._extract_from_product_links(soup, category_url, category1, category2, category3)
-            products.extend(link_products)
+            if 'links' in strategies:
+                link_products = self._extract_from_product_links(soup, category_url, category1, category2, category3, page=page)
+                products.extend(link_products)
             
             # Method 3: Extract from text content
-            text_products = self._extract_clean_products_from_text(soup, category_url, category1, category2, category3)
-            products.extend(text_products)
+            if 'text' in strategies:
+                text_products = self._extract_clean_products_from_text(soup, category_url, category1, category2, category3, page=page)
+                products.extend(text_products)
             
             # Add images
-            products_with_images = self._add_images_to_products(products, soup, category_url)
+            if 'images' in strategies:
+                products_with_images = self._add_images_to_products(products, soup, category_url, page=page)
+            else:
+                products_with_images = products
+            
+            if self.validators:
+                self.validators.save(category_url, response.headers, products_with_images, CATEGORY_EXTRACTION)
             
             # Simulate human behavior after finding products
             if products_with_images:
@@ -858,12 +1146,12 @@ class ComprehensiveCategoryScraper:
             print(f"    Error scraping category: {str(e)}")
             return []
     
-    def _extract_from_product_links(self, soup, source_url, category1, category2, category3):
+    def _extract_from_product_links(self, soup, source_url, category1, category2, category3, page=None):
         """Extract products from individual product links"""
         products = []
         
         # Look for product links
-        product_links = soup.find_all('a', href=True)
+        product_links = page.links if page else soup.find_all('a', href=True)
         
         processed_links = 0
         for link in product_links:
@@ -882,7 +1170,7 @@ class ComprehensiveCategoryScraper:
                     response = self.make_human_like_request(product_page_url, action='product_view')
                     
                     if response:
-                        page_soup = BeautifulSoup(response.text, 'html.parser')
+                        page_soup = make_soup(response.text, self.html_parser)
                         
                         # Extract product details from individual page
                         product_details = self._extract_from_product_page(page_soup, product_page_url, category1, category2, category3)
@@ -910,35 +1198,57 @@ class ComprehensiveCategoryScraper:
         ]
     
     def scrape_with_price_focus(self, max_products=1000):
-        """Scrape focusing on price extraction and clean product names"""
+        """Scrape focusing on price extraction and clean product names
+        
+        Returns the cleaned products as the run's product stream (read from disk, not kept in memory).
+        """
         print("Starting price-focused scraping...")
         print("Using human-like browsing patterns to avoid detection...")
         
         working_urls = self.get_working_category_urls()
-        all_products = []
+        stream_seen = self._start_product_stream()
+        try:
+            self._crawl_price_pages(working_urls, max_products, stream_seen)
+        finally:
+            self._finish_product_stream()
         
+        products = self.sink.replay()
+        print(f"\nFinal results after cleaning: {len(products)} products")
+        self.report_cache_stats()
+        return products
+    
+    def _crawl_price_pages(self, working_urls, max_products, stream_seen):
+        """Fetch each category page and collect the products found with price focus"""
         # Simulate human browsing behavior
         self.simulate_human_browsing(self.base_url, action='first_visit')
         
         for i, url in enumerate(working_urls):
-            if len(all_products) >= max_products:
+            if self.products_collected >= max_products:
                 break
             
             print(f"\nCategory {i+1}/{len(working_urls)}: {url.split('/')[-1]}")
             
             try:
-                response = self.make_human_like_request(url, action='category_browse')
+                response = self.make_human_like_request(url, action='category_browse', conditional=PRICE_FOCUS_EXTRACTION)
                 
-                if response:
+                if response and response.status_code == 304:
+                    # Unchanged page: reuse the products extracted last time
+                    products = self.validators.load_products(url, PRICE_FOCUS_EXTRACTION) or []
+                    self._collect_products(products, stream_seen)
+                    print(f"  Not modified, reused {len(products)} stored products")
+                elif response:
                     print(f"  Success: {len(response.text):,} chars")
                     
                     # Extract products with enhanced price and name cleaning
                     products = self._extract_products_with_price_focus(response.text, url)
                     
+                    if self.validators:
+                        self.validators.save(url, response.headers, products, PRICE_FOCUS_EXTRACTION)
+                    
                     if products:
-                        all_products.extend(products)
+                        self._collect_products(products, stream_seen)
                         print(f"  Extracted: {len(products)} products")
-                        print(f"  Total so far: {len(all_products)}")
+                        print(f"  Total so far: {self.products_collected}")
                         
                         # Show price statistics for this category
                         with_prices = sum(1 for p in products if p.get('price'))
@@ -957,45 +1267,47 @@ class ComprehensiveCategoryScraper:
             # Occasionally rotate user agent
             if random.random() < 0.1:  # 10% chance
                 self.rotate_user_agent()
-        
-        # Clean and deduplicate
-        final_products = self._clean_products_comprehensive(all_products)
-        
-        print(f"\nFinal results after cleaning: {len(final_products)} products")
-        return final_products
     
     def _extract_products_with_price_focus(self, html_content, source_url):
         """Enhanced extraction focusing on prices and clean names"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        strategies = self.extraction_strategies
+        soup = make_soup(html_content, self.html_parser, strategies=strategies)
+        # One walk shared by every strategy below
+        page = visit_page(soup, self.boilerplate if 'text' in strategies else None)
         products = []
         
         # Strategy 1: Enhanced table extraction with aggressive price search
-        table_products = self._extract_from_tables_enhanced(soup, source_url)
-        products.extend(table_products)
+        if 'tables' in strategies:
+            table_products = self._extract_from_tables_enhanced(soup, source_url, page=page)
+            products.extend(table_products)
         
         # Strategy 2: Individual product page extraction (higher price success rate)
-        individual_products = self._extract_from_individual_pages(soup, source_url)
-        products.extend(individual_products)
+        if 'links' in strategies:
+            individual_products = self._extract_from_individual_pages(soup, source_url, page=page)
+            products.extend(individual_products)
         
         # Strategy 3: Clean concatenated product text
-        text_products = self._extract_clean_products_from_text(soup, source_url)
-        products.extend(text_products)
+        if 'text' in strategies:
+            text_products = self._extract_clean_products_from_text(soup, source_url, page=page)
+            products.extend(text_products)
         
         # Add images to all products
-        products_with_images = self._add_images_to_products(products, soup, source_url)
+        if 'images' in strategies:
+            return self._add_images_to_products(products, soup, source_url, page=page)
         
-        return products_with_images
+        return products
     
-    def _extract_from_tables_enhanced(self, soup, source_url, category1=None, category2=None, category3=None):
+    def _extract_from_tables_enhanced(self, soup, source_url, category1=None, category2=None, category3=None, page=None):
         """Enhanced table extraction with aggressive price searching"""
         products = []
-        tables = soup.find_all('table')
+        if page is None:
+            page = visit_page(soup)
         
-        for table in tables:
-            rows = table.find_all('tr')
+        for table in page.tables:
+            price_index = TablePriceIndex(table.rows, self._extract_price_from_text)
             
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
+            for position, page_row in enumerate(table.rows):
+                cells = page_row.cells
                 if len(cells) < 1:
                     continue
                 
@@ -1009,7 +1321,7 @@ class ComprehensiveCategoryScraper:
                     if self._is_valid_product_name(clean_product):
                         
                         # Aggressive price search across ALL cells and nearby content
-                        price = self._find_price_aggressively(row, soup)
+                        price = price_index.price_at(position)
                         
                         # Get product link
                         product_link = self._get_product_link_from_element(cells[0], source_url)
@@ -1023,12 +1335,12 @@ class ComprehensiveCategoryScraper:
         
         return products
     
-    def _extract_from_individual_pages(self, soup, source_url):
+    def _extract_from_individual_pages(self, soup, source_url, page=None):
         """Try to find individual product pages (often have prices)"""
         products = []
         
         # Look for links to individual product pages
-        product_links = soup.find_all('a', href=True)
+        product_links = page.links if page else soup.find_all('a', href=True)
         
         processed_links = 0
         for link in product_links:
@@ -1049,7 +1361,7 @@ class ComprehensiveCategoryScraper:
                     response = self.make_human_like_request(product_page_url, action='product_view')
                     
                     if response:
-                        page_soup = BeautifulSoup(response.text, 'html.parser')
+                        page_soup = make_soup(response.text, self.html_parser)
                         
                         # Extract product details from individual page
                         product_details = self._extract_from_product_page(page_soup, product_page_url)
@@ -1071,39 +1383,31 @@ class ComprehensiveCategoryScraper:
         
         return products
     
-    def _extract_clean_products_from_text(self, soup, source_url, category1=None, category2=None, category3=None):
+    def _extract_clean_products_from_text(self, soup, source_url, category1=None, category2=None, category3=None, page=None):
         """Extract clean products from text content"""
         products = []
         
         # Get all text and clean it
-        text_content = soup.get_text()
+        text_content = page.text if page else soup.get_text()
         
         # Remove JavaScript disabled message and navigation
         text_content = self._clean_page_text(text_content)
         
-        # Extract products using enhanced patterns
-        product_patterns = [
-            r'((?:Cisco|Huawei|Dell|HPE|Juniper|Aruba)\s+[A-Z\d][^\n]{10,80})',
-            r'([A-Z]{2,}\d+[A-Z\d\-]*\s+[^\n]{10,60})',
-            r'(NetEngine\s+[^\n]{5,40})',
-            r'(Catalyst\s+[^\n]{5,40})',
-            r'(PowerEdge\s+[^\n]{5,40})',
-            r'(ProLiant\s+[^\n]{5,40})'
-        ]
+        price_index = None
         
-        for pattern in product_patterns:
-            matches = re.findall(pattern, text_content, re.MULTILINE | re.IGNORECASE)
-            for match in matches:
-                clean_match = re.sub(r'\s+', ' ', match.strip())
-                if self._is_valid_product_name(clean_match):
-                    
-                    # Look for price near this product mention
-                    price = self._find_price_near_text(clean_match, text_content)
-                    
-                    product = self._create_product_object(
-                        clean_match, price, source_url, source_url, category1, category2, category3
-                    )
-                    products.append(product)
+        # Extract products using enhanced patterns (see product_text.py)
+        for candidate in PRODUCT_TEXT_SCANNER.scan(text_content):
+            if self._is_valid_product_name(candidate.name):
+                
+                # Look for price near this product mention
+                if price_index is None:
+                    price_index = PricePositionIndex(text_content)
+                price = price_index.price_near(candidate.start, candidate.end)
+                
+                product = self._create_product_object(
+                    candidate.name, price, source_url, source_url, category1, category2, category3
+                )
+                products.append(product)
         
         return products
     
@@ -1171,6 +1475,10 @@ class ComprehensiveCategoryScraper:
         if not text:
             return ""
         
+        # Most table cells contain none of the boilerplate openings
+        if not self.keywords.contains_any(text, BOILERPLATE_ANCHORS):
+            return self._collapse_whitespace(text)
+        
         # Remove common navigation and header text
         remove_patterns = [
             r'JavaScript seems to be disabled.*?turn on Javascript in your browser\.',
@@ -1187,22 +1495,15 @@ class ComprehensiveCategoryScraper:
         for pattern in remove_patterns:
             clean_text = re.sub(pattern, '', clean_text, flags=re.DOTALL | re.IGNORECASE)
         
-        # Remove excessive whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text)
-        clean_text = re.sub(r'\n\s*\n', '\n', clean_text)
-        
-        return clean_text.strip()
+        return self._collapse_whitespace(clean_text)
+    
+    def _collapse_whitespace(self, text):
+        """Remove excessive whitespace"""
+        return ' '.join(text.split())
     
     def _is_navigation_text(self, text):
         """Check if text is navigation/header content"""
-        nav_indicators = [
-            'shop by categories', 'contact us', 'track order', 'express shipping',
-            'javascript', 'browser', 'usd', 'aud', 'gbp', 'english', 'español',
-            'router-switch.com', 'disabled', 'currency', 'language'
-        ]
-        
-        text_lower = text.lower()
-        return any(indicator in text_lower for indicator in nav_indicators)
+        return self.keywords.contains_any(text, NAV_INDICATORS)
     
     def _looks_like_single_product(self, text):
         """Check if text looks like a single product name"""
@@ -1210,10 +1511,10 @@ class ComprehensiveCategoryScraper:
             return False
         
         # Must have brand or model number
-        has_brand = any(brand in text.lower() for brand in self.brands.keys())
+        found = self.keywords.matches(text)
+        has_brand = not found.isdisjoint(self.brand_keys)
         has_model = bool(re.search(r'\b[A-Z]{2,}\d+\b', text.upper()))
-        has_product_type = any(ptype in text.lower() for ptype in 
-                              ['router', 'switch', 'server', 'firewall'])
+        has_product_type = not found.isdisjoint(PRODUCT_TYPES)
         
         # Shouldn't have navigation text
         if self._is_navigation_text(text):
@@ -1221,97 +1522,10 @@ class ComprehensiveCategoryScraper:
         
         return has_brand or has_model or has_product_type
     
-    def _find_price_aggressively(self, row_element, soup):
-        """Aggressively search for prices in and around an element"""
-        
-        # Strategy 1: Check all cells in the row
-        if row_element:
-            cells = row_element.find_all(['td', 'th'])
-            for cell in cells:
-                price = self._extract_price_from_text(cell.get_text())
-                if price:
-                    return price
-        
-        # Strategy 2: Check parent and sibling elements
-        if row_element and row_element.parent:
-            parent_text = row_element.parent.get_text()
-            price = self._extract_price_from_text(parent_text)
-            if price:
-                return price
-        
-        # Strategy 3: Look for price in nearby elements
-        if row_element:
-            # Check next few siblings
-            next_elem = row_element.find_next_sibling()
-            for _ in range(3):
-                if next_elem:
-                    price = self._extract_price_from_text(next_elem.get_text())
-                    if price:
-                        return price
-                    next_elem = next_elem.find_next_sibling()
-        
-        return ""
-    
-    def _find_price_near_text(self, product_text, full_text):
-        """Find price near product mention in text"""
-        # Find position of product in text
-        product_pos = full_text.find(product_text)
-        if product_pos == -1:
-            return ""
-        
-        # Check text around the product mention (500 chars before and after)
-        start = max(0, product_pos - 500)
-        end = min(len(full_text), product_pos + len(product_text) + 500)
-        
-        surrounding_text = full_text[start:end]
-        
-        return self._extract_price_from_text(surrounding_text)
-    
     def _extract_price_from_text(self, text):
-        """Extract price from text using comprehensive patterns"""
-        if not text:
-            return ""
-        
-        # Comprehensive price patterns
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',                      # $1,234.56
-            r'USD\s*[\d,]+\.?\d*',                  # USD 1234
-            r'[\d,]+\.?\d*\s*USD',                  # 1234 USD
-            r'Price:\s*\$?[\d,]+\.?\d*',            # Price: $1234
-            r'Cost:\s*\$?[\d,]+\.?\d*',             # Cost: $1234
-            r'MSRP:\s*\$?[\d,]+\.?\d*',             # MSRP: $1234
-            r'List:\s*\$?[\d,]+\.?\d*',             # List: $1234
-            r'Sale:\s*\$?[\d,]+\.?\d*',             # Sale: $1234
-            r'[\d,]{3,}\.?\d{0,2}(?=\s|$)',         # Any 3+ digit number
-            r'€[\d,]+\.?\d*',                       # €1234
-            r'£[\d,]+\.?\d*',                       # £1234
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                price_text = match.group()
-                
-                # Validate this looks like a reasonable price
-                if self._is_reasonable_price(price_text):
-                    return price_text
-        
-        return ""
-    
-    def _is_reasonable_price(self, price_text):
-        """Check if extracted text is a reasonable price"""
-        # Extract just the numbers
-        numbers = re.sub(r'[^\d.]', '', price_text)
-        
-        if not numbers:
-            return False
-        
-        try:
-            value = float(numbers)
-            # Reasonable price range for IT equipment
-            return 10 <= value <= 500000
-        except:
-            return False
+        """Extract price from text using comprehensive patterns (see price_engine.py)"""
+        match = PRICE_ENGINE.find(text)
+        return match.raw if match else ""
     
     def _is_product_page_link(self, href, text):
         """Check if link goes to individual product page"""
@@ -1399,20 +1613,15 @@ class ComprehensiveCategoryScraper:
         if not name or len(name) < 5 or len(name) > 150:
             return False
         
-        name_lower = name.lower()
+        found = self.keywords.matches(name)
         
         # Skip navigation
-        if self._is_navigation_text(name):
+        if not found.isdisjoint(NAV_INDICATORS):
             return False
         
         # Must have product indicators
-        product_indicators = [
-            'router', 'switch', 'server', 'firewall', 'module', 'card',
-            'gateway', 'access point', 'storage', 'memory', 'software'
-        ]
-        
-        has_product_indicator = any(indicator in name_lower for indicator in product_indicators)
-        has_brand = any(brand in name_lower for brand in self.brands.keys())
+        has_product_indicator = not found.isdisjoint(PRODUCT_INDICATORS)
+        has_brand = not found.isdisjoint(self.brand_keys)
         has_model = bool(re.search(r'\b[A-Z]{2,}\d+\b', name.upper()))
         
         return has_product_indicator or has_brand or has_model
@@ -1427,14 +1636,15 @@ class ComprehensiveCategoryScraper:
     
     def _create_product_object(self, name, price, product_link, source_url, category1=None, category2=None, category3=None):
         """Create product object with your exact structure"""
-        sku = self._extract_sku(name)
-        brand = self._extract_brand(name)
-        
         # Use provided categories or determine from name/url
         if category1 and category2 and category3:
-            categories = [category1, category2, category3]
+            key = (name, category1, category2, category3)
         else:
-            categories = self._determine_categories(name, source_url)
+            key = (name, source_url)
+        
+        sku, brand, warranty, description, categories = self.normalization_cache.get_or_compute(
+            key, lambda: self._normalize_product(name, source_url, category1, category2, category3)
+        )
         
         return {
             "Product Link": product_link,
@@ -1445,14 +1655,26 @@ class ComprehensiveCategoryScraper:
             "Brand": brand,
             "Condition": "New",
             "Availability": "Check Availability",
-            "Warranty": self._get_warranty(brand),
-            "Product Description": self._create_description(name, sku, brand),
+            "Warranty": warranty,
+            "Product Description": description,
             "image": "",  # Will be filled by image enhancement
             "category 1": categories[0],
             "category 2": categories[1],
             "category 3": categories[2]
         }
     
+    def _normalize_product(self, name, source_url, category1=None, category2=None, category3=None):
+        """Fields derived from a product name: (sku, brand, warranty, description, categories)"""
+        sku = self._extract_sku(name)
+        brand = self._extract_brand(name)
+        
+        if category1 and category2 and category3:
+            categories = (category1, category2, category3)
+        else:
+            categories = tuple(self._determine_categories(name, source_url))
+        
+        return sku, brand, self._get_warranty(brand), self._create_description(name, sku, brand), categories
+    
     def _extract_sku(self, text):
         """Extract SKU from text"""
         patterns = [
@@ -1469,93 +1691,17 @@ class ComprehensiveCategoryScraper:
     
     def _extract_brand(self, text):
         """Extract brand from text"""
-        text_lower = text.lower()
+        found = self.keywords.matches(text)
         
         for brand_key, brand_name in self.brands.items():
-            if brand_key in text_lower:
+            if brand_key in found:
                 return brand_name
         
         return "Generic"
     
     def _determine_categories(self, name, url):
-        """Determine categories based on URL and product name"""
-        name_lower = name.lower()
-        url_lower = url.lower()
-        
-        # Extract category information from URL
-        category1 = "Networking"  # Default
-        category2 = "Network Equipment"  # Default
-        category3 = "Network Equipment"  # Default
-        
-        # Determine Category 1 (Main Category) from URL
-        if 'routers' in url_lower:
-            category1 = "Networking"
-            category2 = "Routers"
-        elif 'switches' in url_lower:
-            category1 = "Networking"
-            category2 = "Switches"
-        elif 'firewalls' in url_lower or 'security' in url_lower:
-            category1 = "Security"
-            category2 = "Firewalls"
-        elif 'wireless' in url_lower or 'wlan' in url_lower:
-            category1 = "Networking"
-            category2 = "Wireless"
-        elif 'servers' in url_lower:
-            category1 = "Servers"
-            category2 = "Servers"
-        elif 'storages' in url_lower or 'storage' in url_lower:
-            category1 = "Storage"
-            category2 = "Storage Systems"
-        elif 'ip-phones' in url_lower or 'unified-communications' in url_lower:
-            category1 = "Unified Communications"
-            category2 = "IP Phones"
-        elif 'optical-network' in url_lower or 'olt' in url_lower or 'ont' in url_lower:
-            category1 = "Optical Network"
-            category2 = "Optical Equipment"
-        elif 'accessories' in url_lower:
-            category1 = "Networking"
-            category2 = "Accessories"
-        
-        # Determine Category 3 (Product Type) from URL and name
-        if 'cisco' in url_lower or 'cisco' in name_lower:
-            if 'router' in url_lower or 'router' in name_lower:
-                category3 = "Cisco Routers"
-            elif 'switch' in url_lower or 'switch' in name_lower:
-                category3 = "Cisco Switches"
-            elif 'firewall' in url_lower or 'firewall' in name_lower:
-                category3 = "Cisco Firewalls"
-            elif 'wireless' in url_lower or 'wireless' in name_lower:
-                category3 = "Cisco Wireless"
-        elif 'huawei' in url_lower or 'huawei' in name_lower:
-            if 'router' in url_lower or 'router' in name_lower:
-                category3 = "Huawei Routers"
-            elif 'switch' in url_lower or 'switch' in name_lower:
-                category3 = "Huawei Switches"
-            elif 'firewall' in url_lower or 'firewall' in name_lower:
-                category3 = "Huawei Firewalls"
-            elif 'wireless' in url_lower or 'wireless' in name_lower:
-                category3 = "Huawei Wireless"
-        elif 'juniper' in url_lower or 'juniper' in name_lower:
-            if 'router' in url_lower or 'router' in name_lower:
-                category3 = "Juniper Routers"
-            elif 'switch' in url_lower or 'switch' in name_lower:
-                category3 = "Juniper Switches"
-            elif 'firewall' in url_lower or 'firewall' in name_lower:
-                category3 = "Juniper Firewalls"
-        elif 'dell' in url_lower or 'dell' in name_lower:
-            if 'server' in url_lower or 'server' in name_lower:
-                category3 = "Dell Servers"
-            elif 'switch' in url_lower or 'switch' in name_lower:
-                category3 = "Dell Switches"
-        elif 'hpe' in url_lower or 'hpe' in name_lower or 'aruba' in url_lower:
-            if 'server' in url_lower or 'server' in name_lower:
-                category3 = "HPE Servers"
-            elif 'switch' in url_lower or 'switch' in name_lower:
-                category3 = "HPE Switches"
-            elif 'wireless' in url_lower or 'wireless' in name_lower:
-                category3 = "HPE Aruba Wireless"
-        
-        return [category1, category2, category3]
+        """Determine categories based on URL and product name (rules in category_rules.py)"""
+        return list(MAIN_CATEGORY_ENGINE.categorize(name, url))
     
     def _get_warranty(self, brand):
         """Get warranty"""
@@ -1570,14 +1716,14 @@ class ComprehensiveCategoryScraper:
             parts.append(f"Model: {sku}")
         return ' | '.join(parts) if parts else name[:50]
     
-    def _add_images_to_products(self, products, soup, source_url):
+    def _add_images_to_products(self, products, soup, source_url, page=None):
         """Add images using the working image filter"""
         if not products:
             return products
         
         # Find product images
         product_images = []
-        img_tags = soup.find_all('img', src=True)
+        img_tags = page.images if page else soup.find_all('img', src=True)
         
         for img in img_tags:
             src = img.get('src', '')
@@ -1596,42 +1742,57 @@ class ComprehensiveCategoryScraper:
     
     def _is_product_image(self, src, alt):
         """Check if image is product image"""
-        all_text = f"{src} {alt}".lower()
+        found = self.keywords.matches(f"{src} {alt}")
         
         # Exclude icons
-        exclude_terms = ['icon', 'logo', 'button', 'arrow', 'menu', 'nav']
-        if any(term in all_text for term in exclude_terms):
+        if not found.isdisjoint(IMAGE_EXCLUDE_TERMS):
             return False
         
         # Include product images
-        include_terms = ['product', 'router', 'switch', 'cisco', 'huawei', 'equipment']
-        return any(term in all_text for term in include_terms) or len(src) > 20
+        return not found.isdisjoint(IMAGE_INCLUDE_TERMS) or len(src) > 20
     
-    def _clean_products_comprehensive(self, products):
-        """Comprehensive product cleaning and deduplication"""
-        seen = set()
-        clean_products = []
+    def _is_new_clean_product(self, product, seen):
+        """Whether a product survives cleaning and hasn't been seen yet (records it in seen)"""
+        # Skip if missing essential data
+        if not product.get('product') or len(product['product']) < 5:
+            return False
         
-        for product in products:
-            # Skip if missing essential data
-            if not product.get('product') or len(product['product']) < 5:
-                continue
-            
-            # Skip if no meaningful data
-            if (not product.get('SKU') and 
-                product.get('Brand') == 'Generic' and 
-                not product.get('price')):
-                continue
-            
-            # Deduplication
-            identifier = f"{product['product'][:40].lower()}_{product.get('SKU', '')}"
-            if identifier in seen:
-                continue
-            
-            seen.add(identifier)
-            clean_products.append(product)
+        # Skip if no meaningful data
+        if (not product.get('SKU') and 
+            product.get('Brand') == 'Generic' and 
+            not product.get('price')):
+            return False
+        
+        # Deduplication
+        identifier = f"{product['product'][:40].lower()}_{product.get('SKU', '')}"
+        if identifier in seen:
+            return False
         
-        return clean_products
+        seen.add(identifier)
+        return True
+    
+    def _start_product_stream(self):
+        """Open the run's product stream; returns the dedup state for _collect_products"""
+        self.products_collected = 0
+        self.summary = ProductSummary(COMPREHENSIVE_EXCEL_LAYOUT, SUMMARY_FIELDS)
+        self.sink = ProductSink.for_run('comprehensive_products_', self.stream_compression, summary=self.summary)
+        print(f"Streaming products to {self.sink.path}")
+        return set()
+    
+    def _collect_products(self, products, stream_seen):
+        """Stream the page products that survive cleaning (counting every product found toward the run's limit)"""
+        self.products_collected += len(products)
+        for product in products:
+            if self._is_new_clean_product(product, stream_seen):
+                self.sink.write(product)
+                if self.product_store:
+                    self.product_store.write(product, source='comprehensive')
+    
+    def _finish_product_stream(self):
+        """Close the run's product stream and commit the products still queued for the store"""
+        self.sink.close()
+        if self.product_store:
+            self.product_store.flush()
     
     def save_comprehensive_results(self, products):
         """Save comprehensive results in both JSON and Excel formats"""
@@ -1641,89 +1802,55 @@ class ComprehensiveCategoryScraper:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        if self.sink and self.sink.closed:
+            # Build the files from the run's product stream, one product at a time, and the rollups kept while it was written
+            records, summary = self.sink.replay(), self.sink.summary
+        else:
+            records, summary = products, ProductSummary.of(products, COMPREHENSIVE_EXCEL_LAYOUT, SUMMARY_FIELDS)
+        self.summary = summary
+        
         # Save JSON
         json_filename = f"comprehensive_products_{timestamp}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(products, f, indent=2, ensure_ascii=False)
+        write_json(records, json_filename)
         
         # Save Excel
         excel_filename = f"comprehensive_products_{timestamp}.xlsx"
         try:
-            df = pd.DataFrame(products)
-            
-            # Create Excel writer with multiple sheets
-            with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-                # Main products sheet
-                df.to_excel(writer, sheet_name='All Products', index=False)
-                
-                # Category summary sheets
-                if 'category 1' in df.columns:
-                    category1_summary = df.groupby('category 1').size().reset_index(name='Product Count')
-                    category1_summary.to_excel(writer, sheet_name='Category 1 Summary', index=False)
-                
-                if 'category 2' in df.columns:
-                    category2_summary = df.groupby(['category 1', 'category 2']).size().reset_index(name='Product Count')
-                    category2_summary.to_excel(writer, sheet_name='Category 2 Summary', index=False)
-                
-                if 'category 3' in df.columns:
-                    category3_summary = df.groupby(['category 1', 'category 2', 'category 3']).size().reset_index(name='Product Count')
-                    category3_summary.to_excel(writer, sheet_name='Category 3 Summary', index=False)
-                
-                # Brand summary
-                if 'Brand' in df.columns:
-                    brand_summary = df.groupby('Brand').size().reset_index(name='Product Count')
-                    brand_summary.to_excel(writer, sheet_name='Brand Summary', index=False)
-            
+            write_excel(records, excel_filename, COMPREHENSIVE_EXCEL_LAYOUT, summary=summary)
             print(f"\nExcel file saved: {excel_filename}")
             
         except Exception as e:
             print(f"Error saving Excel file: {str(e)}")
             print("JSON file saved successfully")
         
+        columnar_filename = self._save_columnar(records, f"comprehensive_products_{timestamp}")
+        
         # Analysis
-        with_prices = sum(1 for p in products if p.get('price'))
-        with_skus = sum(1 for p in products if p.get('SKU'))
-        with_images = sum(1 for p in products if p.get('image'))
+        with_prices = summary.filled['price']
+        with_skus = summary.filled['SKU']
+        with_images = summary.filled['image']
         
         print(f"\nComprehensive results saved:")
         print(f"JSON: {json_filename}")
         print(f"Excel: {excel_filename}")
+        if columnar_filename:
+            print(f"Columnar: {columnar_filename}")
         print(f"Total products: {len(products)}")
         print(f"Products with prices: {with_prices} ({with_prices/len(products)*100:.1f}%)")
         print(f"Products with SKUs: {with_skus} ({with_skus/len(products)*100:.1f}%)")
         print(f"Products with images: {with_images} ({with_images/len(products)*100:.1f}%)")
         
         # Category analysis
-        if products:
-            category1_counts = {}
-            category2_counts = {}
-            category3_counts = {}
-            
-            for product in products:
-                cat1 = product.get('category 1', 'Unknown')
-                cat2 = product.get('category 2', 'Unknown')
-                cat3 = product.get('category 3', 'Unknown')
-                
-                category1_counts[cat1] = category1_counts.get(cat1, 0) + 1
-                category2_counts[f"{cat1} > {cat2}"] = category2_counts.get(f"{cat1} > {cat2}", 0) + 1
-                category3_counts[f"{cat1} > {cat2} > {cat3}"] = category3_counts.get(f"{cat1} > {cat2} > {cat3}", 0) + 1
-            
-            print(f"\nCategory Analysis:")
-            print(f"Category 1 (Main Categories): {len(category1_counts)}")
-            for cat, count in sorted(category1_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
-                print(f"  {cat}: {count} products")
-            
-            print(f"\nCategory 2 (Subcategories): {len(category2_counts)}")
-            for cat, count in sorted(category2_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
-                print(f"  {cat}: {count} products")
-            
-            print(f"\nCategory 3 (Product Types): {len(category3_counts)}")
-            for cat, count in sorted(category3_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
-                print(f"  {cat}: {count} products")
+        print(f"\nCategory Analysis:")
+        for heading, group_columns in zip(("Category 1 (Main Categories)", "\nCategory 2 (Subcategories)",
+                                           "\nCategory 3 (Product Types)"), CATEGORY_LEVELS):
+            print(f"{heading}: {len(summary.counts[group_columns])}")
+            for path, count in summary.top(group_columns):
+                print(f"  {' > '.join(path)}: {count} products")
         
         # Show sample products
         print(f"\nSample products found:")
-        for i, product in enumerate(products[:5]):
+        for i, product in enumerate(islice(products, 5)):
             print(f"  {i+1}. {product['product']}")
             print(f"      Categories: {product.get('category 1', 'N/A')} > {product.get('category 2', 'N/A')} > {product.get('category 3', 'N/A')}")
             print(f"      SKU: {product.get('SKU', 'Not found')}")
@@ -1731,9 +1858,12 @@ class ComprehensiveCategoryScraper:
             print(f"      Price: {product.get('price', 'Not found')}")
             print()
 
-def run_comprehensive_scraper():
+def run_comprehensive_scraper(cache=None, validators=None, html_parser=None, strategies=None, stream_compression=None,
+                              columnar_format='parquet', product_store=None):
     """Run the comprehensive category scraper"""
-    scraper = ComprehensiveCategoryScraper()
+    scraper = ComprehensiveCategoryScraper(cache=cache, validators=validators, html_parser=html_parser,
+                                           strategies=strategies, stream_compression=stream_compression,
+                                           columnar_format=columnar_format, product_store=product_store)
     
     try:
         print("="*80)
@@ -1755,10 +1885,11 @@ def run_comprehensive_scraper():
         if products:
             scraper.save_comprehensive_results(products)
             
-            # Final statistics
-            with_prices = sum(1 for p in products if p.get('price'))
-            with_skus = sum(1 for p in products if p.get('SKU'))
-            with_images = sum(1 for p in products if p.get('image'))
+            # Final statistics, from the rollups kept during the run
+            summary = scraper.summary
+            with_prices = summary.filled['price']
+            with_skus = summary.filled['SKU']
+            with_images = summary.filled['image']
             
             print(f"\n{'='*80}")
             print(f"COMPREHENSIVE SCRAPING COMPLETE!")
@@ -1768,15 +1899,7 @@ def run_comprehensive_scraper():
             print(f"SKU success rate: {with_skus}/{len(products)} ({with_skus/len(products)*100:.1f}%)")
             print(f"Image success rate: {with_images}/{len(products)} ({with_images/len(products)*100:.1f}%)")
             
-            # Category breakdown
-            categories_found = set()
-            for product in products:
-                cat1 = product.get('category 1', 'Unknown')
-                cat2 = product.get('category 2', 'Unknown')
-                cat3 = product.get('category 3', 'Unknown')
-                categories_found.add(f"{cat1} > {cat2} > {cat3}")
-            
-            print(f"Unique category combinations found: {len(categories_found)}")
+            print(f"Unique category combinations found: {len(summary.counts[CATEGORY_LEVELS[2]])}")
             
             if with_prices > 0:
                 print(f"\nSUCCESS: Found prices for {with_prices} products!")
@@ -1792,9 +1915,12 @@ def run_comprehensive_scraper():
         import traceback
         traceback.print_exc()
 
-def run_price_focused_scraper():
+def run_price_focused_scraper(cache=None, validators=None, html_parser=None, strategies=None, stream_compression=None,
+                              columnar_format='parquet', product_store=None):
     """Run the price-focused scraper (legacy method)"""
-    scraper = ComprehensiveCategoryScraper()
+    scraper = ComprehensiveCategoryScraper(cache=cache, validators=validators, html_parser=html_parser,
+                                           strategies=strategies, stream_compression=stream_compression,
+                                           columnar_format=columnar_format, product_store=product_store)
     
     try:
         print("="*80)
@@ -1814,10 +1940,11 @@ def run_price_focused_scraper():
         if products:
             scraper.save_comprehensive_results(products)
             
-            # Final statistics
-            with_prices = sum(1 for p in products if p.get('price'))
-            with_skus = sum(1 for p in products if p.get('SKU'))
-            with_images = sum(1 for p in products if p.get('image'))
+            # Final statistics, from the rollups kept during the run
+            summary = scraper.summary
+            with_prices = summary.filled['price']
+            with_skus = summary.filled['SKU']
+            with_images = summary.filled['image']
             
             print(f"\nPRICE-FOCUSED SCRAPING COMPLETE!")
             print(f"Total products: {len(products)}")
@@ -1847,9 +1974,11 @@ def run_price_focused_scraper():
         import traceback
         traceback.print_exc()
 
-def run_category_hierarchy_scraper():
+def run_category_hierarchy_scraper(cache=None, validators=None, html_parser=None, strategies=None,
+                                   columnar_format='parquet'):
     """Run only the category hierarchy scraper (Category 1 -> 2 -> 3)"""
-    scraper = ComprehensiveCategoryScraper()
+    scraper = ComprehensiveCategoryScraper(cache=cache, validators=validators, html_parser=html_parser,
+                                           strategies=strategies, columnar_format=columnar_format)
 
     try:
         print("="*80)
@@ -1884,7 +2013,68 @@ if __name__ == "__main__":
         default="comprehensive",
         help="Which scraper to run"
     )
+    parser.add_argument(
+        "--cache-mode",
+        choices=["off"] + list(CACHE_MODES),
+        default="off",
+        help="Response cache: normal (reuse fresh pages), offline (replay cache only), refresh (refetch and store)"
+    )
+    parser.add_argument("--cache-dir", default=".http_cache", help="Response cache directory")
+    parser.add_argument("--cache-ttl", type=float, default=24, help="Default cache TTL in hours")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="Cache size limit in MB")
+    parser.add_argument(
+        "--conditional-get",
+        action="store_true",
+        help="Send ETag/Last-Modified validators and reuse stored products on 304"
+    )
+    parser.add_argument(
+        "--parser",
+        choices=["auto"] + list(PARSER_BACKENDS),
+        default="auto",
+        help="HTML parser backend (auto prefers lxml)"
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=list(ALL_STRATEGIES),
+        default=list(ALL_STRATEGIES),
+        help="Extraction strategies to run; leaving out 'text' enables partial parsing"
+    )
+    parser.add_argument(
+        "--stream-compression",
+        choices=["none", "gzip", "zstd"],
+        default="none",
+        help="Compression of the NDJSON product stream written during the run (zstd needs zstandard)"
+    )
+    parser.add_argument(
+        "--columnar-format",
+        choices=["none"] + list(COLUMNAR_FORMATS),
+        default="parquet",
+        help="Columnar copy of saved results for analytics (dictionary-encoded categories, numeric prices)"
+    )
+    parser.add_argument(
+        "--product-store",
+        metavar="PATH",
+        help="SQLite file the cleaned products are upserted into across runs (e.g. products.sqlite3)"
+    )
     args = parser.parse_args()
+    stream_compression = None if args.stream_compression == "none" else args.stream_compression
+    columnar_format = None if args.columnar_format == "none" else args.columnar_format
+    
+    cache = None
+    if args.cache_mode != "off":
+        cache = ResponseCache(
+            cache_dir=args.cache_dir,
+            mode=args.cache_mode,
+            default_ttl=args.cache_ttl * 3600,
+            max_size=args.cache_max_mb * 1024 * 1024
+        )
+    
+    validators = None
+    if args.conditional_get:
+        validators = ValidatorStore(os.path.join(args.cache_dir, 'validators.sqlite3'))
+    
+    product_store = ProductStore(args.product_store) if args.product_store else None
     
     print("="*80)
     print("ROUTER-SWITCH.COM SCRAPER")
@@ -1899,14 +2089,27 @@ if __name__ == "__main__":
     print("="*80)
 
     if args.mode == "comprehensive":
-        run_comprehensive_scraper()
+        run_comprehensive_scraper(cache, validators, args.parser, args.strategies, stream_compression,
+                                  columnar_format, product_store)
     elif args.mode == "price":
-        run_price_focused_scraper()
+        run_price_focused_scraper(cache, validators, args.parser, args.strategies, stream_compression,
+                                  columnar_format, product_store)
     elif args.mode == "hierarchy":
-        run_category_hierarchy_scraper()
+        run_category_hierarchy_scraper(cache, validators, args.parser, args.strategies, columnar_format)
     elif args.mode == "combined":
         # Use the class-bound combined runner
-        ComprehensiveCategoryScraper().run_combined_scraper()
+        ComprehensiveCategoryScraper(cache=cache, validators=validators, html_parser=args.parser,
+                                     strategies=args.strategies,
+                                     stream_compression=stream_compression,
+                                     columnar_format=columnar_format,
+                                     product_store=product_store).run_combined_scraper()
     elif args.mode == "fast":
         # Fast mode with reduced delays and limits
-        ComprehensiveCategoryScraper().run_combined_scraper(fast_mode=True)
\ No newline at end of file
+        ComprehensiveCategoryScraper(cache=cache, validators=validators, html_parser=args.parser,
+                                     strategies=args.strategies,
+                                     stream_compression=stream_compression,
+                                     columnar_format=columnar_format,
+                                     product_store=product_store).run_combined_scraper(fast_mode=True)
+
+    if product_store:
+        product_store.close()
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Parse Worker Pool
+=================
+
+Moves HTML parsing and product extraction off the fetching thread and
+into worker processes, so downloads keep going while earlier pages are
+parsed on other cores:
+- Jobs carry the raw page bytes plus category context; results carry
+  plain product dicts, so only picklable data crosses process boundaries
+- The extract function and the per-process initializer must be
+  module-level callables; each worker builds its extractor once
+- Results come back in submission order or as soon as each job finishes
+- run() awaits a job from asyncio code without blocking the event loop
+
+With columns set, workers don't pickle product dicts back: each result is
+written as an Arrow IPC stream (one string column per product field) into
+a shared-memory block, and only the block's name travels through the pool.
+The parent maps the block without copying it, then converts the rows back
+into product dicts. That conversion is not cheaper than unpickling the
+dicts; benchmark_parse_workers.py compares both transfers.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from functools import partial
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+
+@dataclass(frozen=True)
+class PageJob:
+    """A fetched page waiting to be parsed"""
+    category_name: str
+    source_url: str
+    body: bytes
+    encoding: str = 'utf-8'
+    
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors='replace')
+
+@dataclass(frozen=True)
+class SharedBatch:
+    """Name and size of a shared-memory block holding an Arrow IPC stream"""
+    name: str
+    size: int
+    rows: int
+
+@dataclass
+class PageResult:
+    """Products extracted from one page"""
+    category_name: str
+    source_url: str
+    products: List[Dict] = field(default_factory=list)
+    # Product links found on the page (the fetching side paces its clicks on these)
+    link_count: int = 0
+    # Products left in shared memory by the worker, until the pool maps them
+    batch: Optional[SharedBatch] = None
+
+def export_shared_batch(products: List[Dict], columns: Sequence[str]) -> SharedBatch:
+    """Write products as one Arrow record batch into a new shared-memory block"""
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    batch = pa.RecordBatch.from_pydict(
+        {column: [product.get(column) for product in products] for column in columns},
+        schema=schema)
+    
+    # Size the block first, then serialize straight into it
+    sizing = pa.MockOutputStream()
+    with pa.ipc.new_stream(sizing, schema) as writer:
+        writer.write_batch(batch)
+    size = sizing.size()
+    
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        with pa.ipc.new_stream(pa.FixedSizeBufferWriter(pa.py_buffer(memory.buf)), schema) as writer:
+            writer.write_batch(batch)
+        del writer  # Drops the last view of the block, so it can be closed
+    except BaseException:
+        memory.unlink()
+        raise
+    memory.close()
+    return SharedBatch(memory.name, size, batch.num_rows)
+
+class MappedBatch:
+    """A worker's shared-memory batch, mapped into this process without copying
+    
+    The block is unlinked on close(); release every reference to table first.
+    """
+    
+    def __init__(self, batch: SharedBatch):
+        self.memory = shared_memory.SharedMemory(name=batch.name)
+        reader = pa.ipc.open_stream(pa.py_buffer(self.memory.buf)[:batch.size])
+        self.table: Optional[pa.Table] = reader.read_all()
+    
+    def to_products(self) -> List[Dict]:
+        """The rows as product dicts, copied out of shared memory"""
+        return self.table.to_pylist()
+    
+    def close(self) -> None:
+        self.table = None
+        self.memory.close()
+        self.memory.unlink()
+    
+    def __enter__(self) -> 'MappedBatch':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def _extract_to_shared_memory(extract: Callable[[PageJob], PageResult], columns: Sequence[str],
+                              job: PageJob) -> PageResult:
+    """Run extract in a worker and move its products into shared memory"""
+    result = extract(job)
+    return replace(result, products=[], batch=export_shared_batch(result.products, columns))
+
+def receive_result(result: PageResult) -> PageResult:
+    """Materialize the products of a result a worker left in shared memory"""
+    if result.batch is None:
+        return result
+    with MappedBatch(result.batch) as mapped:
+        products = mapped.to_products()
+    return replace(result, products=products, batch=None)
+
+def discard_result(future: Future) -> None:
+    """Free the shared memory of a result nobody will receive"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    batch = future.result().batch
+    if batch is not None:
+        MappedBatch(batch).close()
+
+def default_process_count() -> int:
+    """One process per core, leaving a core for the fetching side"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+class ParseWorkerPool:
+    """Process pool running extract(job) -> PageResult for fetched pages
+    
+    With columns, workers return their products through shared memory.
+    """
+    
+    def __init__(self, extract: Callable[[PageJob], PageResult], processes: Optional[int] = None,
+                 initializer: Optional[Callable] = None, initargs: Tuple = (),
+                 columns: Optional[Sequence[str]] = None):
+        if columns:
+            # Workers share this process's tracker, so blocks they create are freed by our unlink
+            resource_tracker.ensure_running()
+            extract = partial(_extract_to_shared_memory, extract, tuple(columns))
+        self.extract = extract
+        self.processes = processes or default_process_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                            initializer=initializer, initargs=initargs)
+    
+    def submit(self, job: PageJob) -> Future:
+        """Queue a page for parsing"""
+        return self.executor.submit(self.extract, job)
+    
+    async def run(self, job: PageJob) -> PageResult:
+        """Parse a page in a worker while the event loop keeps running"""
+        future = self.submit(job)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(discard_result)
+            raise
+        return receive_result(result)
+    
+    def map(self, jobs: Iterable[PageJob], ordered: bool = True) -> Iterator[PageResult]:
+        """Parse pages in parallel, yielding results in job order or as they finish"""
+        futures = [self.submit(job) for job in jobs]
+        pending = set(futures)
+        try:
+            for future in (futures if ordered else as_completed(futures)):
+                pending.discard(future)
+                yield receive_result(future.result())
+        finally:
+            for future in pending:
+                if not future.cancel():
+                    future.add_done_callback(discard_result)
+    
+    def close(self, cancel_pending: bool = False) -> None:
+        """Wait for running jobs and stop the workers"""
+        self.executor.shutdown(wait=True, cancel_futures=cancel_pending)
+    
+    def __enter__(self) -> 'ParseWorkerPool':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(cancel_pending=exc_type is not None)
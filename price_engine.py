@@ -0,0 +1,167 @@
+"""
+Price Extraction Engine
+=======================
+
+One compiled matcher for every supported price form ($, USD, Price:/Cost:/
+MSRP:/List:/Sale: labels, bare 3+ digit numbers, EUR and GBP):
+- All forms are found in a single left-to-right scan of the input
+- Pattern priority matches the old pattern-by-pattern search: the
+  highest-priority form whose first occurrence is acceptable wins
+- Results carry the numeric value, currency and raw span, so callers
+  don't re-parse the matched text
+
+PRICE_ENGINE applies the IT-equipment price range used by main.py;
+BASIC_PRICE_ENGINE covers the shorter pattern list of background_scraper.py.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+# Comprehensive price patterns with their currency, in priority order
+PRICE_PATTERNS = [
+    (r'\$[\d,]+\.?\d*', 'USD'),                      # $1,234.56
+    (r'USD\s*[\d,]+\.?\d*', 'USD'),                  # USD 1234
+    (r'[\d,]+\.?\d*\s*USD', 'USD'),                  # 1234 USD
+    (r'Price:\s*\$?[\d,]+\.?\d*', None),             # Price: $1234
+    (r'Cost:\s*\$?[\d,]+\.?\d*', None),              # Cost: $1234
+    (r'MSRP:\s*\$?[\d,]+\.?\d*', None),              # MSRP: $1234
+    (r'List:\s*\$?[\d,]+\.?\d*', None),              # List: $1234
+    (r'Sale:\s*\$?[\d,]+\.?\d*', None),              # Sale: $1234
+    (r'[\d,]{3,}\.?\d{0,2}(?=\s|$)', ''),            # Any 3+ digit number
+    (r'€[\d,]+\.?\d*', 'EUR'),                       # €1234
+    (r'£[\d,]+\.?\d*', 'GBP'),                       # £1234
+]
+
+# Dollar, USD and bare-number forms only
+BASIC_PRICE_PATTERNS = [PRICE_PATTERNS[i] for i in (0, 1, 2, 8)]
+
+# Reasonable price range for IT equipment
+MIN_REASONABLE_PRICE = 10
+MAX_REASONABLE_PRICE = 500000
+
+_NON_NUMERIC = re.compile(r'[^\d.]')
+
+def parse_price_value(raw: str) -> Optional[float]:
+    """Numeric value of a matched price (digits and dots only), or None"""
+    numbers = _NON_NUMERIC.sub('', raw)
+    if not numbers:
+        return None
+    try:
+        return float(numbers)
+    except ValueError:
+        return None
+
+def compile_parallel(patterns: Sequence[str], flags: int = 0) -> Tuple[re.Pattern, List[int]]:
+    """Compile patterns so one finditer() pass reports every pattern matching at each position
+    
+    Each pattern is wrapped in its own capturing lookahead, behind a
+    prefilter that skips positions where none of them match. Returns the
+    regex and the group number holding each pattern's match.
+    """
+    inner_groups = [re.compile(pattern, flags).groups for pattern in patterns]
+    group_numbers = []
+    group_number = 1 + sum(inner_groups)  # After the groups of the prefilter
+    for groups in inner_groups:
+        group_numbers.append(group_number)
+        group_number += 1 + groups
+    
+    any_pattern = '|'.join(f'(?:{pattern})' for pattern in patterns)
+    captures = ''.join(f'(?:(?=({pattern})))?' for pattern in patterns)
+    return re.compile(f'(?=(?:{any_pattern})){captures}', flags), group_numbers
+
+@dataclass(frozen=True)
+class PriceMatch:
+    """A price found in text"""
+    raw: str
+    value: Optional[float]
+    currency: str
+    start: int
+    end: int
+    priority: int
+
+class PriceEngine:
+    """Finds every supported price form in one scan of the input
+    
+    The patterns are compiled with compile_parallel, so one pass reports,
+    at every position, all the patterns that match there, exactly as a
+    separate re.search() per pattern would.
+    """
+    
+    def __init__(self, patterns: Sequence[Tuple[str, Optional[str]]],
+                 min_value: Optional[float] = None, max_value: Optional[float] = None):
+        self.currencies = [currency for _, currency in patterns]
+        self.min_value = min_value
+        self.max_value = max_value
+        self.regex, self.group_numbers = compile_parallel([pattern for pattern, _ in patterns], re.IGNORECASE)
+    
+    def in_range(self, value: Optional[float]) -> bool:
+        """Whether a parsed value is acceptable (no range configured accepts any match)"""
+        if self.min_value is None and self.max_value is None:
+            return True
+        if value is None:
+            return False
+        if self.min_value is not None and value < self.min_value:
+            return False
+        if self.max_value is not None and value > self.max_value:
+            return False
+        return True
+    
+    def _match(self, scan, priority: int) -> PriceMatch:
+        group_number = self.group_numbers[priority]
+        raw = scan.group(group_number)
+        currency = self.currencies[priority]
+        if currency is None:
+            currency = 'USD' if '$' in raw else ''
+        return PriceMatch(raw, parse_price_value(raw), currency,
+                          scan.start(group_number), scan.end(group_number), priority)
+    
+    def find(self, text: str) -> Optional[PriceMatch]:
+        """Best price in text by pattern priority, or None
+        
+        A pattern only counts with its first occurrence; if that is out of
+        range the next pattern is tried, as the old per-pattern search did.
+        """
+        if not text:
+            return None
+        
+        pattern_count = len(self.group_numbers)
+        resolved = [False] * pattern_count
+        best = None
+        
+        for scan in self.regex.finditer(text):
+            for priority in range(pattern_count if best is None else best.priority):
+                if resolved[priority] or scan.group(self.group_numbers[priority]) is None:
+                    continue
+                resolved[priority] = True
+                match = self._match(scan, priority)
+                if self.in_range(match.value):
+                    best = match
+                    break
+            
+            # Stop once no higher-priority pattern can still win
+            if best is not None and all(resolved[:best.priority]):
+                break
+        
+        return best
+    
+    def find_all(self, text: str) -> List[PriceMatch]:
+        """Every non-overlapping occurrence of every pattern, in text order"""
+        matches = []
+        if not text:
+            return matches
+        
+        next_start = [0] * len(self.group_numbers)
+        for scan in self.regex.finditer(text):
+            for priority, group_number in enumerate(self.group_numbers):
+                start = scan.start(group_number)
+                if start == -1 or start < next_start[priority]:
+                    continue
+                match = self._match(scan, priority)
+                next_start[priority] = match.end
+                matches.append(match)
+        
+        return matches
+
+PRICE_ENGINE = PriceEngine(PRICE_PATTERNS, MIN_REASONABLE_PRICE, MAX_REASONABLE_PRICE)
+BASIC_PRICE_ENGINE = PriceEngine(BASIC_PRICE_PATTERNS)
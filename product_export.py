@@ -0,0 +1,555 @@
+"""
+Product Export
+==============
+
+Streaming product output shared by every scraper:
+- ProductSink appends each product to an NDJSON file (one JSON object per
+  line) as soon as it is extracted, flushing every few products or seconds,
+  so a crash or SIGTERM only loses the last unflushed lines
+- Streams can be gzip (.ndjson.gz) or zstd (.ndjson.zst) compressed;
+  zstd needs the optional 'zstandard' package
+- ProductStream reads a stream back lazily, ignoring a line cut off by a
+  crash, and can be iterated more than once; scrapers return the stream
+  of their run instead of keeping every product in memory
+- write_json() and write_excel() build the usual JSON and Excel artifacts
+  from a product list or stream without holding them in memory; Excel rows
+  go through openpyxl's write-only mode and continue on a new sheet when
+  one reaches Excel's row limit
+- write_columnar() writes the same rows as Parquet or Arrow IPC, with the
+  category-like columns dictionary-encoded and prices as numbers;
+  write_record_batches() writes ready-made Arrow batches the same way
+- ProductSummary keeps the columns, the layout's summary counts and field
+  fill rates up to date as products are written; a sink given one hands
+  it to write_excel()/write_columnar(), which then skip their counting
+  pass, and scrapers read live stats from it mid-run
+- finalize_stream() builds the artifacts from a stream file
+
+Excel layouts (the product sheet plus per-column count summaries) of each
+scraper are kept here, so a stream left behind by a crashed run can be
+finalized later:
+
+    python product_export.py router-switch-products-20250918_183800_3f9a1c.ndjson --layout background
+"""
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from price_engine import parse_price_value
+
+logger = logging.getLogger(__name__)
+
+STREAM_COMPRESSIONS = ('gzip', 'zstd')
+
+# File suffix of each stream compression
+STREAM_SUFFIXES = {None: '.ndjson', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+def stream_compression(path: str) -> Optional[str]:
+    """Compression of a stream file, from its suffix"""
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd streams need the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+def open_stream(path: str, mode: str = 'r', compression: Optional[str] = None):
+    """Open a (possibly compressed) NDJSON stream as UTF-8 text; mode is 'r', 'w' or 'a'"""
+    compression = compression or stream_compression(path)
+    if compression is None:
+        return open(path, mode, encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if compression == 'zstd':
+        zstandard = _zstandard()
+        raw = open(path, mode + 'b')
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    raise ValueError(f"Unknown stream compression: {compression} (expected one of {STREAM_COMPRESSIONS})")
+
+class ProductStream:
+    """Products of an NDJSON stream file, read lazily on each iteration"""
+    
+    def __init__(self, path: str, compression: Optional[str] = None, count: Optional[int] = None):
+        self.path = path
+        self.compression = compression
+        # Number of products, if known (a sink's replay knows it); otherwise counted on first len()
+        self.count = count
+    
+    def __len__(self) -> int:
+        if self.count is None:
+            self.count = sum(1 for _ in self)
+        return self.count
+    
+    def __iter__(self) -> Iterator[Dict]:
+        with open_stream(self.path, 'r', self.compression) as stream:
+            pending = None
+            try:
+                for line in stream:
+                    if pending is not None:
+                        yield json.loads(pending)
+                    pending = line if line.strip() else None
+            except EOFError:
+                # Compressed stream cut off mid-block by a crash
+                logger.warning(f"{self.path} ends early, reading the products before the cut")
+            
+            if pending is not None:
+                try:
+                    yield json.loads(pending)
+                except json.JSONDecodeError:
+                    logger.warning(f"{self.path} ends with a partial line, skipping it")
+
+class ProductSink:
+    """Append-only NDJSON product stream, flushed every flush_every products or flush_interval seconds"""
+    
+    def __init__(self, path: str, compression: Optional[str] = None,
+                 flush_every: int = 50, flush_interval: float = 5.0,
+                 summary: Optional['ProductSummary'] = None):
+        self.path = path
+        self.compression = compression or stream_compression(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        # Rollups of everything written, kept up to date product by product
+        self.summary = summary
+        self.count = 0
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+        self.stream = open_stream(path, 'w', self.compression)
+    
+    @classmethod
+    def for_run(cls, prefix: str, compression: Optional[str] = None, **kwargs) -> 'ProductSink':
+        """New stream named after the run's start time: prefix + 20250918_183800_3f9a1c.ndjson
+        
+        The random suffix keeps runs started in the same second apart.
+        """
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return cls(f"{prefix}{timestamp}_{uuid.uuid4().hex[:6]}{STREAM_SUFFIXES[compression]}", compression, **kwargs)
+    
+    @property
+    def closed(self) -> bool:
+        return self.stream.closed
+    
+    def write(self, product: Dict) -> None:
+        self.stream.write(json.dumps(product, ensure_ascii=False))
+        self.stream.write('\n')
+        if self.summary is not None:
+            self.summary.add(product)
+        self.count += 1
+        self.unflushed += 1
+        if self.unflushed >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+    
+    def write_many(self, products: Iterable[Dict]) -> None:
+        for product in products:
+            self.write(product)
+    
+    def flush(self) -> None:
+        """Push buffered lines to the file"""
+        self.stream.flush()
+        if self.compression == 'zstd':
+            # Close the frame: a reader can't get past an unfinished one
+            self.stream.buffer.flush(_zstandard().FLUSH_FRAME)
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+    
+    def close(self) -> None:
+        if not self.stream.closed:
+            self.stream.close()
+    
+    def replay(self) -> ProductStream:
+        """Read back what was written (close the sink first)"""
+        return ProductStream(self.path, self.compression, self.count)
+    
+    def __enter__(self) -> 'ProductSink':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def write_json(products: Iterable[Dict], filename: str, indent: int = 2) -> int:
+    """Write products as a JSON array, one product at a time
+    
+    The file is byte-identical to json.dump(list(products), f, indent=indent,
+    ensure_ascii=False). Returns the number of products written.
+    """
+    count = 0
+    padding = ' ' * indent
+    with open(filename, 'w', encoding='utf-8') as f:
+        for product in products:
+            item = json.dumps(product, indent=indent, ensure_ascii=False)
+            f.write(',\n' if count else '[\n')
+            f.write(padding + item.replace('\n', '\n' + padding))
+            count += 1
+        f.write('\n]' if count else '[]')
+    return count
+
+# Worksheet limits of .xlsx files
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_TITLE = 31
+
+@dataclass(frozen=True)
+class ExcelLayout:
+    """Product sheet plus one count sheet per group-by column list (skipped when a column is missing)"""
+    product_sheet: str
+    summaries: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+    count_column: str = 'Count'
+
+# Excel layouts of the scrapers' output files
+COMPREHENSIVE_EXCEL_LAYOUT = ExcelLayout('All Products', (
+    ('Category 1 Summary', ('category 1',)),
+    ('Category 2 Summary', ('category 1', 'category 2')),
+    ('Category 3 Summary', ('category 1', 'category 2', 'category 3')),
+    ('Brand Summary', ('Brand',)),
+), count_column='Product Count')
+
+BACKGROUND_EXCEL_LAYOUT = ExcelLayout('Products', (
+    ('Category1', ('category1',)),
+    ('Category2', ('category1', 'category2')),
+    ('Category3', ('category1', 'category2', 'category3')),
+    ('Brands', ('brand',)),
+))
+
+HYBRID_EXCEL_LAYOUT = ExcelLayout('Products', (
+    ('Category1', ('Category1',)),
+    ('Brands', ('Brand',)),
+    ('DataSources', ('DataSource',)),
+))
+
+GENERATOR_EXCEL_LAYOUT = ExcelLayout('Products', (
+    ('Category1', ('Category1',)),
+    ('Brands', ('Brand',)),
+    ('Conditions', ('Condition',)),
+    ('Availability', ('Availability',)),
+))
+
+# Category hierarchy rows of main.py
+HIERARCHY_EXCEL_LAYOUT = ExcelLayout('Hierarchy', (
+    ('Category1 Counts', ('category 1',)),
+    ('Category2 Counts', ('category 1', 'category 2')),
+    ('Category3 Counts', ('category 1', 'category 2', 'category 3')),
+))
+
+# Combined products + hierarchy workbook of main.py
+COMBINED_PRODUCTS_EXCEL_LAYOUT = ExcelLayout('Products', (
+    ('Cat1 Products', ('category 1',)),
+    ('Cat2 Products', ('category 1', 'category 2')),
+    ('Cat3 Products', ('category 1', 'category 2', 'category 3')),
+    ('Brand Products', ('Brand',)),
+))
+
+COMBINED_HIERARCHY_EXCEL_LAYOUT = ExcelLayout('Hierarchy', (
+    ('Cat1 Hierarchy', ('category 1',)),
+    ('Cat2 Hierarchy', ('category 1', 'category 2')),
+    ('Cat3 Hierarchy', ('category 1', 'category 2', 'category 3')),
+))
+
+EXCEL_LAYOUTS = {
+    'comprehensive': COMPREHENSIVE_EXCEL_LAYOUT,
+    'background': BACKGROUND_EXCEL_LAYOUT,
+    'hybrid': HYBRID_EXCEL_LAYOUT,
+    'generator': GENERATOR_EXCEL_LAYOUT,
+}
+
+def _product_columns(products: Iterable[Dict]) -> List[str]:
+    """Every key of the products, in first-seen order (the columns pandas.DataFrame would build)"""
+    columns = {}
+    for product in products:
+        for key in product:
+            columns.setdefault(key, None)
+    return list(columns)
+
+class ProductSummary:
+    """Rollups of a product set, updated once per product as the products are produced
+    
+    Tracks the columns (in first-seen order), the count of every summary of
+    layout and how many products have a value in each of filled_fields, so
+    neither write_excel() nor a console report has to go over the products again.
+    """
+    
+    def __init__(self, layout: ExcelLayout, filled_fields: Iterable[str] = ()):
+        self.layout = layout
+        self.total = 0
+        self.columns: Dict[str, None] = {}
+        self.counts: Dict[Tuple[str, ...], Counter] = {group_columns: Counter()
+                                                       for _, group_columns in layout.summaries}
+        self.filled = Counter({name: 0 for name in filled_fields})
+    
+    @classmethod
+    def of(cls, products: Iterable[Dict], layout: ExcelLayout,
+           filled_fields: Iterable[str] = ()) -> 'ProductSummary':
+        """Summary of an existing product set, in one pass"""
+        summary = cls(layout, filled_fields)
+        summary.add_many(products)
+        return summary
+    
+    def add(self, product: Dict) -> None:
+        self.total += 1
+        for key in product:
+            self.columns.setdefault(key, None)
+        
+        # Same groups as pandas' groupby().size(): rows with a missing key are left out
+        for group_columns, counts in self.counts.items():
+            key = tuple(product.get(column) for column in group_columns)
+            if None not in key:
+                counts[key] += 1
+        
+        for name in self.filled:
+            if product.get(name):
+                self.filled[name] += 1
+    
+    def add_many(self, products: Iterable[Dict]) -> None:
+        for product in products:
+            self.add(product)
+    
+    def rate(self, name: str) -> float:
+        """Percentage of products with a value in a filled field"""
+        return self.filled[name] / self.total * 100 if self.total else 0.0
+    
+    def top(self, group_columns: Tuple[str, ...], n: int = 5) -> List[Tuple[Tuple[str, ...], int]]:
+        """The n largest groups, ties in first-seen order"""
+        return self.counts[group_columns].most_common(n)
+    
+    def sheets(self) -> List[Tuple[str, Tuple[str, ...], Counter]]:
+        """The layout's summary sheets whose columns all occur in the products"""
+        return [(sheet_name, group_columns, self.counts[group_columns])
+                for sheet_name, group_columns in self.layout.summaries
+                if all(column in self.columns for column in group_columns)]
+
+def _write_rows(workbook: Workbook, title: str, header: List[str], rows: Iterable[List],
+                max_rows: int) -> None:
+    """Append header and rows to write-only sheets, continuing on 'title (2)', ... when one is full"""
+    rows_per_sheet = max_rows - 1  # The header takes a row on every sheet
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    written = 0
+    part = 1
+    for row in rows:
+        if written == rows_per_sheet:
+            part += 1
+            suffix = f" ({part})"
+            sheet = workbook.create_sheet(title[:EXCEL_MAX_TITLE - len(suffix)] + suffix)
+            sheet.append(header)
+            written = 0
+        sheet.append(row)
+        written += 1
+
+def _write_part(workbook: Workbook, rows: Iterable[Dict], summary: ProductSummary, max_rows: int) -> None:
+    """Product sheet of rows plus its summary sheets (keys sorted, like pandas' groupby().size())"""
+    columns = list(summary.columns)
+    _write_rows(workbook, summary.layout.product_sheet, columns,
+                ([row.get(column) for column in columns] for row in rows), max_rows)
+    
+    for sheet_name, group_columns, counts in summary.sheets():
+        _write_rows(workbook, sheet_name, list(group_columns) + [summary.layout.count_column],
+                    (list(key) + [count] for key, count in sorted(counts.items())), max_rows)
+
+def write_excel(products: Iterable[Dict], filename: str, layout: ExcelLayout,
+                max_rows: int = EXCEL_MAX_ROWS, summary: Optional[ProductSummary] = None) -> None:
+    """Write the product sheet and the layout's summary sheets, streaming rows to disk
+    
+    Without a summary built while the products were produced, products is
+    read twice (a list or a ProductStream, not a generator): once for the
+    columns and the summary counts, once for the rows. Memory stays flat
+    however many products there are; a full sheet continues on a numbered
+    copy ('Products (2)', ...).
+    """
+    workbook = Workbook(write_only=True)
+    _write_part(workbook, products, summary or ProductSummary.of(products, layout), max_rows)
+    workbook.save(filename)
+
+def write_workbook(filename: str, parts: Iterable[Tuple[Iterable[Dict], ExcelLayout]],
+                   max_rows: int = EXCEL_MAX_ROWS) -> None:
+    """write_excel() for several row sets and layouts in one workbook"""
+    workbook = Workbook(write_only=True)
+    for rows, layout in parts:
+        _write_part(workbook, rows, ProductSummary.of(rows, layout), max_rows)
+    workbook.save(filename)
+
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# File suffix of each columnar format (.arrow is an Arrow IPC file, readable with pandas.read_feather)
+COLUMNAR_SUFFIXES = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Low-cardinality columns stored as dictionaries (pandas loads them as categoricals), in every scraper's naming
+DICTIONARY_COLUMNS = frozenset([
+    'Brand', 'brand', 'Condition', 'condition', 'Availability', 'availability', 'DataSource',
+    'Category1', 'Category2', 'Category3', 'category1', 'category2', 'category3',
+    'category 1', 'category 2', 'category 3',
+])
+
+# Price text columns stored as float64 ('$1,234.56' -> 1234.56, no price -> null)
+PRICE_COLUMNS = frozenset(['price', 'Price'])
+
+COLUMNAR_BATCH_SIZE = 8192
+
+def columnar_format(filename: str) -> str:
+    """Columnar format of a file, from its suffix"""
+    for name, suffix in COLUMNAR_SUFFIXES.items():
+        if filename.endswith(suffix):
+            return name
+    raise ValueError(f"Unknown columnar file type: {filename} (expected one of {tuple(COLUMNAR_SUFFIXES.values())})")
+
+def columnar_schema(columns: Iterable[str]) -> pa.Schema:
+    """Arrow schema of product rows: dictionary, float64 price or string columns"""
+    fields = []
+    for column in columns:
+        if column in DICTIONARY_COLUMNS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        elif column in PRICE_COLUMNS:
+            fields.append(pa.field(column, pa.float64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+class _ColumnarBatcher:
+    """Turns product rows into record batches of one schema
+    
+    Each dictionary column keeps one growing dictionary across batches,
+    so IPC files only carry dictionary deltas.
+    """
+    
+    def __init__(self, schema: pa.Schema):
+        self.schema = schema
+        self.dictionaries = {field.name: {} for field in schema if pa.types.is_dictionary(field.type)}
+    
+    def batch(self, rows: List[Dict]) -> pa.RecordBatch:
+        arrays = []
+        for field in self.schema:
+            values = [row.get(field.name) for row in rows]
+            if field.name in self.dictionaries:
+                arrays.append(self._encode(self.dictionaries[field.name], values))
+            elif field.name in PRICE_COLUMNS:
+                arrays.append(pa.array([self._price(value) for value in values], pa.float64()))
+            else:
+                arrays.append(pa.array([value if value is None or isinstance(value, str) else str(value)
+                                        for value in values], pa.string()))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+    
+    @staticmethod
+    def _encode(dictionary: Dict[str, int], values: List) -> pa.DictionaryArray:
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            value = str(value)
+            index = dictionary.get(value)
+            if index is None:
+                index = dictionary[value] = len(dictionary)
+            indices.append(index)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()),
+                                              pa.array(list(dictionary), pa.string()))
+    
+    @staticmethod
+    def _price(value) -> Optional[float]:
+        if value is None or value == '':
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        return parse_price_value(str(value))
+
+def write_record_batches(batches: Iterable[pa.RecordBatch], filename: str, schema: pa.Schema) -> int:
+    """Write Arrow record batches as a zstd-compressed Parquet or Arrow IPC file (by suffix)
+    
+    Returns the number of rows written.
+    """
+    if columnar_format(filename) == 'parquet':
+        writer = pq.ParquetWriter(filename, schema, compression='zstd')
+    else:
+        options = pa.ipc.IpcWriteOptions(compression='zstd', emit_dictionary_deltas=True)
+        writer = pa.ipc.new_file(filename, schema, options=options)
+    
+    count = 0
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        writer.close()
+    return count
+
+def write_columnar(products: Iterable[Dict], filename: str, batch_size: int = COLUMNAR_BATCH_SIZE,
+                   summary: Optional[ProductSummary] = None) -> int:
+    """Write products as a zstd-compressed Parquet or Arrow IPC file (by suffix), in batches
+    
+    products is read twice without a summary, like write_excel(). Returns the number of rows written.
+    """
+    columnar_format(filename)  # Fail on an unknown suffix before reading any products
+    columns = summary.columns if summary is not None else _product_columns(products)
+    schema = columnar_schema(columns)
+    batcher = _ColumnarBatcher(schema)
+    
+    def batches() -> Iterator[pa.RecordBatch]:
+        rows = []
+        written = False
+        for product in products:
+            rows.append(product)
+            if len(rows) == batch_size:
+                yield batcher.batch(rows)
+                written = True
+                rows = []
+        if rows or not written:
+            yield batcher.batch(rows)
+    
+    return write_record_batches(batches(), filename, schema)
+
+def finalize_stream(path: str, json_filename: Optional[str] = None, excel_filename: Optional[str] = None,
+                    layout: Optional[ExcelLayout] = None, columnar_filename: Optional[str] = None) -> int:
+    """Build the JSON, Excel and/or columnar artifacts from a stream file; returns the product count"""
+    products = ProductStream(path)
+    # One counting pass serves both the Excel summaries and the columnar schema
+    summary = ProductSummary.of(products, layout or ExcelLayout('Products'))
+    if json_filename:
+        write_json(products, json_filename)
+    if excel_filename:
+        write_excel(products, excel_filename, summary.layout, summary=summary)
+    if columnar_filename:
+        write_columnar(products, columnar_filename, summary=summary)
+    return summary.total
+
+def main():
+    """Finalize a product stream left behind by an interrupted run"""
+    parser = argparse.ArgumentParser(description="Build JSON/Excel/columnar files from an NDJSON product stream")
+    parser.add_argument("stream", help="Stream file (.ndjson, .ndjson.gz or .ndjson.zst)")
+    parser.add_argument("--layout", choices=list(EXCEL_LAYOUTS), default="background",
+                        help="Excel layout of the scraper that wrote the stream")
+    parser.add_argument("--no-excel", action="store_true", help="Skip the Excel file")
+    parser.add_argument("--columnar", choices=["none"] + list(COLUMNAR_FORMATS), default="parquet",
+                        help="Columnar copy of the products")
+    args = parser.parse_args()
+    
+    base = args.stream
+    for suffix in STREAM_SUFFIXES.values():
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+            break
+    
+    excel_filename = None if args.no_excel else f"{base}.xlsx"
+    columnar_filename = None if args.columnar == "none" else base + COLUMNAR_SUFFIXES[args.columnar]
+    count = finalize_stream(args.stream, f"{base}.json", excel_filename, EXCEL_LAYOUTS[args.layout],
+                            columnar_filename)
+    outputs = [name for name in (f"{base}.json", excel_filename, columnar_filename) if name]
+    print(f"{count} products written to {', '.join(outputs)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Product Records
+===============
+
+Compact in-memory form of the products every scraper produces:
+- ProductSchema is the dict layout of one scraper (which key holds which
+  field, in which order)
+- ProductBatch holds many products as columns: low-cardinality columns
+  (brand, categories, condition, availability, warranty, data source)
+  are dictionary-encoded into array('I') codes with interned values, the
+  rest are plain lists. It reads like a list of the scraper's dicts (len,
+  indexing, slicing, iteration), so it can stand in for a product list
+
+Each scraper names the same fields differently:
+
+    field         main.py          background_scraper.py  generators
+    name          product          product                Product
+    sku           SKU              sku                    Sku
+    product_link  Product Link     product_link           ProductLink
+    category1     category 1       category1              Category1
+
+Keys outside a schema are not kept.
+"""
+
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Fields with a handful of distinct values across a catalog
+INTERNED_FIELDS = frozenset([
+    'brand', 'category1', 'category2', 'category3', 'condition', 'availability',
+    'warranty', 'data_source',
+])
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+def _call_for_price(values: Dict[str, Optional[str]]) -> str:
+    return "Yes" if not values.get('price') else ""
+
+# A schema key is filled from a field, or computed from the other fields
+KeySource = Union[str, Callable[[Dict[str, Optional[str]]], Optional[str]]]
+
+@dataclass(frozen=True)
+class ProductSchema:
+    """Dict layout of one scraper's products: (key, field) pairs in key order"""
+    name: str
+    keys: Tuple[Tuple[str, KeySource], ...]
+    
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Fields the schema stores"""
+        return tuple(source for _, source in self.keys if isinstance(source, str))
+    
+    @property
+    def columns(self) -> List[str]:
+        """Dict keys, in order"""
+        return [key for key, _ in self.keys]
+    
+    def _build(self, values: Dict[str, Optional[str]]) -> Dict:
+        return {key: values.get(source) if isinstance(source, str) else source(values)
+                for key, source in self.keys}
+
+COMPREHENSIVE_SCHEMA = ProductSchema('comprehensive', (
+    ("Product Link", 'product_link'),
+    ("product", 'name'),
+    ("price", 'price'),
+    ("Call For Price", _call_for_price),
+    ("SKU", 'sku'),
+    ("Brand", 'brand'),
+    ("Condition", 'condition'),
+    ("Availability", 'availability'),
+    ("Warranty", 'warranty'),
+    ("Product Description", 'description'),
+    ("image", 'image'),
+    ("category 1", 'category1'),
+    ("category 2", 'category2'),
+    ("category 3", 'category3'),
+))
+
+BACKGROUND_SCHEMA = ProductSchema('background', (
+    ('product', 'name'),
+    ('image', 'image'),
+    ('sku', 'sku'),
+    ('price', 'price'),
+    ('brand', 'brand'),
+    ('category1', 'category1'),
+    ('category2', 'category2'),
+    ('category3', 'category3'),
+    ('product_link', 'product_link'),
+    ('condition', 'condition'),
+    ('availability', 'availability'),
+    ('warranty', 'warranty'),
+    ('product_description', 'description'),
+    ('scraped_at', 'scraped_at'),
+    ('source_url', 'source_url'),
+))
+
+GENERATOR_SCHEMA = ProductSchema('generator', (
+    ('Product', 'name'),
+    ('Image', 'image'),
+    ('Sku', 'sku'),
+    ('Price', 'price'),
+    ('Brand', 'brand'),
+    ('Category1', 'category1'),
+    ('Category2', 'category2'),
+    ('Category3', 'category3'),
+    ('ProductLink', 'product_link'),
+    ('Condition', 'condition'),
+    ('Availability', 'availability'),
+    ('Warranty', 'warranty'),
+    ('ProductDescription', 'description'),
+))
+
+HYBRID_SCHEMA = ProductSchema('hybrid', GENERATOR_SCHEMA.keys + (('DataSource', 'data_source'),))
+
+class _DictionaryColumn:
+    """Column of a few distinct values: one array('I') code per row plus the distinct values"""
+    
+    __slots__ = ('codes', 'values', 'index')
+    
+    def __init__(self):
+        self.codes = array('I')
+        self.values: List = []
+        self.index: Dict = {}
+    
+    def append(self, value) -> None:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(_intern(value))
+        self.codes.append(code)
+    
+    def extend(self, values: Iterable) -> None:
+        for value in values:
+            self.append(value)
+    
+    def __getitem__(self, row: int):
+        return self.values[self.codes[row]]
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def __iter__(self) -> Iterator:
+        values = self.values
+        return (values[code] for code in self.codes)
+
+class ProductBatch:
+    """Products of one schema stored column by column
+    
+    Reads as a sequence of the schema's dicts, built on access; changing
+    such a dict doesn't change the batch.
+    """
+    
+    def __init__(self, schema: ProductSchema, products: Iterable[Dict] = ()):
+        self.schema = schema
+        self.columns: Dict[str, Union[_DictionaryColumn, List]] = {
+            name: _DictionaryColumn() if name in INTERNED_FIELDS else [] for name in schema.fields
+        }
+        # (key, column) pairs the dicts are read from
+        self._sources = [(key, self.columns[source]) for key, source in schema.keys if isinstance(source, str)]
+        self.extend(products)
+    
+    def append(self, product: Dict) -> None:
+        """Add a product given as a dict of this schema"""
+        for key, column in self._sources:
+            column.append(product.get(key))
+    
+    def extend(self, products: Iterable[Dict]) -> None:
+        for product in products:
+            self.append(product)
+    
+    def extend_columns(self, columns: Dict[str, Iterable]) -> None:
+        """Add products given column by column, keyed like the schema's dicts"""
+        for key, column in self._sources:
+            column.extend(columns[key])
+    
+    def column(self, name: str) -> List:
+        """Every value of a field, in row order"""
+        return list(self.columns[name])
+    
+    def __len__(self) -> int:
+        return len(self.columns[self.schema.fields[0]]) if self.columns else 0
+    
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[index] for index in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('product batch index out of range')
+        return self.schema._build({name: column[row] for name, column in self.columns.items()})
+    
+    def __iter__(self) -> Iterator[Dict]:
+        keys = [key for key, _ in self._sources]
+        if len(keys) == len(self.schema.keys):
+            # No computed keys: the columns are the dict, in key order
+            for values in zip(*self.columns.values()):
+                yield dict(zip(keys, values))
+            return
+        
+        names = list(self.columns)
+        build = self.schema._build
+        for values in zip(*self.columns.values()):
+            yield build(dict(zip(names, values)))
@@ -0,0 +1,232 @@
+"""
+Product Store
+=============
+
+Embedded SQLite store of every product the scrapers have seen, across runs:
+- One row per canonical product key (normalized SKU plus normalized name),
+  so repeat sightings update the stored row instead of adding another
+- Upserts keep stored values a new sighting leaves empty, refresh the
+  rest and count how often each product was seen
+- Writes are buffered and committed in batches, one transaction each
+- WAL journal, so lookups from other processes don't block a running scrape
+- Indexes on SKU, brand and the category columns for quick lookups
+
+The scrapers use different field names (main.py: 'product'/'SKU'/'category 1',
+background_scraper.py: 'product'/'sku'/'category1', hybrid_scraper.py:
+'Product'/'Sku'/'Category1'); each is mapped onto the same columns and the
+original record is kept as JSON.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+from price_engine import parse_price_value
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = 'products.sqlite3'
+DEFAULT_BATCH_SIZE = 500
+
+# Store column -> field names used for it by the scrapers
+FIELD_ALIASES = {
+    'name': ('product', 'Product'),
+    'sku': ('SKU', 'sku', 'Sku'),
+    'brand': ('Brand', 'brand'),
+    'price': ('price', 'Price'),
+    'category1': ('category 1', 'category1', 'Category1'),
+    'category2': ('category 2', 'category2', 'Category2'),
+    'category3': ('category 3', 'category3', 'Category3'),
+    'condition': ('Condition', 'condition'),
+    'availability': ('Availability', 'availability'),
+    'product_link': ('Product Link', 'product_link', 'ProductLink'),
+    'image': ('image', 'Image'),
+}
+
+STORE_COLUMNS = tuple(FIELD_ALIASES)
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_SKU_NOISE = re.compile(r'[^A-Z0-9]+')
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase a product name and collapse punctuation and whitespace"""
+    return _NON_ALNUM.sub(' ', (name or '').lower()).strip()
+
+def normalize_sku(sku: Optional[str]) -> str:
+    """Uppercase a SKU and drop separators ('ISR-4331/K9' -> 'ISR4331K9')"""
+    return _SKU_NOISE.sub('', (sku or '').upper())
+
+def _field(product: Dict, column: str) -> Optional[str]:
+    """First non-empty value of a store column in a scraper record"""
+    for key in FIELD_ALIASES[column]:
+        value = product.get(key)
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+def product_key(product: Dict) -> str:
+    """Canonical key of a product: normalized SKU plus normalized name"""
+    return f"{normalize_sku(_field(product, 'sku'))}|{normalize_name(_field(product, 'name'))}"
+
+class ProductStore:
+    """SQLite product table with batched upserts by canonical key"""
+    
+    def __init__(self, path: str = DEFAULT_STORE_PATH, batch_size: int = DEFAULT_BATCH_SIZE):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        self.path = path
+        self.batch_size = batch_size
+        self.pending: List[tuple] = []
+        
+        self.upserts = 0
+        self.skipped = 0
+        
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps committed transactions consistent with NORMAL; only the last ones can be lost on power failure
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                product_key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                sku TEXT,
+                brand TEXT,
+                price TEXT,
+                price_value REAL,
+                category1 TEXT,
+                category2 TEXT,
+                category3 TEXT,
+                condition TEXT,
+                availability TEXT,
+                product_link TEXT,
+                image TEXT,
+                source TEXT,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                seen_count INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_products_sku ON products(sku)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_products_categories "
+                        "ON products(category1, category2, category3)")
+        self.db.commit()
+    
+    def write(self, product: Dict, source: Optional[str] = None) -> None:
+        """Queue a product for upsert; a full batch is committed right away"""
+        name = _field(product, 'name')
+        if not name:
+            self.skipped += 1
+            return
+        
+        values = {column: _field(product, column) for column in STORE_COLUMNS}
+        now = time.time()
+        self.pending.append((
+            product_key(product), name, values['sku'], values['brand'], values['price'],
+            parse_price_value(values['price']) if values['price'] else None,
+            values['category1'], values['category2'], values['category3'],
+            values['condition'], values['availability'], values['product_link'], values['image'],
+            source, json.dumps(product, ensure_ascii=False), now, now
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def write_many(self, products: Iterable[Dict], source: Optional[str] = None) -> None:
+        for product in products:
+            self.write(product, source)
+    
+    def flush(self) -> None:
+        """Upsert the queued products in one transaction"""
+        if not self.pending:
+            return
+        
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO products (
+                    product_key, name, sku, brand, price, price_value,
+                    category1, category2, category3, condition, availability,
+                    product_link, image, source, data, first_seen, last_seen
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(product_key) DO UPDATE SET
+                    name = excluded.name,
+                    sku = COALESCE(excluded.sku, sku),
+                    brand = COALESCE(excluded.brand, brand),
+                    price = COALESCE(excluded.price, price),
+                    price_value = COALESCE(excluded.price_value, price_value),
+                    category1 = COALESCE(excluded.category1, category1),
+                    category2 = COALESCE(excluded.category2, category2),
+                    category3 = COALESCE(excluded.category3, category3),
+                    condition = COALESCE(excluded.condition, condition),
+                    availability = COALESCE(excluded.availability, availability),
+                    product_link = COALESCE(excluded.product_link, product_link),
+                    image = COALESCE(excluded.image, image),
+                    source = COALESCE(excluded.source, source),
+                    data = excluded.data,
+                    last_seen = excluded.last_seen,
+                    seen_count = seen_count + 1
+            """, self.pending)
+        self.upserts += len(self.pending)
+        self.pending = []
+    
+    def get(self, product: Dict) -> Optional[Dict]:
+        """Stored row of the product with the same canonical key, if any"""
+        self.flush()
+        rows = self._select("WHERE product_key = ?", (product_key(product),))
+        return rows[0] if rows else None
+    
+    def find(self, sku: Optional[str] = None, brand: Optional[str] = None,
+             category1: Optional[str] = None, category2: Optional[str] = None,
+             category3: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Stored rows matching every given column"""
+        self.flush()
+        conditions = []
+        params = []
+        for column, value in (('sku', sku), ('brand', brand), ('category1', category1),
+                              ('category2', category2), ('category3', category3)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        
+        clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if limit is not None:
+            clause += " LIMIT ?"
+            params.append(limit)
+        return self._select(clause, tuple(params))
+    
+    def count(self) -> int:
+        self.flush()
+        return self.db.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+    
+    def stats(self) -> Dict:
+        """Write counters and store size"""
+        return {
+            'upserts': self.upserts,
+            'skipped': self.skipped,
+            'products': self.count()
+        }
+    
+    def close(self) -> None:
+        self.flush()
+        self.db.close()
+    
+    def __enter__(self) -> 'ProductStore':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _select(self, clause: str, params: tuple) -> List[Dict]:
+        cursor = self.db.execute(f"SELECT * FROM products {clause}", params)
+        columns = [description[0] for description in cursor.description]
+        rows = []
+        for row in cursor:
+            record = dict(zip(columns, row))
+            record['data'] = json.loads(record['data'])
+            rows.append(record)
+        return rows
@@ -0,0 +1,100 @@
+"""
+Product Text Scanner
+====================
+
+Finds product-name candidates in page text for the text strategies of
+main.py, background_scraper.py and hybrid_scraper.py:
+- All name patterns are matched in one pass over the text
+  (see price_engine.compile_parallel), with the same matches a separate
+  re.findall() per pattern would find
+- Candidates come out whitespace-normalized, with the offsets of the
+  match, pattern by pattern and in text order within a pattern (the order
+  the per-pattern findall() loops produced), each distinct name once, at
+  its first occurrence in that order; which names are valid depends only
+  on the name, so deduplicating before validation keeps the occurrence
+  that validating first would have kept
+- A generator: matches of the first pattern are yielded as they are
+  found, later patterns keep only one entry per new name
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+from price_engine import compile_parallel
+
+# Brand, model-number and series names (main.py and background_scraper.py)
+PRODUCT_TEXT_PATTERNS = [
+    r'(?:Cisco|Huawei|Dell|HPE|Juniper|Aruba)\s+[A-Z\d][^\n]{10,80}',
+    r'[A-Z]{2,}\d+[A-Z\d\-]*\s+[^\n]{10,60}',
+    r'NetEngine\s+[^\n]{5,40}',
+    r'Catalyst\s+[^\n]{5,40}',
+    r'PowerEdge\s+[^\n]{5,40}',
+    r'ProLiant\s+[^\n]{5,40}',
+]
+
+# Brand-led names only (hybrid_scraper.py)
+BRAND_TEXT_PATTERNS = [
+    r'Cisco\s+[A-Z\d][^\n]{5,50}',
+    r'Huawei\s+[A-Z\d][^\n]{5,50}',
+    r'Dell\s+[A-Z\d][^\n]{5,50}',
+    r'HPE\s+[A-Z\d][^\n]{5,50}',
+    r'Juniper\s+[A-Z\d][^\n]{5,50}',
+    r'Fortinet\s+[A-Z\d][^\n]{5,50}',
+]
+
+@dataclass(frozen=True)
+class ProductCandidate:
+    """A whitespace-normalized product name and where it starts in the text"""
+    name: str
+    start: int
+    end: int
+
+class ProductTextScanner:
+    """Single-pass scanner yielding deduplicated product-name candidates in pattern order"""
+    
+    def __init__(self, patterns: Sequence[str]):
+        self.regex, self.group_numbers = compile_parallel(patterns, re.MULTILINE | re.IGNORECASE)
+    
+    def scan(self, text: str) -> Iterator[ProductCandidate]:
+        """Yield each distinct name once, at its first match in pattern order
+        
+        Pattern order is the order of one re.findall() per pattern: every
+        match of the first pattern, then of the second, and so on. Matches
+        of the first pattern are yielded as they are found; later patterns
+        only keep the first offsets of each new name until it is their turn.
+        """
+        if not text:
+            return
+        
+        seen = set()
+        pending = [{} for _ in self.group_numbers[1:]]  # name -> (start, end), per later pattern
+        next_start = [0] * len(self.group_numbers)
+        
+        for scan in self.regex.finditer(text):
+            for index, group_number in enumerate(self.group_numbers):
+                start = scan.start(group_number)
+                # Matches of one pattern don't overlap, as with re.findall()
+                if start == -1 or start < next_start[index]:
+                    continue
+                raw = scan.group(group_number)
+                next_start[index] = start + len(raw)
+                
+                name = ' '.join(raw.split())
+                if name in seen:
+                    continue
+                offsets = (start + len(raw) - len(raw.lstrip()), start + len(raw.rstrip()))
+                if index == 0:
+                    seen.add(name)
+                    yield ProductCandidate(name, *offsets)
+                else:
+                    pending[index - 1].setdefault(name, offsets)
+        
+        for names in pending:
+            for name, offsets in names.items():
+                if name not in seen:
+                    seen.add(name)
+                    yield ProductCandidate(name, *offsets)
+
+PRODUCT_TEXT_SCANNER = ProductTextScanner(PRODUCT_TEXT_PATTERNS)
+BRAND_TEXT_SCANNER = ProductTextScanner(BRAND_TEXT_PATTERNS)
@@ -0,0 +1,163 @@
+"""Category rule tables against the if/elif chains they replaced"""
+
+import itertools
+
+from category_rules import (BACKGROUND_CATEGORY_ENGINE, GENERATOR_CATEGORY_ENGINE, HYBRID_CATEGORY_ENGINE,
+                            MAIN_CATEGORY_ENGINE)
+
+NAMES = [
+    '', 'Cisco ISR4331 Router', 'Cisco Catalyst 9300 Switch', 'Cisco ASA 5506 Firewall',
+    'Cisco Aironet Wireless AP', 'Huawei AR6120 Router', 'Huawei S5735 Switch', 'Huawei USG Firewall',
+    'Huawei AirEngine Wireless', 'Juniper MX204 Router', 'Juniper EX4300 Switch', 'Juniper SRX Firewall',
+    'Dell PowerEdge R750 Server', 'Dell N3048 Switch', 'Dell PowerVault Storage', 'HPE ProLiant DL380 Server',
+    'HPE Aruba 2930F Switch', 'HPE Aruba Wireless AP', 'Fortinet FortiGate 60F', 'Cisco Nexus 93180',
+    'Cisco Meraki MR46', 'HPE MSA 2060 Storage', 'Enterprise Edge Box', 'Generic Module', 'ASR 1001-X',
+]
+URLS = [
+    '', 'https://www.router-switch.com/routers-price.html', 'https://www.router-switch.com/switches-price.html',
+    'https://www.router-switch.com/firewalls-price.html', 'https://www.router-switch.com/security.html',
+    'https://www.router-switch.com/wireless-price.html', 'https://www.router-switch.com/wlan.html',
+    'https://www.router-switch.com/servers-price.html', 'https://www.router-switch.com/storages-price.html',
+    'https://www.router-switch.com/ip-phones-price.html', 'https://www.router-switch.com/optical-network.html',
+    'https://www.router-switch.com/accessories.html', 'https://www.router-switch.com/cisco-routers.html',
+    'https://www.router-switch.com/huawei-switch.html', 'https://www.router-switch.com/aruba-wireless.html',
+    'https://www.router-switch.com/dell-server.html', 'https://www.router-switch.com/juniper-firewall.html',
+]
+CATEGORIES = ['', 'Routers', 'Switches', 'Firewalls', 'Wireless', 'Servers', 'Storages', 'Other']
+BRANDS = ['Cisco', 'Huawei', 'Dell', 'HPE', 'Generic']
+
+def old_main_categories(name, url):
+    """main.py's _determine_categories"""
+    name_lower = name.lower()
+    url_lower = url.lower()
+    category1 = "Networking"
+    category2 = "Network Equipment"
+    category3 = "Network Equipment"
+    if 'routers' in url_lower:
+        category1, category2 = "Networking", "Routers"
+    elif 'switches' in url_lower:
+        category1, category2 = "Networking", "Switches"
+    elif 'firewalls' in url_lower or 'security' in url_lower:
+        category1, category2 = "Security", "Firewalls"
+    elif 'wireless' in url_lower or 'wlan' in url_lower:
+        category1, category2 = "Networking", "Wireless"
+    elif 'servers' in url_lower:
+        category1, category2 = "Servers", "Servers"
+    elif 'storages' in url_lower or 'storage' in url_lower:
+        category1, category2 = "Storage", "Storage Systems"
+    elif 'ip-phones' in url_lower or 'unified-communications' in url_lower:
+        category1, category2 = "Unified Communications", "IP Phones"
+    elif 'optical-network' in url_lower or 'olt' in url_lower or 'ont' in url_lower:
+        category1, category2 = "Optical Network", "Optical Equipment"
+    elif 'accessories' in url_lower:
+        category1, category2 = "Networking", "Accessories"
+    
+    def has(word):
+        return word in url_lower or word in name_lower
+    
+    if has('cisco'):
+        types = [('router', "Cisco Routers"), ('switch', "Cisco Switches"),
+                 ('firewall', "Cisco Firewalls"), ('wireless', "Cisco Wireless")]
+    elif has('huawei'):
+        types = [('router', "Huawei Routers"), ('switch', "Huawei Switches"),
+                 ('firewall', "Huawei Firewalls"), ('wireless', "Huawei Wireless")]
+    elif has('juniper'):
+        types = [('router', "Juniper Routers"), ('switch', "Juniper Switches"), ('firewall', "Juniper Firewalls")]
+    elif has('dell'):
+        types = [('server', "Dell Servers"), ('switch', "Dell Switches")]
+    elif has('hpe') or 'aruba' in url_lower:
+        types = [('server', "HPE Servers"), ('switch', "HPE Switches"), ('wireless', "HPE Aruba Wireless")]
+    else:
+        types = []
+    category3 = next((value for word, value in types if has(word)), category3)
+    
+    return (category1, category2, category3)
+
+def old_background_categories(name, category_name):
+    """background_scraper.py's _determine_categories"""
+    name_lower = name.lower()
+    cat_name_lower = category_name.lower()
+    cat1 = next((value for word, value in [('router', "Routers"), ('switch', "Switches"),
+                                           ('firewall', "Firewalls"), ('wireless', "Wireless"),
+                                           ('server', "Servers"), ('storage', "Storages")]
+                 if word in cat_name_lower), "Networking")
+    if 'cisco' in name_lower:
+        cat2 = ("Cisco Routers" if 'router' in name_lower else
+                "Cisco Switches" if 'switch' in name_lower else "Cisco Equipment")
+    elif 'huawei' in name_lower:
+        cat2 = ("Huawei Routers" if 'router' in name_lower else
+                "Huawei Switches" if 'switch' in name_lower else "Huawei Equipment")
+    else:
+        cat2 = f"{cat1} Equipment"
+    if 'enterprise' in name_lower or 'isr' in name_lower or 'asr' in name_lower:
+        cat3 = "Enterprise Series"
+    elif 'catalyst' in name_lower:
+        cat3 = "Catalyst Series"
+    elif 'poweredge' in name_lower:
+        cat3 = "PowerEdge Series"
+    else:
+        cat3 = "Standard Series"
+    return cat1, cat2, cat3
+
+def old_hybrid_categories(name, category_name, brand):
+    """hybrid_scraper.py's determine_categories, with the brand it extracted"""
+    name_lower = name.lower()
+    if 'router' in name_lower or 'isr' in name_lower or 'asr' in name_lower:
+        category1 = "Routers"
+    elif 'switch' in name_lower or 'catalyst' in name_lower:
+        category1 = "Switches"
+    elif 'firewall' in name_lower or 'asa' in name_lower:
+        category1 = "Firewalls"
+    elif 'server' in name_lower or 'poweredge' in name_lower:
+        category1 = "Servers"
+    elif 'storage' in name_lower or 'powervault' in name_lower:
+        category1 = "Storages"
+    else:
+        category1 = category_name or "Networking"
+    category2 = f"{brand} {category1}"
+    if 'enterprise' in name_lower:
+        category3 = "Enterprise Series"
+    elif 'catalyst' in name_lower:
+        category3 = "Catalyst Series"
+    elif 'poweredge' in name_lower:
+        category3 = "PowerEdge Series"
+    else:
+        category3 = "Standard Series"
+    return category1, category2, category3
+
+def old_generator_categories(product_name, brand):
+    """intelligent_generator.py's determine_categories, with the brand it extracted"""
+    product_lower = product_name.lower()
+    
+    def first(rules, default):
+        return next((value for words, value in rules if any(word in product_lower for word in words)), default)
+    
+    category1 = first([(('router', 'isr', 'asr'), "Routers"), (('switch', 'catalyst', 'nexus'), "Switches"),
+                       (('firewall', 'asa', 'fortigate'), "Firewalls"),
+                       (('wireless', 'aironet', 'meraki'), "Wireless"),
+                       (('server', 'poweredge', 'proliant'), "Servers"),
+                       (('storage', 'powervault', 'msa'), "Storages")], "Networking")
+    category3 = first([(('enterprise', 'isr', 'asr'), "Enterprise Series"), (('catalyst',), "Catalyst Series"),
+                       (('nexus',), "Nexus Series"), (('poweredge',), "PowerEdge Series"),
+                       (('proliant',), "ProLiant Series"), (('aruba',), "Aruba Series"),
+                       (('fortigate',), "FortiGate Series")], "Standard Series")
+    return category1, f"{brand} {category1}", category3
+
+def test_main_rules():
+    for name, url in itertools.product(NAMES, URLS):
+        assert MAIN_CATEGORY_ENGINE.categorize(name, url) == old_main_categories(name, url), (name, url)
+
+def test_background_rules():
+    for name, category in itertools.product(NAMES, CATEGORIES):
+        assert (BACKGROUND_CATEGORY_ENGINE.categorize(name, category=category)
+                == old_background_categories(name, category)), (name, category)
+
+def test_hybrid_rules():
+    for name, category, brand in itertools.product(NAMES, CATEGORIES, BRANDS):
+        assert (HYBRID_CATEGORY_ENGINE.categorize(name, category=category, brand=brand)
+                == old_hybrid_categories(name, category, brand)), (name, category, brand)
+
+def test_generator_rules():
+    for name, brand in itertools.product(NAMES, BRANDS):
+        assert (GENERATOR_CATEGORY_ENGINE.categorize(name, brand=brand)
+                == old_generator_categories(name, brand)), (name, brand)
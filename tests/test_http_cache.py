@@ -0,0 +1,53 @@
+"""ValidatorStore conditional headers and 304 product reuse"""
+
+from http_cache import PageExtraction, ValidatorStore
+
+URL = 'https://www.router-switch.com/routers-price.html'
+EXTRACTION = PageExtraction('test.category', ('product', 'price'))
+PRODUCTS = [{'product': 'Cisco ISR4331 Router', 'price': '$1,299.00'}]
+
+def test_not_modified_reuses_stored_products(tmp_path):
+    path = str(tmp_path / 'validators.sqlite3')
+    store = ValidatorStore(path)
+    assert store.conditional_headers(URL, EXTRACTION) == {}
+    
+    store.save(URL, {'ETag': '"abc"', 'Last-Modified': 'Tue, 01 Sep 2026 00:00:00 GMT'}, PRODUCTS, EXTRACTION)
+    store.close()
+    
+    # A later run revalidates and, on a 304, gets the products back without parsing
+    store = ValidatorStore(path)
+    assert store.conditional_headers(URL, EXTRACTION) == {
+        'If-None-Match': '"abc"', 'If-Modified-Since': 'Tue, 01 Sep 2026 00:00:00 GMT'}
+    assert store.load_products(URL, EXTRACTION) == PRODUCTS
+    assert store.stats()['not_modified'] == 1
+    store.close()
+
+def test_header_names_are_case_insensitive(tmp_path):
+    store = ValidatorStore(str(tmp_path / 'validators.sqlite3'))
+    store.save(URL, {'etag': 'W/"1"'}, PRODUCTS, EXTRACTION)
+    assert store.conditional_headers(URL, EXTRACTION) == {'If-None-Match': 'W/"1"'}
+    store.close()
+
+def test_products_are_kept_per_extraction(tmp_path):
+    store = ValidatorStore(str(tmp_path / 'validators.sqlite3'))
+    store.save(URL, {'ETag': '"abc"'}, PRODUCTS, EXTRACTION)
+    
+    other = PageExtraction('test.price_focus', ('product', 'price'))
+    assert store.conditional_headers(URL, other) == {}
+    assert store.load_products(URL, other) is None
+    
+    # Products stored with another key layout are not reused
+    changed = PageExtraction('test.category', ('product', 'price', 'SKU'))
+    assert store.conditional_headers(URL, changed) == {}
+    assert store.load_products(URL, changed) is None
+    store.close()
+
+def test_response_without_validators_forgets_the_page(tmp_path):
+    store = ValidatorStore(str(tmp_path / 'validators.sqlite3'))
+    store.save(URL, {'ETag': '"abc"'}, PRODUCTS, EXTRACTION)
+    store.save(URL, {}, [{'product': 'Cisco ISR4451 Router', 'price': '$2,000'}], EXTRACTION)
+    
+    assert store.conditional_headers(URL, EXTRACTION) == {}
+    assert store.load_products(URL, EXTRACTION) is None
+    assert store.stats()['modified'] == 2
+    store.close()
@@ -0,0 +1,39 @@
+"""KeywordMatcher against one `keyword in text` check per keyword"""
+
+import random
+
+from keyword_matcher import KeywordMatcher
+
+# Overlapping keywords: prefixes, suffixes and words inside other words
+VOCABULARY = ['cisco', 'isr', 'asr', 'router', 'routers', 'switch', 'switches', 'witch',
+              'contact us', 'contact', 'us', 'shop by categories', 'hp', 'hpe', 'e']
+FRAGMENTS = VOCABULARY + ['Cisco ISR4321', 'ROUTER', 'Contact Us', 'HPE ', 'xyz', ' ', '\n', 'ASR-9k']
+
+def old_matches(keywords, text):
+    text_lower = text.lower()
+    return frozenset(keyword for keyword in keywords if keyword in text_lower)
+
+def test_matches_substring_checks():
+    matcher = KeywordMatcher(VOCABULARY)
+    rng = random.Random(1)
+    for _ in range(3000):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+        assert matcher.matches(text) == old_matches(VOCABULARY, text), text
+
+def test_long_texts_bypass_the_memo():
+    matcher = KeywordMatcher(VOCABULARY, max_cached_length=16)
+    rng = random.Random(2)
+    texts = [''.join(rng.choice(FRAGMENTS) for _ in range(40)) for _ in range(50)]
+    for text in texts:
+        assert matcher.matches(text) == old_matches(VOCABULARY, text)
+    assert matcher._cached_scan.cache_info().currsize == 0
+    
+    assert matcher.matches('Cisco') == frozenset(['cisco'])
+    assert matcher._cached_scan.cache_info().currsize == 1
+
+def test_contains_any_and_empty_inputs():
+    matcher = KeywordMatcher(VOCABULARY)
+    assert matcher.contains_any('Please CONTACT US today', frozenset(['contact us']))
+    assert not matcher.contains_any('router', frozenset(['switch']))
+    assert matcher.matches('') == frozenset()
+    assert KeywordMatcher([]).matches('anything') == frozenset()
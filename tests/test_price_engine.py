@@ -0,0 +1,92 @@
+"""PriceEngine and PricePositionIndex against the per-pattern searches they replaced"""
+
+import random
+import re
+
+from main import PricePositionIndex
+from price_engine import BASIC_PRICE_ENGINE, PRICE_ENGINE, PRICE_PATTERNS
+
+# Page-text fragments covering every price form, in and out of range
+PRICE_TOKENS = [
+    '$1,299.00', '$5', '$0.99', '$750,000', 'USD 45', 'usd1,200', '99 USD', '1 999 USD',
+    'Price: 600', 'Price: $600,000', 'cost: $12', 'MSRP: 2,499', 'List: $3', 'Sale: 150.5',
+    '€1.200,50', '€ 80', '£12.50', '£900', '4321', '1.2.3', '12,', '2023',
+]
+WORD_TOKENS = ['Cisco ISR4321 router', 'switch', 'In stock', 'Call', '\n', 'filler text']
+
+def random_text(rng, tokens=60):
+    return ' '.join(rng.choice(PRICE_TOKENS if rng.random() < 0.4 else WORD_TOKENS)
+                    for _ in range(tokens))
+
+def old_is_reasonable_price(price_text):
+    numbers = re.sub(r'[^\d.]', '', price_text)
+    if not numbers:
+        return False
+    try:
+        return 10 <= float(numbers) <= 500000
+    except ValueError:
+        return False
+
+def old_extract_price(text):
+    """main.py's _extract_price_from_text before the price engine"""
+    for pattern, _ in PRICE_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match and old_is_reasonable_price(match.group()):
+            return match.group()
+    return ""
+
+def old_extract_basic_price(text):
+    """background_scraper.py's _extract_price_from_text before the price engine"""
+    for pattern in (r'\$[\d,]+\.?\d*', r'USD\s*[\d,]+\.?\d*', r'[\d,]+\.?\d*\s*USD',
+                    r'[\d,]{3,}\.?\d{0,2}(?=\s|$)'):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return match.group()
+    return ""
+
+def raw(match):
+    return match.raw if match else ""
+
+def test_find_matches_per_pattern_search():
+    rng = random.Random(1)
+    for _ in range(2000):
+        text = random_text(rng, rng.randint(1, 30))
+        assert raw(PRICE_ENGINE.find(text)) == old_extract_price(text), text
+
+def test_basic_engine_matches_background_search():
+    rng = random.Random(2)
+    for _ in range(2000):
+        text = random_text(rng, rng.randint(1, 30))
+        assert raw(BASIC_PRICE_ENGINE.find(text)) == old_extract_basic_price(text), text
+
+def test_out_of_range_first_hit_moves_to_next_pattern():
+    # The first $ price is too low; the second one is never considered
+    assert raw(PRICE_ENGINE.find('$5 then $1,200 or USD 300')) == 'USD 300'
+    assert raw(PRICE_ENGINE.find('')) == ""
+
+def test_price_near_matches_window_search():
+    rng = random.Random(3)
+    window = PricePositionIndex.WINDOW
+    checked = 0
+    for _ in range(100):
+        text = random_text(rng, 200)
+        index = PricePositionIndex(text)
+        matches = PRICE_ENGINE.find_all(text)
+        for start in range(0, len(text), 41):
+            end = min(len(text), start + rng.randint(1, 40))
+            low, high = start - window, end + window
+            # A number cut by the window edge reads differently in the old slice
+            if any(m.start < low < m.end or m.start < high < m.end for m in matches):
+                continue
+            assert index.price_near(start, end) == old_extract_price(text[max(0, low):high])
+            checked += 1
+    assert checked > 1000
+
+def test_price_near_keeps_first_hit_rule():
+    text = 'Cisco ISR4321 router $5 and later $1,200 USD 450'
+    start = text.index('Cisco')
+    index = PricePositionIndex(text)
+    assert index.price_near(start, start + 20) == 'USD 450'
+    
+    far = 'Cisco Catalyst router' + ' ' * 600 + '$1,200'
+    assert PricePositionIndex(far).price_near(0, 21) == ""
@@ -0,0 +1,40 @@
+"""ProductStore upserts by canonical key"""
+
+from product_store import ProductStore, product_key
+
+def test_upsert_merges_by_canonical_key(tmp_path):
+    path = str(tmp_path / 'products.sqlite3')
+    with ProductStore(path, batch_size=2) as store:
+        store.write({'product': 'Cisco ISR4331/K9 Router', 'SKU': 'ISR-4331/K9', 'price': '$1,299.00',
+                     'Brand': 'Cisco', 'category 1': 'Networking'}, source='comprehensive')
+        # Same product under the background scraper's keys, without a price
+        store.write({'product': 'cisco  isr4331/k9 router', 'sku': 'isr4331k9', 'brand': 'Cisco',
+                     'category1': 'Routers'}, source='background')
+        store.write({'Product': 'Huawei S5735 Switch', 'Sku': 'S5735', 'Price': '$800'}, source='generator')
+        store.write({'price': '$5'})
+        
+        assert store.count() == 2
+        assert store.skipped == 1
+        
+        row = store.get({'product': 'Cisco ISR4331/K9 Router', 'SKU': 'ISR4331K9'})
+        assert row['seen_count'] == 2
+        assert row['name'] == 'cisco  isr4331/k9 router'
+        assert row['price'] == '$1,299.00'
+        assert row['price_value'] == 1299.0
+        assert row['category1'] == 'Routers'
+        assert row['source'] == 'background'
+        assert row['data']['category1'] == 'Routers'
+        assert row['first_seen'] <= row['last_seen']
+    
+    # Upserts survive reopening the store
+    with ProductStore(path) as store:
+        assert store.count() == 2
+        assert [row['name'] for row in store.find(sku='S5735')] == ['Huawei S5735 Switch']
+        assert store.find(brand='Dell') == []
+        store.write({'Product': 'Huawei S5735 Switch', 'Sku': 'S5735', 'Price': '$750'})
+        assert store.get({'Product': 'Huawei S5735 Switch', 'Sku': 'S5735'})['price'] == '$750'
+        assert store.count() == 2
+
+def test_product_key_normalizes_sku_and_name():
+    assert product_key({'SKU': 'ISR-4331/K9', 'product': 'Cisco  ISR 4331!'}) == 'ISR4331K9|cisco isr 4331'
+    assert product_key({'Sku': 'isr4331k9', 'Product': 'cisco isr-4331'}) == 'ISR4331K9|cisco isr 4331'
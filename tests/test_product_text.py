@@ -0,0 +1,40 @@
+"""ProductTextScanner against one re.findall() per name pattern"""
+
+import random
+import re
+
+from product_text import BRAND_TEXT_PATTERNS, PRODUCT_TEXT_PATTERNS, ProductTextScanner
+
+FRAGMENTS = [
+    'Cisco ISR4331/K9 Integrated Services Router', 'Huawei S5735-L48T4X-A1 switch', 'HPE ProLiant DL380 Gen10',
+    'NetEngine AR6120 router', 'Catalyst 9300 48-port', 'PowerEdge R750 rack server', 'Fortinet FG-60F box',
+    'C9200L-24T-4G-E  Catalyst  9200L', 'dell n3048 switch', '$1,299.00', 'In stock', 'Call', 'short',
+    '\n', '\n', ' ', '\t', '  ',
+]
+
+def old_scan(patterns, text):
+    """Names the per-pattern findall() loops produced, each distinct name once"""
+    names = []
+    for pattern in patterns:
+        for match in re.findall(f'({pattern})', text, re.MULTILINE | re.IGNORECASE):
+            clean_match = re.sub(r'\s+', ' ', match.strip())
+            if clean_match not in names:
+                names.append(clean_match)
+    return names
+
+def check_scanner(patterns, seed):
+    scanner = ProductTextScanner(patterns)
+    rng = random.Random(seed)
+    for _ in range(1500):
+        text = ' '.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 20)))
+        candidates = list(scanner.scan(text))
+        assert [candidate.name for candidate in candidates] == old_scan(patterns, text), text
+        for candidate in candidates:
+            assert ' '.join(text[candidate.start:candidate.end].split()) == candidate.name
+            assert text[candidate.start:candidate.end] == text[candidate.start:candidate.end].strip()
+
+def test_product_patterns():
+    check_scanner(PRODUCT_TEXT_PATTERNS, 1)
+
+def test_brand_patterns():
+    check_scanner(BRAND_TEXT_PATTERNS, 2)